@@ -0,0 +1,218 @@
+"""
+Micro-benchmarks for the CPU hot paths of a sync, with regression thresholds.
+
+Runs offline (no Jira, no MySQL) on synthetic issues: a small issue, a wide issue with
+200 custom fields and an issue with a deeply nested ADF description. Each case reports
+the best time per operation over several repeats. Times are also divided by a fixed
+pure-Python calibration loop, so a baseline recorded on one machine remains usable on a
+faster or slower one.
+
+    python benchmarks/bench_hotpaths.py                    # compare against the baseline
+    python benchmarks/bench_hotpaths.py --update-baseline  # record a new baseline
+    python benchmarks/bench_hotpaths.py --tolerance 0.3 --filter flatten
+
+Exit code 1 when any case is slower than baseline * (1 + tolerance). Correctness of the
+SQL literals is covered by tests/test_sql_literals.py, not here.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+os.chdir(APP_DIR)  # main.py resolves backups/ relative to the working directory
+
+import main  # noqa: E402
+import sql_literals  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline_hotpaths.json"
+DEFAULT_TOLERANCE = 0.25
+REPEATS = 9
+RETRIES = 2  # Extra measurements of a case that looks slower than the tolerance
+TARGET_SECONDS = 0.1  # Per repeat; the number of loops is calibrated to reach it
+
+_rng = random.Random(42)
+
+
+def random_text(length: int) -> str:
+    alphabet = "abcdefghijklmnopqrstuvwxyz ÁÉÍÓÚñ'\"\\\n\t0123456789"
+    return "".join(_rng.choice(alphabet) for _ in range(length))
+
+
+def make_user(index: int) -> dict:
+    return {"accountId": f"5b10ac8d82e05b22cc7d{index:04d}", "displayName": f"Usuario {index}",
+            "emailAddress": f"user{index}@example.com", "active": True, "timeZone": "America/Mexico_City"}
+
+
+def make_small_issue(index: int = 1) -> dict:
+    return {"key": f"SAC-{index}", "fields": {
+        "summary": random_text(60),
+        "status": {"name": "En curso", "id": "3", "statusCategory": {"key": "indeterminate"}},
+        "priority": {"name": "Alta", "id": "2"},
+        "assignee": make_user(index),
+        "created": "2024-05-01T10:00:00.000-0600",
+        "updated": "2024-05-02T11:30:00.000-0600",
+        "labels": ["backend", "urgente"],
+        "customfield_10016": 5.0
+    }}
+
+
+def make_wide_issue(index: int = 1) -> dict:
+    """200 custom fields of the kinds Jira returns: text, numbers, options, users, lists, dates"""
+    fields = make_small_issue(index)["fields"]
+    for n in range(200):
+        kind = n % 6
+        name = f"customfield_{11000 + n}"
+        if kind == 0:
+            fields[name] = random_text(40)
+        elif kind == 1:
+            fields[name] = _rng.randint(0, 10 ** 6)
+        elif kind == 2:
+            fields[name] = {"self": f"https://example.atlassian.net/rest/api/3/customFieldOption/{n}",
+                            "value": f"Opción {n}", "id": str(n)}
+        elif kind == 3:
+            fields[name] = [make_user(n + i) for i in range(3)]
+        elif kind == 4:
+            fields[name] = None
+        else:
+            fields[name] = "2024-06-01"
+    return {"key": f"SAC-{index}", "fields": fields}
+
+
+def make_adf_node(depth: int) -> dict:
+    if depth == 0:
+        return {"type": "text", "text": random_text(80), "marks": [{"type": "strong"}]}
+    return {"type": "bulletList" if depth % 2 else "paragraph",
+            "content": [make_adf_node(depth - 1) for _ in range(3)]}
+
+
+def make_adf_issue(index: int = 1) -> dict:
+    issue = make_small_issue(index)
+    issue["fields"]["description"] = {"type": "doc", "version": 1, "content": [make_adf_node(6) for _ in range(2)]}
+    return issue
+
+
+def make_rows(count: int) -> list:
+    """Rows as mysql.connector returns them for a synced table"""
+    rows = []
+    for i in range(count):
+        rows.append((
+            f"SAC-{i}", random_text(60), None, i, 3.25 * i,
+            datetime(2024, 1, 1) + timedelta(minutes=i),
+            json.dumps(make_user(i)), random_text(300), b"\x00\x01\xff", Decimal("1234.50")
+        ))
+    return rows
+
+
+def calibration_loop() -> int:
+    total = 0
+    for i in range(1000):
+        total += i * i % 7
+    return total
+
+
+def build_cases() -> dict:
+    small, wide, adf = make_small_issue(), make_wide_issue(), make_adf_issue()
+    mapping = {name: f"col_{name}" for name in wide["fields"]}
+    field_values = [value for value in main.flatten_issue_fields(wide).values()] + [True, 1.5, {}, []]
+    rows = make_rows(100)
+    wide_columns = list(main.flatten_issue_fields(wide).keys())
+
+    return {
+        "flatten_small": lambda: main.flatten_issue_fields(small),
+        "flatten_wide": lambda: main.flatten_issue_fields(wide),
+        "flatten_wide_mapped": lambda: main.flatten_issue_fields(wide, mapping),
+        "flatten_adf": lambda: main.flatten_issue_fields(adf),
+        "get_field_type": lambda: [main.get_field_type(value) for value in field_values],
+        "sql_rows_100": lambda: sql_literals.format_rows(rows),
+        "build_upsert_sql_wide": lambda: main.build_upsert_sql("jira_issues", wide_columns),
+    }
+
+
+def measure(func) -> float:
+    """Best seconds per call over REPEATS repeats of a calibrated number of loops"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * TARGET_SECONDS / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat=REPEATS, number=number)) / number
+
+
+def measure_case(func) -> dict:
+    """Time func and the calibration loop back to back, so load changes affect both alike"""
+    seconds = measure(func)
+    calibration = min(measure(calibration_loop), measure(calibration_loop))
+    return {"us_per_op": round(seconds * 1e6, 3), "relative": round(seconds / calibration, 4)}
+
+
+def run(cases: dict, filter_text: str = "") -> dict:
+    results = {}
+    for name, func in cases.items():
+        if filter_text and filter_text not in name:
+            continue
+        results[name] = measure_case(func)
+    return {"results": results}
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de las rutas críticas de CPU")
+    parser.add_argument("--update-baseline", action="store_true", help="guardar los resultados como baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="lentitud máxima aceptada sobre el baseline (0.25 = 25%%)")
+    parser.add_argument("--absolute", action="store_true",
+                        help="comparar tiempos absolutos en lugar de relativos a la calibración")
+    parser.add_argument("--filter", default="", help="solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    cases = build_cases()
+    report = run(cases, args.filter)
+    metric = "us_per_op" if args.absolute else "relative"
+
+    if args.update_baseline:
+        report["python"] = platform.python_version()
+        report["machine"] = platform.machine()
+        report["recorded_at"] = datetime.now().isoformat(timespec="seconds")
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        for name, result in report["results"].items():
+            print(f"{name:<28} {result['us_per_op']:>12.3f} us")
+        print(f"Baseline guardado en {args.baseline}")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {"results": {}}
+    regressions = []
+    print(f"{'caso':<28} {'us/op':>12} {'baseline':>12} {'cambio':>9}")
+    for name, result in report["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:<28} {result['us_per_op']:>12.3f} {'-':>12} {'nuevo':>9}")
+            continue
+        ratio = result[metric] / reference[metric]
+        # A single slow measurement is often noise: confirm it before flagging a regression
+        for _ in range(RETRIES):
+            if ratio <= 1 + args.tolerance:
+                break
+            retry = measure_case(cases[name])
+            if retry[metric] < result[metric]:
+                result = report["results"][name] = retry
+            ratio = result[metric] / reference[metric]
+        flag = ""
+        if ratio > 1 + args.tolerance:
+            regressions.append(name)
+            flag = "  REGRESIÓN"
+        print(f"{name:<28} {result['us_per_op']:>12.3f} {reference['us_per_op']:>12.3f} {ratio - 1:>+8.1%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} caso(s) más lentos que el baseline + {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,285 @@
+"""
+Load test for the status-polling and log endpoints while a sync is running.
+
+Starts the app in-process under uvicorn on a free local port (or targets --url), runs a
+synthetic sync against the MySQL configured through MYSQL_HOST/MYSQL_PORT/MYSQL_USER/
+MYSQL_PASSWORD/MYSQL_DATABASE (synthetic issues are upserted into `load_test_issues` and
+backed up, no Jira needed), and meanwhile simulates:
+
+- pollers: browser tabs polling /sync-status/{task_id}, and /sync-tasks every 5th poll
+- log viewers: /api/logs/all and /sync-logs pages
+- a /health probe every 100 ms; its latency shows event-loop blocking
+
+Reports requests, throughput, p50/p90/p99/max latency and errors per endpoint. Errors
+(5xx, timeouts, refused connections) under load usually mean connection or threadpool
+exhaustion.
+
+    python benchmarks/load_test.py --pollers 300 --log-viewers 20 --duration 30
+    python benchmarks/load_test.py --max-p99-ms 500   # exit 1 when any p99 is above 500 ms
+    python benchmarks/load_test.py --backup-mode tee  # backup written during the upsert
+
+Needs uvicorn and httpx. Client and server share one process (and its GIL), so absolute
+numbers are pessimistic; compare runs against each other.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+BENCH_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(APP_DIR))
+os.chdir(APP_DIR)  # main.py resolves backups/ relative to the working directory
+
+import main  # noqa: E402
+from bench_hotpaths import make_small_issue, make_wide_issue  # noqa: E402
+
+LOAD_TEST_TABLE = "load_test_issues"
+HEALTH_PROBE_INTERVAL = 0.1
+
+
+class LatencyStats:
+    """Latencies and failures per endpoint label"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.status_codes: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: httpx.AsyncClient, label: str, url: str) -> None:
+        start = time.perf_counter()
+        try:
+            response = await client.get(url)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            self.latencies[label].append(time.perf_counter() - start)
+            return
+        self.latencies[label].append(time.perf_counter() - start)
+        self.status_codes[label][response.status_code] += 1
+        if response.status_code >= 500:
+            self.errors[label] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict[str, float]]:
+        report = {}
+        for label, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            report[label] = {
+                "requests": len(ordered),
+                "rps": round(len(ordered) / elapsed, 1),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+                "p90_ms": round(percentile(ordered, 90) * 1000, 1),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+                "errors": self.errors[label],
+                "status_codes": dict(self.status_codes[label])
+            }
+        return report
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int):
+    """Run the app under uvicorn in a daemon thread and wait until it accepts requests"""
+    import uvicorn
+
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, name="uvicorn", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("uvicorn no arrancó")
+        time.sleep(0.05)
+    return server, thread
+
+
+def load_test_sync_request(backup_mode: str = "reread") -> main.JiraSyncRequest:
+    return main.JiraSyncRequest(
+        jira_domain="load-test.invalid", jira_email="load@test", jira_api_token="-",
+        jql="project = LOAD", fields=["summary"],
+        mysql_host=os.getenv("MYSQL_HOST", "localhost"),
+        mysql_port=int(os.getenv("MYSQL_PORT", "3306")),
+        mysql_user=os.getenv("MYSQL_USER", "root"),
+        mysql_password=os.getenv("MYSQL_PASSWORD", ""),
+        mysql_database=os.getenv("MYSQL_DATABASE", "jiradb"),
+        mysql_table=LOAD_TEST_TABLE,
+        backup_mode=backup_mode
+    )
+
+
+def run_synthetic_sync(task_id: str, issue_count: int, wide: bool, backup_mode: str = "reread") -> None:
+    """Upsert synthetic issues and back them up through the real sync code, minus Jira"""
+    task = main.background_tasks_store[task_id]
+    sync_request = load_test_sync_request(backup_mode)
+    backup_tee = main.BackupTee(task_id, sync_request, issue_count) if backup_mode == "tee" else None
+    make_issue = make_wide_issue if wide else make_small_issue
+    try:
+        task.update({"status": "descargando", "total_issues": issue_count,
+                     "message": "Generando issues sintéticos..."})
+        issues = [make_issue(index) for index in range(issue_count)]
+        connection = main.connect_to_mysql(sync_request)
+        try:
+            task.update({"status": "preparando_tabla", "message": "Preparando tabla en MySQL..."})
+            with main.track_stage(task_id, "schema"):
+                main.ensure_table_exists(connection, sync_request, issues)
+            task["status"] = "sincronizando"
+            with main.track_stage(task_id, "upsert"):
+                synced = main.sync_issues_to_database_with_progress(connection, sync_request, issues, task_id,
+                                                                    backup_tee=backup_tee)
+        finally:
+            connection.close()
+        with main.track_stage(task_id, "backup"):
+            backup_filename = backup_tee.finish() if backup_tee else None
+            if backup_filename is None:
+                backup_filename = main.generate_backup(task_id, sync_request, LOAD_TEST_TABLE, issue_count)
+        task.update({"status": "completado", "progress": 100, "processed_issues": synced,
+                     "completed_at": datetime.now().isoformat(),
+                     "message": f"Sincronización sintética completada: {synced} issues",
+                     "result": {"synced_issues": synced, "backup_file": backup_filename}})
+    except Exception as e:
+        if backup_tee:
+            backup_tee.discard()
+        task.update({"status": "error", "error": str(e), "message": f"Error: {e}",
+                     "completed_at": datetime.now().isoformat()})
+
+
+def start_synthetic_sync(issue_count: int, wide: bool, backup_mode: str = "reread") -> str:
+    task_id = str(uuid.uuid4())
+    main.background_tasks_store[task_id] = {
+        "id": task_id, "status": "iniciando", "progress": 0, "total_issues": 0,
+        "processed_issues": 0, "message": "Iniciando sincronización sintética...",
+        "started_at": datetime.now().isoformat(), "completed_at": None, "error": None,
+        "result": None, "timings": {}
+    }
+    main.executor.submit(run_synthetic_sync, task_id, issue_count, wide, backup_mode)
+    return task_id
+
+
+async def poller(client, stats: LatencyStats, task_id: str, interval: float, stop: asyncio.Event) -> None:
+    polls = 0
+    while not stop.is_set():
+        await stats.request(client, "/sync-status/{task_id}", f"/sync-status/{task_id}")
+        polls += 1
+        if polls % 5 == 0:
+            await stats.request(client, "/sync-tasks", "/sync-tasks?limit=10")
+        await asyncio.sleep(interval)
+
+
+async def log_viewer(client, stats: LatencyStats, interval: float, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        await stats.request(client, "/api/logs/all", "/api/logs/all?limit=50")
+        await stats.request(client, "/sync-logs", "/sync-logs?limit=50")
+        await asyncio.sleep(interval)
+
+
+async def health_probe(client, stats: LatencyStats, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        await stats.request(client, "/health", "/health")
+        await asyncio.sleep(HEALTH_PROBE_INTERVAL)
+
+
+async def run_load(base_url: str, task_id: str, args) -> Dict[str, Dict[str, float]]:
+    stats = LatencyStats()
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=args.pollers + args.log_viewers + 1, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        workers = [asyncio.create_task(health_probe(client, stats, stop))]
+        for index in range(args.pollers):
+            workers.append(asyncio.create_task(poller(client, stats, task_id, args.poll_interval, stop)))
+            if index % 50 == 49:
+                await asyncio.sleep(0.05)  # Ramp up like tabs opening, not all in one tick
+        workers += [asyncio.create_task(log_viewer(client, stats, args.log_interval, stop))
+                    for _ in range(args.log_viewers)]
+        started = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*workers, return_exceptions=True)
+        return stats.summary(time.perf_counter() - started)
+
+
+def print_report(report: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'endpoint':<26} {'req':>7} {'req/s':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'err':>5}")
+    for label, row in report.items():
+        print(f"{label:<26} {row['requests']:>7} {row['rps']:>8} {row['p50_ms']:>8} {row['p90_ms']:>8} "
+              f"{row['p99_ms']:>8} {row['max_ms']:>8} {row['errors']:>5}")
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga de los endpoints de estado y logs")
+    parser.add_argument("--url", help="servidor ya levantado; por defecto se arranca la app en el proceso")
+    parser.add_argument("--pollers", type=int, default=200)
+    parser.add_argument("--log-viewers", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=20.0, help="segundos de carga")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--log-interval", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=10.0, help="timeout por petición")
+    parser.add_argument("--issues", type=int, default=20000, help="issues de la sincronización sintética")
+    parser.add_argument("--wide", action="store_true", help="issues de 200 campos personalizados")
+    parser.add_argument("--backup-mode", choices=main.BACKUP_MODES, default="reread",
+                        help="backup releyendo la tabla o escrito durante el upsert")
+    parser.add_argument("--no-sync", action="store_true", help="solo carga, sin sincronización en curso")
+    parser.add_argument("--max-p99-ms", type=float, help="fallar si algún endpoint supera este p99")
+    parser.add_argument("--json", type=Path, help="guardar el reporte en este archivo")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        task_id = str(uuid.uuid4())  # The sync of a remote server cannot be injected: poll a missing task
+    else:
+        port = free_port()
+        server, thread = start_server(port)
+        base_url = f"http://127.0.0.1:{port}"
+        task_id = str(uuid.uuid4()) if args.no_sync else start_synthetic_sync(args.issues, args.wide, args.backup_mode)
+
+    try:
+        report = asyncio.run(run_load(base_url, task_id, args))
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join(10)
+
+    print_report(report)
+    task = main.background_tasks_store.get(task_id)
+    if task is not None:
+        print(f"\nSincronización sintética: {task['status']} - {task['message']}")
+
+    if args.json:
+        args.json.write_text(json.dumps({"endpoints": report, "sync_status": task and task["status"],
+                                         "args": {k: str(v) for k, v in vars(args).items()}}, indent=2),
+                             encoding="utf-8")
+
+    if args.max_p99_ms is not None:
+        slow = [label for label, row in report.items() if row["p99_ms"] > args.max_p99_ms]
+        if slow:
+            print(f"\np99 por encima de {args.max_p99_ms} ms en: {', '.join(slow)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
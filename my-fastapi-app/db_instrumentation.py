@@ -0,0 +1,217 @@
+"""
+Statement-level instrumentation for mysql.connector connections.
+
+`connect()` returns the usual connection wrapped so every cursor it hands out times its
+statements. Each execute is classified (select, upsert, ddl...), and its duration, rows
+affected and warning count are added to per-class counters, both process-wide and for the
+task bound to the current context with `task_context()`. Statements slower than
+SLOW_STATEMENT_MS are kept, newest last, in a bounded ring buffer for `/debug/slow-statements`.
+
+Configuration (environment):
+    SLOW_STATEMENT_MS           threshold for the slow-statement buffer (500)
+    SLOW_STATEMENT_BUFFER_SIZE  statements kept in the buffer (200)
+"""
+import contextvars
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import mysql.connector
+
+SLOW_STATEMENT_MS = float(os.getenv("SLOW_STATEMENT_MS", "500"))
+SLOW_STATEMENT_BUFFER_SIZE = int(os.getenv("SLOW_STATEMENT_BUFFER_SIZE", "200"))
+SLOW_STATEMENT_TEXT_LIMIT = 1000
+
+_STATEMENT_KEYWORD_RE = re.compile(r"\s*(?:/\*.*?\*/\s*|--[^\n]*\n\s*)*([A-Za-z]+)", re.DOTALL)
+_DDL_KEYWORDS = {"CREATE", "ALTER", "DROP", "TRUNCATE", "RENAME"}
+_READ_KEYWORDS = {"SHOW": "show", "DESCRIBE": "show", "DESC": "show", "EXPLAIN": "show"}
+
+# (task_id, per-class stats dict) of the task running in this context
+_current_task: contextvars.ContextVar = contextvars.ContextVar("statement_task", default=None)
+
+_lock = threading.Lock()
+_slow_statements: deque = deque(maxlen=SLOW_STATEMENT_BUFFER_SIZE)
+_global_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def classify_statement(sql: str) -> str:
+    """Statement class from the leading keyword; INSERT ... ON DUPLICATE KEY UPDATE is an upsert"""
+    match = _STATEMENT_KEYWORD_RE.match(sql)
+    if not match:
+        return "other"
+    keyword = match.group(1).upper()
+    if keyword == "INSERT":
+        return "upsert" if sql.rfind("ON DUPLICATE KEY UPDATE") != -1 else "insert"
+    if keyword in _DDL_KEYWORDS:
+        return "ddl"
+    if keyword in _READ_KEYWORDS:
+        return _READ_KEYWORDS[keyword]
+    if keyword == "WITH":
+        return "select"
+    if keyword in ("SELECT", "UPDATE", "DELETE", "REPLACE", "SET"):
+        return keyword.lower()
+    return "other"
+
+
+def _add_to_stats(stats: Dict[str, Dict[str, Any]], statement_class: str, elapsed_ms: float,
+                  rows: int, warnings: int, slow: bool) -> None:
+    entry = stats.get(statement_class)
+    if entry is None:
+        entry = stats[statement_class] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                          "rows": 0, "warnings": 0, "slow": 0}
+    entry["calls"] += 1
+    entry["total_ms"] = round(entry["total_ms"] + elapsed_ms, 3)
+    entry["max_ms"] = max(entry["max_ms"], round(elapsed_ms, 3))
+    entry["rows"] += rows
+    entry["warnings"] += warnings
+    entry["slow"] += int(slow)
+
+
+def record_statement(sql: str, elapsed_ms: float, rows: int, warnings: int,
+                     error: Optional[str] = None) -> None:
+    statement_class = classify_statement(sql)
+    slow = elapsed_ms >= SLOW_STATEMENT_MS
+    task = _current_task.get()
+    # Only the thread running the task writes its stats, so no lock is needed there
+    if task is not None:
+        _add_to_stats(task[1], statement_class, elapsed_ms, rows, warnings, slow)
+    with _lock:
+        _add_to_stats(_global_stats, statement_class, elapsed_ms, rows, warnings, slow)
+        if slow:
+            _slow_statements.append({
+                "recorded_at": datetime.now().isoformat(),
+                "task_id": task[0] if task is not None else None,
+                "statement_class": statement_class,
+                "duration_ms": round(elapsed_ms, 3),
+                "rows": rows,
+                "warnings": warnings,
+                "error": error,
+                "statement": " ".join(sql[:SLOW_STATEMENT_TEXT_LIMIT * 2].split())[:SLOW_STATEMENT_TEXT_LIMIT]
+            })
+
+
+class InstrumentedCursor:
+    """Cursor proxy timing execute/executemany; everything else goes to the wrapped cursor"""
+
+    __slots__ = ("_cursor",)
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, method, operation, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = method(operation, *args, **kwargs)
+        except mysql.connector.Error as e:
+            record_statement(str(operation), (time.perf_counter() - start) * 1000, 0, 0, str(e))
+            raise
+        rows = self._cursor.rowcount
+        record_statement(str(operation), (time.perf_counter() - start) * 1000,
+                         rows if rows and rows > 0 else 0, getattr(self._cursor, "warning_count", 0) or 0)
+        return result
+
+    def execute(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.executemany, operation, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+        return False
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are instrumented"""
+
+    __slots__ = ("_connection",)
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._connection.close()
+        return False
+
+
+def connect(**kwargs) -> InstrumentedConnection:
+    """mysql.connector.connect() with instrumented cursors"""
+    return InstrumentedConnection(mysql.connector.connect(**kwargs))
+
+
+def bind_task(task_id: str, stats: Optional[Dict[str, Dict[str, Any]]] = None):
+    """Tag statements of this context with task_id; returns a token for unbind_task()"""
+    return _current_task.set((task_id, stats if stats is not None else {}))
+
+
+def unbind_task(token) -> None:
+    _current_task.reset(token)
+
+
+def merge_stats(target: Dict[str, Dict[str, Any]], source: Dict[str, Dict[str, Any]]) -> None:
+    """Add the per-class stats of a helper thread (once it has finished) into a task's stats"""
+    for statement_class, entry in source.items():
+        total = target.get(statement_class)
+        if total is None:
+            target[statement_class] = dict(entry)
+            continue
+        total["calls"] += entry["calls"]
+        total["total_ms"] = round(total["total_ms"] + entry["total_ms"], 3)
+        total["max_ms"] = max(total["max_ms"], entry["max_ms"])
+        for field in ("rows", "warnings", "slow"):
+            total[field] += entry[field]
+
+
+@contextmanager
+def task_context(task_id: str, stats: Optional[Dict[str, Dict[str, Any]]] = None):
+    """Bind statements run inside the block to task_id, yielding its per-class stats"""
+    stats = stats if stats is not None else {}
+    token = bind_task(task_id, stats)
+    try:
+        yield stats
+    finally:
+        unbind_task(token)
+
+
+def get_slow_statements(limit: int = 50, task_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Slowest-recorded statements, newest first"""
+    with _lock:
+        entries = list(_slow_statements)
+    if task_id:
+        entries = [entry for entry in entries if entry["task_id"] == task_id]
+    return entries[::-1][:limit]
+
+
+def get_statement_stats() -> Dict[str, Dict[str, Any]]:
+    with _lock:
+        return {name: dict(entry) for name, entry in _global_stats.items()}
+
+
+def clear_slow_statements() -> int:
+    with _lock:
+        count = len(_slow_statements)
+        _slow_statements.clear()
+    return count
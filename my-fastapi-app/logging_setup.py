@@ -0,0 +1,204 @@
+"""
+Non-blocking, structured logging for the API and its background tasks.
+
+`configure_logging()` puts a QueueHandler on the root logger: worker threads only enqueue
+records, and a QueueListener thread formats and writes them, so slow stdout or disk never
+stalls a sync loop. Records carry the task_id and stage bound to the current context
+(`log_context()` / `bind_log_context()`), in the text output and as fields of the JSON output.
+
+Hot loops use two helpers: `LogThrottle` limits progress lines to one per interval, and
+`RepeatedErrorLog` logs the first occurrences of each kind of per-row error and folds the
+rest into a summary with counts.
+
+Configuration (environment):
+    LOG_FORMAT  text (default) | json
+    LOG_LEVEL   INFO by default
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_CONTEXT_FIELDS = ("task_id", "stage")
+
+_log_context: contextvars.ContextVar = contextvars.ContextVar("log_context", default={})
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class ContextFilter(logging.Filter):
+    """Copy task_id and stage of the emitting thread's context onto the record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        for field in LOG_CONTEXT_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, context.get(field))
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    """`LEVEL:logger:message`, with a `[task stage] ` prefix when bound to a task"""
+
+    def __init__(self):
+        super().__init__("%(levelname)s:%(name)s:%(task_tag)s%(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        task_id = getattr(record, "task_id", None)
+        stage = getattr(record, "stage", None)
+        if not task_id:
+            record.task_tag = ""
+        else:
+            record.task_tag = f"[{task_id[:8]} {stage}] " if stage else f"[{task_id[:8]}] "
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, task_id, stage, exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName
+        }
+        for field in LOG_CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler leaving formatting to the listener; tracebacks travel as exc_text"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def configure_logging(log_format: str = LOG_FORMAT, level: str = LOG_LEVEL) -> None:
+    """Route the root logger through a queue to a single writer thread (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = ContextQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def bind_log_context(**fields) -> contextvars.Token:
+    """Add fields (task_id, stage) to the log context; returns a token for unbind_log_context()"""
+    return _log_context.set({**_log_context.get(), **fields})
+
+
+def unbind_log_context(token: contextvars.Token) -> None:
+    _log_context.reset(token)
+
+
+@contextmanager
+def log_context(**fields):
+    token = bind_log_context(**fields)
+    try:
+        yield
+    finally:
+        unbind_log_context(token)
+
+
+class LogThrottle:
+    """Allow a progress log line at most once per interval (the first call always passes)"""
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self._last: Optional[float] = None
+
+    def ready(self) -> bool:
+        now = time.monotonic()
+        if self._last is None or now - self._last >= self.interval:
+            self._last = now
+            return True
+        return False
+
+
+_VARIABLE_PARTS_RE = re.compile(r"'[^']*'|\"[^\"]*\"|\b\d+\b")
+
+
+class RepeatedErrorLog:
+    """
+    Log the first `limit` occurrences of each kind of error, count the rest.
+
+    Errors are grouped by errno and message with quoted values and numbers masked, so
+    "Duplicate entry 'A-1'" and "Duplicate entry 'A-2'" are the same kind. `counts`
+    can be merged across calls by passing the same dict.
+    """
+
+    def __init__(self, logger: logging.Logger, limit: int = 5, counts: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.logger = logger
+        self.limit = limit
+        self.counts = counts if counts is not None else {}
+        self.suppressed = 0
+
+    def error(self, item: Any, exc: Exception) -> None:
+        message = str(exc)
+        # mysql.connector errors prefix str() with the errno; group on the bare message
+        text = getattr(exc, "msg", None) or message
+        kind = f"{getattr(exc, 'errno', None) or type(exc).__name__}: {_VARIABLE_PARTS_RE.sub('?', text)}"
+        entry = self.counts.get(kind)
+        if entry is None:
+            entry = self.counts[kind] = {"count": 0, "example_item": item, "example_message": message[:500]}
+        entry["count"] += 1
+        if entry["count"] <= self.limit:
+            self.logger.error(f"Error en {item}: {message}")
+        else:
+            self.suppressed += 1
+
+    def log_summary(self) -> None:
+        """One line per kind of error that was seen more often than it was logged"""
+        if not self.suppressed:
+            return
+        for kind, entry in self.counts.items():
+            if entry["count"] > self.limit:
+                self.logger.error(f"{entry['count']} errores del tipo \"{kind}\" "
+                                  f"({entry['count'] - self.limit} sin registrar; ejemplo: {entry['example_item']})")
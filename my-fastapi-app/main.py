@@ -1,6 +1,7 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import Response, PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional, Union
 import requests
@@ -12,17 +13,40 @@ import logging
 import uuid
 from datetime import datetime, timezone
 import asyncio
+import anyio
 from concurrent.futures import ThreadPoolExecutor
 import threading
 import os
+import socket
 from pathlib import Path
 import subprocess
 import tempfile
 import pytz
 import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+import re
+import hashlib
+import base64
+import gzip
+import shutil
+import io
+import csv
+import copy
+from collections import OrderedDict
+import queue
+import zlib
+from email.utils import formatdate
+from datetime import timedelta
+import tracing
+import db_instrumentation
+import sampling_profiler
+import logging_setup
+import sql_literals
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: records are queued and written by a listener thread (LOG_FORMAT=text|json)
+logging_setup.configure_logging()
 logger = logging.getLogger(__name__)
 
 app = FastAPI()
@@ -49,11 +73,49 @@ app.add_middleware(
 background_tasks_store: Dict[str, Dict[str, Any]] = {}
 executor = ThreadPoolExecutor(max_workers=5)
 
+# Blocking endpoints are plain `def` and run in the AnyIO threadpool, bounded so a burst of
+# slow MySQL/Jira calls queues instead of spawning unbounded threads; the event loop stays free
+API_THREADPOOL_SIZE = int(os.getenv("API_THREADPOOL_SIZE", "20"))
+
+
+@app.on_event("startup")
+async def configure_api_threadpool():
+    """Bound the threadpool that runs the blocking endpoints"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
+
 # Create backups directory if it doesn't exist
 BACKUPS_DIR = Path("backups")
 BACKUPS_DIR.mkdir(exist_ok=True)
 
 
+# Stages of sync_jira_issues_background that are timed into the task result
+SYNC_STAGES = ["count", "connect", "download", "expand", "schema", "upsert", "backup", "log_writes"]
+
+# Sub-resources that can be expanded into child tables of the synced table
+SUBRESOURCE_TYPES = ["changelog", "comments", "worklogs"]
+SUBRESOURCE_ISSUE_CHUNK = 500  # Issues fetched and written per round
+SUBRESOURCE_MAX_RETRIES = 5
+
+
+class GeneratedColumn(BaseModel):
+    # Column exposing a JSON sub-attribute of a synced field, e.g.
+    # {"name": "assignee_account_id", "path": "assignee.accountId", "index": true}
+    name: str
+    path: str  # "<jira field>.<attr>" or "<jira field>[n].<attr>"
+    sql_type: str = "VARCHAR(255)"
+    storage: str = "VIRTUAL"  # VIRTUAL or STORED
+    index: bool = False
+
+
+class RetentionPolicy(BaseModel):
+    # Grandfather-father-son retention for the backups of one table ("*" = default policy)
+    table_name: str = "*"
+    keep_last: int = 10
+    keep_daily_days: int = 7
+    keep_weekly_weeks: int = 4
+    recompress_after_days: Optional[int] = None  # gzip -9 older kept backups
+
+
 class JiraSyncRequest(BaseModel):
     # Jira configuration
     jira_domain: str  # e.g., "your-domain.atlassian.net"
@@ -72,6 +134,23 @@ class JiraSyncRequest(BaseModel):
     
     # Optional pagination settings
     max_results_per_page: int = 50
+    
+    # Optional sub-resource expansion into child tables: "changelog", "comments", "worklogs"
+    expand_subresources: List[str] = []
+    subresource_concurrency: int = 4
+    
+    # Optional list-valued Jira fields (e.g. labels, components, fixVersions) exploded
+    # into indexed child tables `<table>_<column>(key, value)`
+    normalize_list_fields: List[str] = []
+    
+    # Optional generated columns (and secondary indexes) over JSON paths of synced fields
+    generated_columns: List[GeneratedColumn] = []
+    
+    # Opt-in tracemalloc/RSS snapshots at each stage boundary, stored in result.memory.profile
+    profile_memory: bool = False
+    
+    # "reread": dump the table after the sync; "tee": write the backup during the upsert
+    backup_mode: str = "reread"
 
 
 @app.get("/")
@@ -89,6 +168,10 @@ async def sync_jira_issues(sync_request: JiraSyncRequest):
     """
     Start synchronization of Jira issues to MySQL database in background
     """
+    if sync_request.backup_mode not in BACKUP_MODES:
+        raise HTTPException(status_code=400,
+                            detail=f"backup_mode must be one of: {', '.join(BACKUP_MODES)}")
+    
     # Generate unique task ID
     task_id = str(uuid.uuid4())
     
@@ -103,17 +186,12 @@ async def sync_jira_issues(sync_request: JiraSyncRequest):
         "started_at": datetime.now().isoformat(),
         "completed_at": None,
         "error": None,
-        "result": None
+        "result": None,
+        "timings": {}
     }
     
-    # Start background task
-    loop = asyncio.get_event_loop()
-    loop.run_in_executor(
-        executor,
-        run_sync_task,
-        task_id,
-        sync_request.dict()
-    )
+    # Start background task (here, or on whichever worker claims it in MySQL queue mode)
+    await run_in_threadpool(submit_job, task_id, "sync", sync_request.dict(), executor, run_sync_task)
     
     return {
         "task_id": task_id,
@@ -125,17 +203,15 @@ async def sync_jira_issues(sync_request: JiraSyncRequest):
 def run_sync_task(task_id: str, sync_request_dict: dict):
     """Run the sync task in background thread"""
     try:
-        # Create async event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        # Run the async sync function
-        result = loop.run_until_complete(
-            sync_jira_issues_background(task_id, sync_request_dict)
-        )
-        
-        loop.close()
-        return result
+        # Root span of the task; the trace id is the task id
+        with tracing.span("sync", {
+            "task.id": task_id,
+            "mysql.table": sync_request_dict.get("mysql_table"),
+            "jira.domain": sync_request_dict.get("jira_domain")
+        }, trace_id=task_id), db_instrumentation.task_context(
+            task_id, background_tasks_store[task_id].setdefault("statements", {})
+        ), sampling_profiler.task_thread(task_id), logging_setup.log_context(task_id=task_id):
+            return sync_jira_issues_background(task_id, sync_request_dict)
     except Exception as e:
         logger.error(f"Error in background task {task_id}: {str(e)}")
         background_tasks_store[task_id].update({
@@ -145,923 +221,4373 @@ def run_sync_task(task_id: str, sync_request_dict: dict):
         })
 
 
-async def sync_jira_issues_background(task_id: str, sync_request_dict: dict):
-    """
-    Synchronize Jira issues to MySQL database with progress tracking
-    """
-    try:
-        # Recreate the request object
-        sync_request = JiraSyncRequest(**sync_request_dict)
-        
-        # Step 1: Get approximate count of issues
-        background_tasks_store[task_id]["status"] = "obteniendo_total"
-        background_tasks_store[task_id]["message"] = "Obteniendo cantidad total de issues..."
-        
-        issue_count = await get_issue_count(sync_request)
-        background_tasks_store[task_id]["total_issues"] = issue_count
-        background_tasks_store[task_id]["message"] = f"Se encontraron {issue_count} issues"
-        
-        # Step 2: Connect to MySQL
-        background_tasks_store[task_id]["status"] = "conectando_db"
-        background_tasks_store[task_id]["message"] = "Conectando a MySQL..."
-        connection = connect_to_mysql(sync_request)
-        
-        # Ensure logs table exists
-        ensure_logs_table_exists(connection)
-        
-        # Save initial log entry
-        save_sync_log(connection, task_id, sync_request, "iniciando", issue_count)
-        
-        # Step 3: Fetch all issues with pagination and progress tracking
-        background_tasks_store[task_id]["status"] = "descargando"
-        background_tasks_store[task_id]["message"] = "Descargando issues de Jira..."
-        
-        all_issues = await fetch_all_issues_with_progress(sync_request, issue_count, task_id)
-        
-        # Step 4: Ensure table exists
-        background_tasks_store[task_id]["status"] = "preparando_tabla"
-        background_tasks_store[task_id]["message"] = "Preparando tabla en MySQL..."
-        ensure_table_exists(connection, sync_request, all_issues)
-        
-        # Step 5: Sync issues to database
-        background_tasks_store[task_id]["status"] = "sincronizando"
-        background_tasks_store[task_id]["message"] = "Sincronizando issues a la base de datos..."
-        
-        synced_count = sync_issues_to_database_with_progress(
-            connection, sync_request, all_issues, task_id
-        )
-        
-        # Step 6: Generate backup SQL file
-        background_tasks_store[task_id]["status"] = "generando_respaldo"
-        background_tasks_store[task_id]["message"] = "Generando archivo de respaldo SQL..."
-        logger.info(f"Task {task_id}: Iniciando generación de backup...")
-        
-        backup_filename = await generate_backup(task_id, sync_request, sync_request.mysql_table, issue_count)
-        
-        # Generate download URL for backup
-        backup_url = f"/backups/{backup_filename}" if backup_filename else None
-        
-        # Save final log entry
-        result_data = {
-            "total_issues": len(all_issues),
-            "synced_issues": synced_count,
-            "approximate_count": issue_count,
-            "backup_file": backup_filename,
-            "backup_url": backup_url
-        }
-        save_sync_log(connection, task_id, sync_request, "completado", 
-                     len(all_issues), synced_count, None, result_data, backup_filename)
-        
-        # Close connection
-        connection.close()
-        
-        # Update final status
-        background_tasks_store[task_id].update({
-            "status": "completado",
-            "progress": 100,
-            "processed_issues": synced_count,
-            "message": f"Sincronización completada: {synced_count} issues procesados. Backup: {backup_filename}",
-            "completed_at": datetime.now().isoformat(),
-            "result": result_data,
-            "backup_file": backup_filename,
-            "backup_url": backup_url
-        })
-        
-        logger.info(f"Task {task_id}: Sincronización completada exitosamente con backup: {backup_filename}")
-        
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error during sync task {task_id}: {str(e)}")
-        
-        # Try to save error log if connection exists
-        try:
-            if 'connection' in locals() and connection:
-                save_sync_log(connection, task_id, sync_request, "error", 
-                            0, 0, str(e), None, None)
-                connection.close()
-        except:
-            pass
-        
-        background_tasks_store[task_id].update({
-            "status": "error",
-            "error": str(e),
-            "message": f"Error: {str(e)}",
-            "completed_at": datetime.now().isoformat()
-        })
-        raise
+# Durable job queue: with JOB_QUEUE_MODE=mysql, sync and export jobs are stored in
+# `sync_jobs` and claimed by any backend process with a renewable lease, so several
+# uvicorn workers or replicas can share the work and status survives restarts.
+JOB_QUEUE_MODE = os.getenv("JOB_QUEUE_MODE", "local").lower()  # local | mysql
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "2"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+JOB_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+_job_workers_stop = threading.Event()
 
+# task_id -> reason, for jobs that must stop because this worker lost their lease
+_cancelled_tasks: Dict[str, str] = {}
 
-async def get_issue_count(sync_request: JiraSyncRequest) -> int:
-    """Get approximate count of issues matching the JQL"""
-    url = f"https://{sync_request.jira_domain}/rest/api/3/search/approximate-count"
-    auth = HTTPBasicAuth(sync_request.jira_email, sync_request.jira_api_token)
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
-    payload = {"jql": sync_request.jql}
-    
-    response = requests.post(url, json=payload, headers=headers, auth=auth)
-    response.raise_for_status()
-    
-    return response.json().get("count", 0)
 
+class TaskCancelled(Exception):
+    """Raised inside a task that must stop, e.g. because another worker took over its job"""
 
-async def fetch_all_issues_with_progress(sync_request: JiraSyncRequest, total_count: int, task_id: str) -> List[Dict[str, Any]]:
-    """Fetch all issues using pagination with progress tracking"""
-    all_issues = []
-    next_page_token = None
-    
-    url = f"https://{sync_request.jira_domain}/rest/api/3/search/jql"
-    auth = HTTPBasicAuth(sync_request.jira_email, sync_request.jira_api_token)
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
-    
-    # Extract field names for Jira API
-    if isinstance(sync_request.fields, dict):
-        jira_fields = list(sync_request.fields.keys())
-    else:
-        jira_fields = sync_request.fields
-    
-    while True:
-        payload = {
-            "jql": sync_request.jql,
-            "fields": jira_fields,
-            "maxResults": sync_request.max_results_per_page
-        }
-        
-        if next_page_token:
-            payload["nextPageToken"] = next_page_token
-        
-        response = requests.post(url, json=payload, headers=headers, auth=auth)
-        response.raise_for_status()
-        
-        data = response.json()
-        issues = data.get("issues", [])
-        all_issues.extend(issues)
-        
-        # Update progress
-        progress = min(int((len(all_issues) / total_count) * 50), 50)  # 0-50% for downloading
-        background_tasks_store[task_id].update({
-            "progress": progress,
-            "message": f"Descargando issues: {len(all_issues)}/{total_count}"
-        })
-        
-        logger.info(f"Task {task_id}: Fetched {len(all_issues)}/{total_count} issues")
-        
-        # Check if there are more pages
-        next_page_token = data.get("nextPageToken")
-        if not next_page_token:
-            break
-    
-    return all_issues
 
+def cancel_task(task_id: str, reason: str) -> None:
+    _cancelled_tasks[task_id] = reason
 
-def connect_to_mysql(sync_request: JiraSyncRequest) -> mysql.connector.MySQLConnection:
-    """Create MySQL connection"""
+
+def check_task_cancelled(task_id: str) -> None:
+    """Called between pages and batches of syncs and exports; raises TaskCancelled if cancelled"""
+    reason = _cancelled_tasks.get(task_id)
+    if reason is not None:
+        raise TaskCancelled(reason)
+
+
+def ensure_jobs_table(cursor) -> None:
+    """Create the shared job table"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sync_jobs (
+        task_id VARCHAR(36) PRIMARY KEY,
+        job_type VARCHAR(20) NOT NULL,
+        payload JSON NOT NULL,
+        state JSON NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'queued',
+        attempts INT NOT NULL DEFAULT 0,
+        lease_owner VARCHAR(128) NULL,
+        lease_expires_at DATETIME(3) NULL,
+        created_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+        updated_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+        INDEX idx_status_created (status, created_at),
+        INDEX idx_status_lease (status, lease_expires_at),
+        INDEX idx_created_at (created_at)
+    )
+    """)
+
+
+def enqueue_job(task_id: str, job_type: str, payload: Dict[str, Any], state: Dict[str, Any]) -> None:
+    """Store a new job for any worker process to claim"""
+    connection = get_logs_connection()
+    cursor = connection.cursor()
     try:
-        connection = mysql.connector.connect(
-            host=sync_request.mysql_host,
-            port=sync_request.mysql_port,
-            user=sync_request.mysql_user,
-            password=sync_request.mysql_password,
-            database=sync_request.mysql_database
+        cursor.execute(
+            "INSERT INTO sync_jobs (task_id, job_type, payload, state) VALUES (%s, %s, %s, %s)",
+            (task_id, job_type, json.dumps(payload, default=str), json.dumps(state, default=str))
         )
-        return connection
-    except Error as e:
-        logger.error(f"Error connecting to MySQL: {e}")
-        raise
+        connection.commit()
+    finally:
+        cursor.close()
+        connection.close()
 
 
-def ensure_logs_table_exists(connection: mysql.connector.MySQLConnection) -> None:
-    """Ensure logs table exists for tracking sync history"""
-    cursor = connection.cursor()
-    
-    create_logs_table_sql = """
-    CREATE TABLE IF NOT EXISTS sync_logs (
-        id INT AUTO_INCREMENT PRIMARY KEY,
-        task_id VARCHAR(255) UNIQUE NOT NULL,
-        started_at TIMESTAMP NOT NULL,
-        completed_at TIMESTAMP NULL,
-        status VARCHAR(50) NOT NULL,
-        jql_query TEXT NOT NULL,
-        total_issues INT DEFAULT 0,
-        processed_issues INT DEFAULT 0,
-        error_message TEXT NULL,
-        result JSON NULL,
-        backup_file VARCHAR(255) NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        INDEX idx_task_id (task_id),
-        INDEX idx_status (status),
-        INDEX idx_started_at (started_at)
-    )
+def claim_job(connection) -> Optional[Dict[str, Any]]:
     """
+    Lease the oldest runnable job: queued, or running with an expired lease (its worker died).
     
+    SKIP LOCKED lets concurrent claimers pass over rows another process is claiming.
+    """
+    cursor = connection.cursor(dictionary=True)
     try:
-        cursor.execute(create_logs_table_sql)
+        connection.start_transaction()
+        cursor.execute("""
+            SELECT task_id, job_type, payload, state, attempts FROM sync_jobs
+            WHERE status = 'queued'
+            ORDER BY created_at LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        """)
+        job = cursor.fetchone()
+        if job is None:
+            cursor.execute("""
+                SELECT task_id, job_type, payload, state, attempts FROM sync_jobs
+                WHERE status = 'running' AND lease_expires_at < NOW(3)
+                ORDER BY lease_expires_at LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            """)
+            job = cursor.fetchone()
+        if job is None:
+            connection.commit()
+            return None
+        
+        state = json.loads(job["state"])
+        if job["attempts"] >= JOB_MAX_ATTEMPTS:
+            # Abandoned too many times (e.g. it crashes its worker); give up on it
+            state.update({
+                "status": "error",
+                "error": f"Job abandoned after {job['attempts']} attempts",
+                "completed_at": datetime.now().isoformat()
+            })
+            cursor.execute("""
+                UPDATE sync_jobs SET status = 'failed', state = %s, payload = JSON_OBJECT(),
+                       lease_owner = NULL, lease_expires_at = NULL
+                WHERE task_id = %s
+            """, (json.dumps(state, default=str), job["task_id"]))
+            connection.commit()
+            return None
+        
+        cursor.execute("""
+            UPDATE sync_jobs SET status = 'running', attempts = attempts + 1, lease_owner = %s,
+                   lease_expires_at = NOW(3) + INTERVAL %s SECOND
+            WHERE task_id = %s
+        """, (JOB_WORKER_ID, JOB_LEASE_SECONDS, job["task_id"]))
         connection.commit()
-        logger.info("Logs table ensured")
-    except Error as e:
-        logger.warning(f"Could not create logs table: {e}")
+        job["payload"] = json.loads(job["payload"])
+        job["state"] = state
+        return job
+    except Exception:
+        connection.rollback()
+        raise
     finally:
         cursor.close()
 
 
-def save_sync_log(connection: mysql.connector.MySQLConnection, task_id: str, 
-                  sync_request: JiraSyncRequest, status: str, 
-                  total_issues: int = 0, processed_issues: int = 0,
-                  error_message: str = None, result: dict = None,
-                  backup_file: str = None) -> None:
-    """Save sync task information to logs table"""
+def publish_job_state(connection, task_id: str, final_status: Optional[str] = None) -> bool:
+    """
+    Write the local task state to the job row and renew the lease.
+    
+    Returns False when this worker no longer holds the lease.
+    """
+    state = json.dumps(background_tasks_store.get(task_id, {}), default=str)
     cursor = connection.cursor()
+    try:
+        if final_status:
+            cursor.execute("""
+                UPDATE sync_jobs SET status = %s, state = %s, payload = JSON_OBJECT(),
+                       lease_owner = NULL, lease_expires_at = NULL
+                WHERE task_id = %s AND lease_owner = %s
+            """, (final_status, state, task_id, JOB_WORKER_ID))
+        else:
+            cursor.execute("""
+                UPDATE sync_jobs SET state = %s, lease_expires_at = NOW(3) + INTERVAL %s SECOND
+                WHERE task_id = %s AND lease_owner = %s
+            """, (state, JOB_LEASE_SECONDS, task_id, JOB_WORKER_ID))
+        connection.commit()
+        return cursor.rowcount > 0
+    finally:
+        cursor.close()
+
+
+def run_claimed_job(job: Dict[str, Any]) -> None:
+    """Run a leased job locally, heartbeating its state to the job row until it finishes"""
+    task_id = job["task_id"]
+    state = job["state"]
+    state.update({"status": "iniciando", "progress": 0, "processed_issues": 0, "error": None, "completed_at": None})
+    background_tasks_store[task_id] = state
+    done = threading.Event()
     
-    task_info = background_tasks_store.get(task_id, {})
+    def heartbeat():
+        # Any failure is retried on the next beat: a dead heartbeat would let the lease expire
+        # while the job keeps running, and another worker would run it a second time
+        connection = None
+        try:
+            while not done.wait(JOB_HEARTBEAT_SECONDS):
+                try:
+                    if connection is None:
+                        connection = get_logs_connection()
+                    if not publish_job_state(connection, task_id):
+                        logger.warning(f"Lost lease on job {task_id}, stopping it")
+                        cancel_task(task_id, "Se perdió el lease del job; otro worker lo retomará")
+                        return
+                except Error as e:
+                    logger.warning(f"Heartbeat failed for job {task_id}: {e}")
+                    if connection is not None:
+                        try:
+                            connection.close()
+                        except Exception:
+                            pass
+                        connection = None
+                except Exception as e:
+                    # e.g. the task's state dict changing while it is serialized
+                    logger.warning(f"Heartbeat failed for job {task_id}: {e}")
+        finally:
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
     
-    # First, try with the simpler table structure (without config column)
-    insert_log_sql = """
-    INSERT INTO sync_logs (task_id, started_at, completed_at, status, jql_query,
-                          total_issues, processed_issues, error_message, result, backup_file)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    ON DUPLICATE KEY UPDATE
-        completed_at = VALUES(completed_at),
-        status = VALUES(status),
-        total_issues = VALUES(total_issues),
-        processed_issues = VALUES(processed_issues),
-        error_message = VALUES(error_message),
-        result = VALUES(result),
-        backup_file = VALUES(backup_file)
+    heartbeat_thread = threading.Thread(target=heartbeat, daemon=True, name=f"job-heartbeat-{task_id[:8]}")
+    heartbeat_thread.start()
+    try:
+        if job["job_type"] == "export":
+            run_export_task(task_id, job["payload"])
+        else:
+            run_sync_task(task_id, job["payload"])
+    finally:
+        done.set()
+        heartbeat_thread.join()
+        _cancelled_tasks.pop(task_id, None)
+    
+    final_status = "done" if background_tasks_store[task_id]["status"] == "completado" else "failed"
+    connection = get_logs_connection()
+    try:
+        publish_job_state(connection, task_id, final_status)
+    finally:
+        connection.close()
+
+
+def job_worker_loop() -> None:
+    """Claim and run jobs from sync_jobs until the process stops"""
+    connection = None
+    while not _job_workers_stop.is_set():
+        try:
+            if connection is None or not connection.is_connected():
+                connection = get_logs_connection()
+            job = claim_job(connection)
+            if job is None:
+                _job_workers_stop.wait(JOB_POLL_SECONDS)
+                continue
+            logger.info(f"Worker {JOB_WORKER_ID} claimed {job['job_type']} job {job['task_id']} "
+                        f"(attempt {job['attempts'] + 1})")
+            run_claimed_job(job)
+        except Exception as e:
+            logger.error(f"Job worker error: {e}")
+            connection = None
+            _job_workers_stop.wait(JOB_POLL_SECONDS)
+
+
+def submit_job(task_id: str, job_type: str, payload: Dict[str, Any], local_executor: ThreadPoolExecutor,
+               local_target) -> None:
+    """Run a job in this process (local mode) or hand it to the shared MySQL queue"""
+    if JOB_QUEUE_MODE == "mysql":
+        state = background_tasks_store.pop(task_id)
+        try:
+            enqueue_job(task_id, job_type, payload, state)
+        except Error as e:
+            logger.error(f"Could not enqueue {job_type} job {task_id}: {e}")
+            raise HTTPException(status_code=503, detail=f"Job queue unavailable: {str(e)}")
+    else:
+        local_executor.submit(local_target, task_id, payload)
+
+
+def load_job_state(task_id: str) -> Optional[Dict[str, Any]]:
+    """Read a task's state from the shared job table"""
+    connection = get_logs_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT state FROM sync_jobs WHERE task_id = %s", (task_id,))
+        row = cursor.fetchone()
+        return json.loads(row[0]) if row else None
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def list_job_states(limit: int) -> List[Dict[str, Any]]:
+    """Most recent task states from the shared job table"""
+    connection = get_logs_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT state FROM sync_jobs ORDER BY created_at DESC LIMIT %s", (limit,))
+        return [json.loads(row[0]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def delete_job(task_id: str) -> bool:
+    """Remove a job row; returns whether it existed"""
+    connection = get_logs_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("DELETE FROM sync_jobs WHERE task_id = %s", (task_id,))
+        connection.commit()
+        return cursor.rowcount > 0
+    finally:
+        cursor.close()
+        connection.close()
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Create the job table and start the claiming workers when the MySQL queue is enabled"""
+    if JOB_QUEUE_MODE != "mysql":
+        return
+    
+    def bootstrap():
+        connection = get_logs_connection()
+        cursor = connection.cursor()
+        try:
+            ensure_jobs_table(cursor)
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+    
+    await run_in_threadpool(bootstrap)
+    for i in range(JOB_WORKER_CONCURRENCY):
+        threading.Thread(target=job_worker_loop, daemon=True, name=f"job-worker-{i}").start()
+    logger.info(f"Job queue worker {JOB_WORKER_ID} started with {JOB_WORKER_CONCURRENCY} slots")
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    """Stop claiming jobs; leases of jobs still running expire and other workers take them over"""
+    _job_workers_stop.set()
+
+
+# Memory admission control: every sync reserves its estimated footprint (issue count x
+# observed bytes per issue) against a process-wide budget before downloading. Jobs that
+# do not fit wait; jobs larger than the whole budget run in low-memory (chunked) mode.
+SYNC_MEMORY_BUDGET_MB = int(os.getenv("SYNC_MEMORY_BUDGET_MB", "1024"))  # 0 disables admission control
+SYNC_MEMORY_WAIT_SECONDS = int(os.getenv("SYNC_MEMORY_WAIT_SECONDS", "300"))
+SYNC_DEFAULT_BYTES_PER_ISSUE = int(os.getenv("SYNC_DEFAULT_BYTES_PER_ISSUE", str(48 * 1024)))
+# RSS rarely shrinks within a process, so a sync reusing memory freed by an earlier one shows
+# a peak delta near 0. Deltas under the noise floor are not learned from, and estimates never
+# drop below a fraction of the default, or admission control would end up admitting everything.
+SYNC_RSS_NOISE_FLOOR_MB = int(os.getenv("SYNC_RSS_NOISE_FLOOR_MB", "32"))
+SYNC_MIN_BYTES_PER_ISSUE = SYNC_DEFAULT_BYTES_PER_ISSUE // 4
+LOW_MEMORY_CHUNK_ISSUES = 1000
+_memory_admission = threading.Condition()
+_memory_reservations: Dict[str, int] = {}  # task_id -> reserved bytes
+_observed_bytes_per_issue: Dict[str, float] = {}  # mysql_table -> moving average
+_running_syncs: set = set()  # task ids between admission and release
+_shared_syncs: set = set()  # running syncs that overlapped another one (their RSS peak is not theirs alone)
+_page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def read_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _page_size
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RssSampler:
+    """Sample the process RSS in a background thread to find the peak reached during a task"""
+    
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.start_rss = read_rss_bytes()
+        self.peak_rss = self.start_rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="rss-sampler")
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+    
+    def sample(self) -> None:
+        rss = read_rss_bytes()
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+    
+    def start(self) -> "RssSampler":
+        if self.start_rss is not None:
+            self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        if not self._stop.is_set():
+            self._stop.set()
+            self.sample()
+    
+    @property
+    def peak_delta(self) -> Optional[int]:
+        if self.start_rss is None:
+            return None
+        return max(self.peak_rss - self.start_rss, 0)
+
+
+MEMORY_PROFILE_TOP_SITES = 10
+MEMORY_PROFILE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+_memory_profilers: Dict[str, "MemoryProfiler"] = {}
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+class MemoryProfiler:
     """
+    Opt-in memory profile of a task: tracemalloc and RSS figures at each stage boundary.
     
-    values = (
-        task_id,
-        task_info.get("started_at", datetime.now().isoformat()),
-        task_info.get("completed_at"),
-        status,
-        sync_request.jql,
-        total_issues,
-        processed_issues,
-        error_message,
-        json.dumps(result) if result else None,
-        backup_file
-    )
+    tracemalloc is process-wide, so the figures include tasks running at the same time;
+    it is started by the first profiled task and stopped by the last one (unless it was
+    already tracing, e.g. through PYTHONTRACEMALLOC).
+    """
+    
+    def __init__(self, top_sites: int = MEMORY_PROFILE_TOP_SITES):
+        self.top_sites = top_sites
+        self.checkpoints: List[Dict[str, Any]] = []
+        self._previous = None
+        self._started = time.perf_counter()
+    
+    def start(self) -> "MemoryProfiler":
+        global _tracemalloc_users, _tracemalloc_owned
+        with _tracemalloc_lock:
+            if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _tracemalloc_owned = True
+            _tracemalloc_users += 1
+        tracemalloc.reset_peak()
+        return self
+    
+    def checkpoint(self, stage: str) -> None:
+        """Record live and peak traced memory since the previous checkpoint, and the top allocation sites"""
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        snapshot = tracemalloc.take_snapshot().filter_traces(MEMORY_PROFILE_FILTERS)
+        if self._previous is None:
+            stats = [(stat.traceback[0], stat.size, None, stat.count) for stat in snapshot.statistics("lineno")]
+        else:
+            stats = [(stat.traceback[0], stat.size, stat.size_diff, stat.count)
+                     for stat in snapshot.compare_to(self._previous, "lineno")]
+            stats.sort(key=lambda item: item[1], reverse=True)
+        self._previous = snapshot
+        rss = read_rss_bytes()
+        self.checkpoints.append({
+            "stage": stage,
+            "elapsed_s": round(time.perf_counter() - self._started, 2),
+            "rss_mb": round(rss / (1024 * 1024), 1) if rss is not None else None,
+            "traced_mb": round(current / (1024 * 1024), 1),
+            "traced_peak_mb": round(peak / (1024 * 1024), 1),
+            "top_sites": [{
+                "site": f"{frame.filename}:{frame.lineno}",
+                "size_kb": round(size / 1024, 1),
+                "size_diff_kb": round(size_diff / 1024, 1) if size_diff is not None else None,
+                "count": count
+            } for frame, size, size_diff, count in stats[:self.top_sites]]
+        })
+    
+    def stop(self) -> None:
+        global _tracemalloc_users, _tracemalloc_owned
+        self._previous = None
+        with _tracemalloc_lock:
+            _tracemalloc_users = max(_tracemalloc_users - 1, 0)
+            if _tracemalloc_users == 0 and _tracemalloc_owned:
+                tracemalloc.stop()
+                _tracemalloc_owned = False
+    
+    def report(self) -> Dict[str, Any]:
+        peak = max(self.checkpoints, key=lambda c: c["traced_peak_mb"], default=None)
+        rss_values = [c["rss_mb"] for c in self.checkpoints if c["rss_mb"] is not None]
+        return {
+            "peak_stage": peak["stage"] if peak else None,
+            "traced_peak_mb": peak["traced_peak_mb"] if peak else None,
+            "rss_peak_mb": max(rss_values) if rss_values else None,
+            "checkpoints": self.checkpoints
+        }
+
+
+def start_memory_profile(task_id: str) -> None:
+    profiler = MemoryProfiler().start()
+    _memory_profilers[task_id] = profiler
+    profiler.checkpoint("start")
+
+
+def memory_checkpoint(task_id: str, stage: str) -> None:
+    """Snapshot memory at a stage boundary if the task is being profiled"""
+    profiler = _memory_profilers.get(task_id)
+    if profiler is not None:
+        profiler.checkpoint(stage)
+
+
+def finish_memory_profile(task_id: str) -> Optional[Dict[str, Any]]:
+    profiler = _memory_profilers.pop(task_id, None)
+    if profiler is None:
+        return None
+    profiler.stop()
+    return profiler.report()
+
+
+def get_bytes_per_issue_estimate(connection: mysql.connector.MySQLConnection, table_name: str) -> float:
+    """Bytes of memory per issue observed for a table: this process's average, else recent sync_logs"""
+    if table_name in _observed_bytes_per_issue:
+        return _observed_bytes_per_issue[table_name]
     
+    cursor = connection.cursor()
     try:
-        cursor.execute(insert_log_sql, values)
-        connection.commit()
-        logger.info(f"Saved log for task {task_id} with status {status}")
+        cursor.execute("""
+            SELECT JSON_EXTRACT(result, '$.memory.observed_bytes_per_issue') FROM sync_logs
+            WHERE mysql_table = %s AND status = 'completado'
+              AND JSON_EXTRACT(result, '$.memory.observed_bytes_per_issue') IS NOT NULL
+            ORDER BY started_at DESC LIMIT 5
+        """, (table_name,))
+        observed = [float(row[0]) for row in cursor.fetchall() if row[0] not in (None, "null")]
     except Error as e:
-        # If the simple insert fails, it might be because we need to add the config column
-        if "Unknown column" not in str(e):
-            logger.error(f"Error saving log for task {task_id}: {e}")
+        logger.warning(f"Could not read memory history for {table_name}: {e}")
+        observed = []
+    finally:
+        cursor.close()
+    
+    estimate = sum(observed) / len(observed) if observed else SYNC_DEFAULT_BYTES_PER_ISSUE
+    estimate = max(estimate, SYNC_MIN_BYTES_PER_ISSUE)
+    _observed_bytes_per_issue[table_name] = estimate
+    return estimate
+
+
+def record_bytes_per_issue(table_name: str, bytes_per_issue: float) -> None:
+    """Fold a measured footprint into the table's moving average"""
+    previous = _observed_bytes_per_issue.get(table_name)
+    average = bytes_per_issue if previous is None else 0.7 * previous + 0.3 * bytes_per_issue
+    _observed_bytes_per_issue[table_name] = max(average, SYNC_MIN_BYTES_PER_ISSUE)
+
+
+def admit_sync_memory(task_id: str, estimated_bytes: int, low_memory_bytes: int) -> str:
+    """
+    Reserve memory for a sync and return its execution mode ("full" or "low_memory").
+    
+    A job whose estimate exceeds the whole budget runs in low-memory mode right away;
+    one that fits the budget but not the current headroom waits, and falls back to
+    low-memory mode after SYNC_MEMORY_WAIT_SECONDS.
+    """
+    budget = SYNC_MEMORY_BUDGET_MB * 1024 * 1024
+    if budget <= 0:
+        with _memory_admission:
+            register_running_sync(task_id)
+        return "full"
+    
+    mode, reserve = ("full", estimated_bytes) if estimated_bytes <= budget else ("low_memory", low_memory_bytes)
+    deadline = time.monotonic() + SYNC_MEMORY_WAIT_SECONDS
+    
+    with _memory_admission:
+        while _memory_reservations and sum(_memory_reservations.values()) + reserve > budget:
+            remaining = deadline - time.monotonic()
+            if mode == "full" and remaining <= 0:
+                mode, reserve = "low_memory", low_memory_bytes
+                continue
+            reserved_mb = sum(_memory_reservations.values()) // (1024 * 1024)
+            background_tasks_store[task_id].update({
+                "status": "en_espera_memoria",
+                "message": f"Esperando memoria: requiere {reserve // (1024 * 1024)} MB, "
+                           f"en uso {reserved_mb}/{SYNC_MEMORY_BUDGET_MB} MB"
+            })
+            _memory_admission.wait(timeout=max(min(remaining, 5), 0.5))
+        _memory_reservations[task_id] = reserve
+        register_running_sync(task_id)
+    
+    logger.info(f"Task {task_id}: admitted in {mode} mode, reserved {reserve // (1024 * 1024)} MB")
+    return mode
+
+
+def register_running_sync(task_id: str) -> None:
+    """Track an admitted sync (call with _memory_admission held); overlapping syncs are marked shared"""
+    _running_syncs.add(task_id)
+    if len(_running_syncs) > 1:
+        _shared_syncs.update(_running_syncs)
+
+
+def release_sync_memory(task_id: str) -> bool:
+    """
+    Return a task's reservation to the budget and wake waiting tasks.
+    
+    Returns True when no other sync ran at any point since the task was admitted,
+    i.e. when the process RSS peak measured meanwhile belongs to this task alone.
+    """
+    with _memory_admission:
+        _running_syncs.discard(task_id)
+        ran_alone = task_id not in _shared_syncs
+        _shared_syncs.discard(task_id)
+        if _memory_reservations.pop(task_id, None) is not None:
+            _memory_admission.notify_all()
+    return ran_alone
+
+
+def merge_summary_counts(total: Dict[str, Dict[str, int]], part: Optional[Dict[str, Dict[str, int]]]) -> None:
+    """Add per-chunk summaries of the form {name: {counter: n}} into a running total"""
+    for name, counters in (part or {}).items():
+        target = total.setdefault(name, {})
+        for counter, value in counters.items():
+            target[counter] = target.get(counter, 0) + value
+
+
+def sync_issues_in_chunks(connection: mysql.connector.MySQLConnection, sync_request: JiraSyncRequest,
+                          total_count: int, task_id: str, backup_tee: Optional["BackupTee"] = None) -> Dict[str, Any]:
+    """
+    Low-memory execution: download, expand and upsert LOW_MEMORY_CHUNK_ISSUES issues at a time.
+    
+    Only one chunk of issues is held in memory; stage timings accumulate across chunks.
+    """
+    downloaded = synced = 0
+    subresource_summary: Dict[str, Dict[str, int]] = {}
+    list_field_summary: Dict[str, Dict[str, int]] = {}
+    table_ready = False
+    pages = iter_issue_pages(sync_request)
+    
+    while True:
+        chunk: List[Dict[str, Any]] = []
+        with track_stage(task_id, "download") as stage:
+            for page, page_bytes in pages:
+                check_task_cancelled(task_id)
+                chunk.extend(page)
+                stage["bytes"] += page_bytes
+                if len(chunk) >= LOW_MEMORY_CHUNK_ISSUES:
+                    break
+            stage["rows"] = len(chunk)
+        if not chunk:
+            break
+        downloaded += len(chunk)
+        
+        if sync_request.expand_subresources:
+            with track_stage(task_id, "expand") as stage:
+                merge_summary_counts(subresource_summary,
+                                     expand_subresources(connection, sync_request, chunk, task_id, stage))
+        
+        if not table_ready:
+            with track_stage(task_id, "schema"):
+                ensure_table_exists(connection, sync_request, chunk)
+            table_ready = True
+        
+        background_tasks_store[task_id]["status"] = "sincronizando"
+        with track_stage(task_id, "upsert") as stage:
+            chunk_synced = sync_issues_to_database_with_progress(
+                connection, sync_request, chunk, task_id,
+                done_before=synced, overall_total=max(total_count, downloaded),
+                progress_base=0, progress_span=100, backup_tee=backup_tee
+            )
+            stage["rows"] = chunk_synced
+            synced += chunk_synced
+            if sync_request.normalize_list_fields:
+                merge_summary_counts(list_field_summary, sync_list_field_tables(connection, sync_request, chunk))
+        
+        logger.info(f"Task {task_id}: Modo de baja memoria - {synced}/{total_count} issues sincronizados")
+    
+    if not table_ready:
+        ensure_table_exists(connection, sync_request, [])
+    
+    return {
+        "downloaded": downloaded,
+        "synced": synced,
+        "subresources": subresource_summary or None,
+        "list_fields": list_field_summary or None
+    }
+
+
+# Write-behind progress: running tasks are registered with the MySQL settings of the
+# database holding their sync_logs row; a single flusher thread persists progress, stage
+# and counters of all of them every PROGRESS_FLUSH_INTERVAL seconds, one UPDATE per database.
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "5"))
+PROGRESS_STALE_SECONDS = int(os.getenv("PROGRESS_STALE_SECONDS", "120"))
+TERMINAL_TASK_STATUSES = ("completado", "error", "interrumpido")
+_progress_targets: Dict[str, Optional[tuple]] = {}  # task_id -> connection settings (None: env database)
+_progress_targets_lock = threading.Lock()
+_progress_connections: Dict[Optional[tuple], Any] = {}
+_progress_flusher_stop = threading.Event()
+
+
+def register_progress_task(task_id: str, sync_request: Optional[JiraSyncRequest] = None) -> None:
+    """Have the flusher persist a task's progress to the sync_logs of its database"""
+    target = None
+    if sync_request is not None:
+        target = (sync_request.mysql_host, sync_request.mysql_port, sync_request.mysql_user,
+                  sync_request.mysql_password, sync_request.mysql_database)
+    with _progress_targets_lock:
+        _progress_targets[task_id] = target
+
+
+def unregister_progress_task(task_id: str) -> None:
+    with _progress_targets_lock:
+        _progress_targets.pop(task_id, None)
+
+
+def get_progress_connection(target: Optional[tuple]):
+    """Cached connection of the flusher for one logs database"""
+    connection = _progress_connections.get(target)
+    if connection is None or not connection.is_connected():
+        if target is None:
+            connection = get_logs_connection()
         else:
-            # Try to add the config column
-            try:
-                alter_sql = "ALTER TABLE sync_logs ADD COLUMN config JSON NULL AFTER jql_query"
-                cursor.execute(alter_sql)
-                connection.commit()
-                logger.info("Added config column to sync_logs table")
-                
-                # Now try with config
-                config_data = {
-                    "jira_domain": sync_request.jira_domain,
-                    "jira_email": sync_request.jira_email,
-                    "jql": sync_request.jql,
-                    "fields": sync_request.fields,
-                    "mysql_host": sync_request.mysql_host,
-                    "mysql_port": sync_request.mysql_port,
-                    "mysql_database": sync_request.mysql_database,
-                    "mysql_table": sync_request.mysql_table,
-                    "max_results_per_page": sync_request.max_results_per_page
-                }
-                
-                insert_with_config_sql = """
-                INSERT INTO sync_logs (task_id, started_at, completed_at, status, jql_query, config,
-                                      total_issues, processed_issues, error_message, result, backup_file)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    completed_at = VALUES(completed_at),
-                    status = VALUES(status),
-                    config = VALUES(config),
-                    total_issues = VALUES(total_issues),
-                    processed_issues = VALUES(processed_issues),
-                    error_message = VALUES(error_message),
-                    result = VALUES(result),
-                    backup_file = VALUES(backup_file)
-                """
-                
-                values_with_config = (
-                    task_id,
-                    task_info.get("started_at", datetime.now().isoformat()),
-                    task_info.get("completed_at"),
-                    status,
-                    sync_request.jql,
-                    json.dumps(config_data),
-                    total_issues,
-                    processed_issues,
-                    error_message,
-                    json.dumps(result) if result else None,
-                    backup_file
-                )
-                
-                cursor.execute(insert_with_config_sql, values_with_config)
-                connection.commit()
-                logger.info(f"Saved log with config for task {task_id}")
-            except Error as e2:
-                logger.error(f"Error adding config column or saving log: {e2}")
+            host, port, user, password, database = target
+            connection = db_instrumentation.connect(host=host, port=port, user=user,
+                                                 password=password, database=database)
+        _progress_connections[target] = connection
+    return connection
+
+
+def flush_progress_batch(connection, snapshots: List[Dict[str, Any]]) -> int:
+    """Persist several tasks' progress with one UPDATE ... CASE statement"""
+    columns = {
+        "status": "status",
+        "stage": "stage",
+        "progress": "progress",
+        "processed_issues": "processed_issues",
+        "total_issues": "total_issues",
+        "status_message": "message"
+    }
+    assignments, params = [], []
+    for column, key in columns.items():
+        cases = " ".join(["WHEN %s THEN %s"] * len(snapshots))
+        assignments.append(f"{column} = CASE task_id {cases} ELSE {column} END")
+        for snapshot in snapshots:
+            value = snapshot.get(key)
+            if key == "message" and value:
+                value = str(value)[:500]
+            params.extend([snapshot["id"], value])
+    task_ids = [snapshot["id"] for snapshot in snapshots]
+    placeholders = ", ".join(["%s"] * len(task_ids))
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"""
+            UPDATE sync_logs SET {', '.join(assignments)}, heartbeat_at = NOW()
+            WHERE task_id IN ({placeholders}) AND status NOT IN ('completado', 'error', 'interrumpido')
+        """, params + task_ids)
+        connection.commit()
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def flush_progress_once() -> None:
+    """Write the current progress of every registered running task, grouped by database"""
+    with _progress_targets_lock:
+        targets = dict(_progress_targets)
+    
+    groups: Dict[Optional[tuple], List[Dict[str, Any]]] = {}
+    for task_id, target in targets.items():
+        task_info = background_tasks_store.get(task_id)
+        if task_info is None or task_info.get("status") in TERMINAL_TASK_STATUSES:
+            continue
+        groups.setdefault(target, []).append({
+            "id": task_id,
+            "status": task_info.get("status"),
+            "stage": task_info.get("stage"),
+            "progress": task_info.get("progress", 0),
+            "processed_issues": task_info.get("processed_issues", 0),
+            "total_issues": task_info.get("total_issues", 0),
+            "message": task_info.get("message")
+        })
+    
+    for target, snapshots in groups.items():
+        try:
+            flush_progress_batch(get_progress_connection(target), snapshots)
+        except Error as e:
+            logger.warning(f"Could not flush progress of {len(snapshots)} task(s): {e}")
+            _progress_connections.pop(target, None)
+
+
+def progress_flusher_loop() -> None:
+    """Flush progress periodically; also sweep orphans left by processes that died recently"""
+    last_recovery = time.monotonic()
+    while not _progress_flusher_stop.wait(PROGRESS_FLUSH_INTERVAL):
+        try:
+            flush_progress_once()
+            if time.monotonic() - last_recovery >= PROGRESS_STALE_SECONDS:
+                last_recovery = time.monotonic()
+                recover_orphaned_sync_logs(get_progress_connection(None))
+        except Exception as e:
+            logger.error(f"Progress flusher error: {e}")
+            _progress_connections.pop(None, None)
+
+
+def recover_orphaned_sync_logs(connection: mysql.connector.MySQLConnection) -> int:
+    """Mark tasks whose progress has not been flushed for PROGRESS_STALE_SECONDS as interrupted"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            UPDATE sync_logs
+            SET status = 'interrumpido',
+                completed_at = NOW(),
+                error_message = COALESCE(error_message, 'Tarea interrumpida: el proceso que la ejecutaba se detuvo')
+            WHERE status NOT IN ('completado', 'error', 'interrumpido')
+              AND COALESCE(heartbeat_at, started_at) < NOW() - INTERVAL %s SECOND
+        """, (PROGRESS_STALE_SECONDS,))
+        connection.commit()
+        if cursor.rowcount:
+            logger.warning(f"Marked {cursor.rowcount} orphaned task(s) in sync_logs as interrumpido")
+            invalidate_log_totals()
+        return cursor.rowcount
     finally:
         cursor.close()
 
 
-async def generate_backup(task_id: str, config: JiraSyncRequest, table_name: str, total_issues: int):
-    """Generar un archivo SQL de respaldo de la tabla sincronizada"""
+@app.on_event("startup")
+async def start_progress_flusher():
+    """Start the write-behind progress flusher"""
+    threading.Thread(target=progress_flusher_loop, daemon=True, name="progress-flusher").start()
+
+
+@app.on_event("shutdown")
+async def stop_progress_flusher():
+    """Write the last progress snapshot before exiting"""
+    _progress_flusher_stop.set()
+    await run_in_threadpool(flush_progress_once)
+
+
+@app.on_event("shutdown")
+async def flush_trace_spans():
+    """Export the spans still queued"""
+    await run_in_threadpool(tracing.shutdown)
+
+
+@contextmanager
+def track_stage(task_id: str, stage: str):
+    """
+    Time a stage of a sync task and accumulate it in the task's timings.
+
+    Yields a dict where the stage body can report the bytes transferred and
+    rows handled; wall time, CPU time of the worker thread and rows/s are
+    computed when the stage ends. Repeated stages (e.g. log writes) add up.
+    """
+    stats = {"bytes": 0, "rows": 0}
+    if task_id in background_tasks_store:
+        background_tasks_store[task_id]["stage"] = stage
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    stage_span = tracing.span(f"stage.{stage}", {"task.id": task_id}, trace_id=task_id)
+    log_token = logging_setup.bind_log_context(stage=stage)
+    try:
+        with stage_span:
+            yield stats
+    finally:
+        logging_setup.unbind_log_context(log_token)
+        wall_seconds = time.perf_counter() - wall_start
+        cpu_seconds = time.thread_time() - cpu_start
+        stage_span.set_attributes({"bytes": stats["bytes"], "rows": stats["rows"]})
+        task_info = background_tasks_store.get(task_id)
+        if task_info is not None:
+            timings = task_info.setdefault("timings", {})
+            entry = timings.setdefault(stage, {
+                "calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0,
+                "bytes": 0, "rows": 0, "rows_per_sec": None
+            })
+            entry["calls"] += 1
+            entry["wall_ms"] = round(entry["wall_ms"] + wall_seconds * 1000, 2)
+            entry["cpu_ms"] = round(entry["cpu_ms"] + cpu_seconds * 1000, 2)
+            entry["bytes"] += stats["bytes"]
+            entry["rows"] += stats["rows"]
+            if entry["rows"] and entry["wall_ms"] > 0:
+                entry["rows_per_sec"] = round(entry["rows"] / (entry["wall_ms"] / 1000), 2)
+
+
+def sync_jira_issues_background(task_id: str, sync_request_dict: dict):
+    """
+    Synchronize Jira issues to MySQL database with progress tracking
+    """
+    try:
+        # Recreate the request object
+        sync_request = JiraSyncRequest(**sync_request_dict)
+        if sync_request.profile_memory:
+            start_memory_profile(task_id)
+        
+        # Step 1: Get approximate count of issues
+        background_tasks_store[task_id]["status"] = "obteniendo_total"
+        background_tasks_store[task_id]["message"] = "Obteniendo cantidad total de issues..."
+        
+        with track_stage(task_id, "count") as stage:
+            issue_count = get_issue_count(sync_request, stage)
+        background_tasks_store[task_id]["total_issues"] = issue_count
+        background_tasks_store[task_id]["message"] = f"Se encontraron {issue_count} issues"
+        
+        # Step 2: Connect to MySQL
+        background_tasks_store[task_id]["status"] = "conectando_db"
+        background_tasks_store[task_id]["message"] = "Conectando a MySQL..."
+        with track_stage(task_id, "connect"):
+            connection = connect_to_mysql(sync_request)
+        
+        with track_stage(task_id, "log_writes"):
+            # Ensure logs table exists
+            ensure_logs_table_exists(connection)
+            
+            # Tasks abandoned by a crashed process stay "in progress" without this
+            recover_orphaned_sync_logs(connection)
+            
+            # Save initial log entry
+            save_sync_log(connection, task_id, sync_request, "iniciando", issue_count)
+        register_progress_task(task_id, sync_request)
+        
+        # Step 2b: Reserve memory for the issues this sync will hold
+        bytes_per_issue = get_bytes_per_issue_estimate(connection, sync_request.mysql_table)
+        estimated_bytes = int(issue_count * bytes_per_issue)
+        execution_mode = admit_sync_memory(task_id, estimated_bytes,
+                                           int(LOW_MEMORY_CHUNK_ISSUES * bytes_per_issue * 2))
+        rss_sampler = RssSampler().start()
+        backup_tee = BackupTee(task_id, sync_request, issue_count) if sync_request.backup_mode == "tee" else None
+        
+        if execution_mode == "low_memory":
+            # Step 3-5 interleaved: one chunk of issues in memory at a time
+            background_tasks_store[task_id]["status"] = "descargando"
+            background_tasks_store[task_id]["message"] = "Sincronizando por bloques (modo de baja memoria)..."
+            chunked = sync_issues_in_chunks(connection, sync_request, issue_count, task_id, backup_tee)
+            memory_checkpoint(task_id, "chunked_sync")
+            downloaded_count = chunked["downloaded"]
+            synced_count = chunked["synced"]
+            subresource_summary = chunked["subresources"]
+            list_field_summary = chunked["list_fields"]
+        else:
+            # Step 3: Fetch all issues with pagination and progress tracking
+            background_tasks_store[task_id]["status"] = "descargando"
+            background_tasks_store[task_id]["message"] = "Descargando issues de Jira..."
+            
+            with track_stage(task_id, "download") as stage:
+                all_issues = fetch_all_issues_with_progress(sync_request, issue_count, task_id, stage)
+                stage["rows"] = len(all_issues)
+            downloaded_count = len(all_issues)
+            memory_checkpoint(task_id, "download")
+            
+            # Step 3b: Optionally expand changelogs, comments and worklogs into child tables
+            subresource_summary = None
+            if sync_request.expand_subresources:
+                background_tasks_store[task_id]["status"] = "expandiendo"
+                background_tasks_store[task_id]["message"] = "Descargando historial, comentarios y worklogs..."
+                with track_stage(task_id, "expand") as stage:
+                    subresource_summary = expand_subresources(connection, sync_request, all_issues, task_id, stage)
+                memory_checkpoint(task_id, "expand")
+            
+            # Step 4: Ensure table exists
+            background_tasks_store[task_id]["status"] = "preparando_tabla"
+            background_tasks_store[task_id]["message"] = "Preparando tabla en MySQL..."
+            with track_stage(task_id, "schema"):
+                ensure_table_exists(connection, sync_request, all_issues)
+            memory_checkpoint(task_id, "schema")
+            
+            # Step 5: Sync issues to database
+            background_tasks_store[task_id]["status"] = "sincronizando"
+            background_tasks_store[task_id]["message"] = "Sincronizando issues a la base de datos..."
+            
+            with track_stage(task_id, "upsert") as stage:
+                synced_count = sync_issues_to_database_with_progress(
+                    connection, sync_request, all_issues, task_id, backup_tee=backup_tee
+                )
+                stage["rows"] = synced_count
+                
+                list_field_summary = None
+                if sync_request.normalize_list_fields:
+                    background_tasks_store[task_id]["message"] = "Actualizando tablas de valores de listas..."
+                    list_field_summary = sync_list_field_tables(connection, sync_request, all_issues)
+            memory_checkpoint(task_id, "upsert")
+            
+            del all_issues
+            memory_checkpoint(task_id, "issues_released")
+        
+        rss_sampler.stop()
+        ran_alone = release_sync_memory(task_id)
+        memory_report = {
+            "mode": execution_mode,
+            "estimated_mb": round(estimated_bytes / (1024 * 1024), 1),
+            "bytes_per_issue_estimate": int(bytes_per_issue),
+            "start_rss_mb": round(rss_sampler.start_rss / (1024 * 1024), 1) if rss_sampler.start_rss else None,
+            "peak_rss_mb": round(rss_sampler.peak_rss / (1024 * 1024), 1) if rss_sampler.peak_rss else None,
+            "peak_delta_mb": round(rss_sampler.peak_delta / (1024 * 1024), 1) if rss_sampler.peak_delta is not None else None,
+            "observed_bytes_per_issue": None,
+            "shared_bytes_per_issue": None
+        }
+        # Only full-mode runs show the footprint of holding every issue at once. RSS is
+        # process-wide: with other syncs running, the peak includes theirs, so that figure is
+        # reported apart and kept out of the moving average and of sync_logs' estimates.
+        # A delta under the noise floor only means freed memory was reused; it is not learned.
+        if (execution_mode == "full" and downloaded_count and rss_sampler.peak_delta
+                and rss_sampler.peak_delta >= SYNC_RSS_NOISE_FLOOR_MB * 1024 * 1024):
+            bytes_per_issue_seen = int(rss_sampler.peak_delta / downloaded_count)
+            if ran_alone:
+                memory_report["observed_bytes_per_issue"] = bytes_per_issue_seen
+                record_bytes_per_issue(sync_request.mysql_table, bytes_per_issue_seen)
+            else:
+                memory_report["shared_bytes_per_issue"] = bytes_per_issue_seen
+        
+        # Step 6: Generate backup SQL file
+        background_tasks_store[task_id]["status"] = "generando_respaldo"
+        background_tasks_store[task_id]["message"] = "Generando archivo de respaldo SQL..."
+        logger.debug(f"Task {task_id}: Iniciando generación de backup...")
+        
+        with track_stage(task_id, "backup") as stage:
+            # The tee already holds the rows of this run; it falls back to a full re-read when unusable
+            backup_filename = backup_tee.finish() if backup_tee else None
+            backup_mode = "tee" if backup_filename else "reread"
+            if backup_filename is None:
+                backup_filename = generate_backup(task_id, sync_request, sync_request.mysql_table, issue_count)
+            stage["bytes"] = background_tasks_store[task_id].get("backup_size", 0) if backup_filename else 0
+            stage["rows"] = background_tasks_store[task_id].get("backup_rows", 0) if backup_filename else 0
+        
+        memory_checkpoint(task_id, "backup")
+        memory_profile = finish_memory_profile(task_id)
+        if memory_profile is not None:
+            memory_report["profile"] = memory_profile
+        
+        # Generate download URL for backup
+        backup_url = f"/backups/{backup_filename}" if backup_filename else None
+        
+        # Save final log entry
+        result_data = {
+            "total_issues": downloaded_count,
+            "synced_issues": synced_count,
+            "approximate_count": issue_count,
+            "backup_file": backup_filename,
+            "backup_url": backup_url,
+            "backup_mode": backup_mode,
+            "mysql_table": sync_request.mysql_table,
+            "subresources": subresource_summary,
+            "list_fields": list_field_summary,
+            "memory": memory_report,
+            "timings": background_tasks_store[task_id].get("timings", {}),
+            "statements": background_tasks_store[task_id].get("statements", {}),
+            "row_errors": background_tasks_store[task_id].get("row_errors") or None
+        }
+        with track_stage(task_id, "log_writes"):
+            save_sync_log(connection, task_id, sync_request, "completado", 
+                         downloaded_count, synced_count, None, result_data, backup_filename)
+        
+        # Close connection
+        connection.close()
+        
+        # Update final status
+        background_tasks_store[task_id].update({
+            "status": "completado",
+            "progress": 100,
+            "processed_issues": synced_count,
+            "message": f"Sincronización completada: {synced_count} issues procesados. Backup: {backup_filename}",
+            "completed_at": datetime.now().isoformat(),
+            "result": result_data,
+            "backup_file": backup_filename,
+            "backup_url": backup_url
+        })
+        
+        logger.info(f"Task {task_id}: Sincronización completada exitosamente con backup: {backup_filename}")
+        
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error during sync task {task_id}: {str(e)}")
+        if 'backup_tee' in locals() and backup_tee:
+            backup_tee.discard()
+        
+        # Try to save error log if connection exists
+        try:
+            if 'connection' in locals() and connection:
+                error_result = {"timings": background_tasks_store[task_id].get("timings", {}),
+                                "statements": background_tasks_store[task_id].get("statements", {})}
+                memory_profile = finish_memory_profile(task_id)
+                if memory_profile is not None:
+                    error_result["memory"] = {"profile": memory_profile}
+                save_sync_log(connection, task_id, sync_request, "error", 
+                            0, 0, str(e), error_result, None)
+                connection.close()
+        except:
+            pass
+        
+        background_tasks_store[task_id].update({
+            "status": "error",
+            "error": str(e),
+            "message": f"Error: {str(e)}",
+            "completed_at": datetime.now().isoformat()
+        })
+        raise
+    finally:
+        if 'rss_sampler' in locals():
+            rss_sampler.stop()
+        release_sync_memory(task_id)
+        finish_memory_profile(task_id)
+        unregister_progress_task(task_id)
+
+
+def get_issue_count(sync_request: JiraSyncRequest, stage_stats: Optional[Dict[str, int]] = None) -> int:
+    """Get approximate count of issues matching the JQL"""
+    url = f"https://{sync_request.jira_domain}/rest/api/3/search/approximate-count"
+    auth = HTTPBasicAuth(sync_request.jira_email, sync_request.jira_api_token)
+    headers = {
+        "Accept": "application/json",
+        "Content-Type": "application/json"
+    }
+    payload = {"jql": sync_request.jql}
+    
+    response = requests.post(url, json=payload, headers=headers, auth=auth)
+    response.raise_for_status()
+    
+    if stage_stats is not None:
+        stage_stats["bytes"] += len(response.content)
+    
+    return response.json().get("count", 0)
+
+
+def updated_field_added(sync_request: JiraSyncRequest) -> bool:
+    """Whether the search adds `updated` on its own: sub-resource expansion needs it to skip unchanged issues"""
+    requested = list(sync_request.fields.keys()) if isinstance(sync_request.fields, dict) else sync_request.fields
+    # "*all" / "*navigable" already include it
+    return bool(sync_request.expand_subresources) and "updated" not in requested \
+        and not any(field.startswith("*") for field in requested)
+
+
+def iter_issue_pages(sync_request: JiraSyncRequest):
+    """Yield (issues, response_bytes) for each page of the JQL search, following nextPageToken"""
+    next_page_token = None
+    
+    url = f"https://{sync_request.jira_domain}/rest/api/3/search/jql"
+    auth = HTTPBasicAuth(sync_request.jira_email, sync_request.jira_api_token)
+    headers = {
+        "Accept": "application/json",
+        "Content-Type": "application/json"
+    }
+    
+    # Extract field names for Jira API
+    if isinstance(sync_request.fields, dict):
+        jira_fields = list(sync_request.fields.keys())
+    else:
+        jira_fields = sync_request.fields
+    if updated_field_added(sync_request):
+        jira_fields = jira_fields + ["updated"]
+    
+    page_number = 0
+    while True:
+        payload = {
+            "jql": sync_request.jql,
+            "fields": jira_fields,
+            "maxResults": sync_request.max_results_per_page
+        }
+        
+        if next_page_token:
+            payload["nextPageToken"] = next_page_token
+        
+        # The span covers the request only, not the consumer's work between pages
+        page_number += 1
+        with tracing.span("jira.page", {"page": page_number}) as page_span:
+            response = requests.post(url, json=payload, headers=headers, auth=auth)
+            page_span.set_attributes({"http.status_code": response.status_code, "bytes": len(response.content)})
+            response.raise_for_status()
+            
+            data = response.json()
+            page_span.set_attribute("rows", len(data.get("issues", [])))
+        yield data.get("issues", []), len(response.content)
+        
+        # Check if there are more pages
+        next_page_token = data.get("nextPageToken")
+        if not next_page_token:
+            break
+
+
+def fetch_all_issues_with_progress(sync_request: JiraSyncRequest, total_count: int, task_id: str,
+                                         stage_stats: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+    """Fetch all issues using pagination with progress tracking"""
+    all_issues = []
+    log_throttle = logging_setup.LogThrottle()
+    
+    for issues, page_bytes in iter_issue_pages(sync_request):
+        check_task_cancelled(task_id)
+        if stage_stats is not None:
+            stage_stats["bytes"] += page_bytes
+        
+        all_issues.extend(issues)
+        
+        # Update progress
+        progress = min(int((len(all_issues) / total_count) * 50), 50) if total_count else 0  # 0-50% for downloading
+        background_tasks_store[task_id].update({
+            "progress": progress,
+            "message": f"Descargando issues: {len(all_issues)}/{total_count}"
+        })
+        
+        if log_throttle.ready():
+            logger.info(f"Task {task_id}: Fetched {len(all_issues)}/{total_count} issues")
+    
+    logger.info(f"Task {task_id}: Fetched {len(all_issues)}/{total_count} issues")
+    return all_issues
+
+
+_jira_thread_local = threading.local()
+
+
+def get_jira_session() -> requests.Session:
+    """Return a requests session owned by the current thread (sessions are not thread-safe)"""
+    session = getattr(_jira_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _jira_thread_local.session = session
+    return session
+
+
+def jira_request_with_retry(method: str, url: str, auth: HTTPBasicAuth, **kwargs) -> requests.Response:
+    """Perform a Jira request, backing off on rate limiting (429) and transient 503 responses"""
+    session = get_jira_session()
+    with tracing.span("jira.request", {"http.method": method, "http.url": url.split("?", 1)[0]}) as request_span:
+        for attempt in range(SUBRESOURCE_MAX_RETRIES + 1):
+            response = session.request(method, url, auth=auth, **kwargs)
+            if response.status_code not in (429, 503) or attempt == SUBRESOURCE_MAX_RETRIES:
+                request_span.set_attributes({"http.status_code": response.status_code, "retries": attempt,
+                                             "bytes": len(response.content)})
+                response.raise_for_status()
+                return response
+            retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+            logger.warning(f"Jira respondió {response.status_code} en {url}, reintentando en {delay}s")
+            time.sleep(delay)
+
+
+def ensure_subresource_tables(connection: mysql.connector.MySQLConnection, table_name: str,
+                              resources: List[str]) -> None:
+    """Create the child tables (keyed by issue key) and the fetch-state table for sub-resources"""
+    cursor = connection.cursor()
+    
+    ddl = {
+        "state": f"""
+        CREATE TABLE IF NOT EXISTS `{table_name}_subresource_state` (
+            issue_key VARCHAR(255) NOT NULL,
+            resource VARCHAR(20) NOT NULL,
+            issue_updated VARCHAR(64) NULL,
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (issue_key, resource)
+        )
+        """,
+        "changelog": f"""
+        CREATE TABLE IF NOT EXISTS `{table_name}_changelog` (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            issue_key VARCHAR(255) NOT NULL,
+            history_id VARCHAR(64) NOT NULL,
+            author_account_id VARCHAR(128) NULL,
+            author_name VARCHAR(255) NULL,
+            created VARCHAR(64) NULL,
+            field VARCHAR(255) NULL,
+            field_id VARCHAR(255) NULL,
+            from_value TEXT NULL,
+            from_string TEXT NULL,
+            to_value TEXT NULL,
+            to_string TEXT NULL,
+            INDEX idx_issue_key (issue_key),
+            INDEX idx_field_created (field, created)
+        )
+        """,
+        "comments": f"""
+        CREATE TABLE IF NOT EXISTS `{table_name}_comments` (
+            comment_id VARCHAR(64) PRIMARY KEY,
+            issue_key VARCHAR(255) NOT NULL,
+            author_account_id VARCHAR(128) NULL,
+            author_name VARCHAR(255) NULL,
+            created VARCHAR(64) NULL,
+            updated VARCHAR(64) NULL,
+            body JSON NULL,
+            INDEX idx_issue_key (issue_key)
+        )
+        """,
+        "worklogs": f"""
+        CREATE TABLE IF NOT EXISTS `{table_name}_worklogs` (
+            worklog_id VARCHAR(64) PRIMARY KEY,
+            issue_key VARCHAR(255) NOT NULL,
+            author_account_id VARCHAR(128) NULL,
+            author_name VARCHAR(255) NULL,
+            started VARCHAR(64) NULL,
+            time_spent_seconds INT NULL,
+            created VARCHAR(64) NULL,
+            updated VARCHAR(64) NULL,
+            comment JSON NULL,
+            INDEX idx_issue_key (issue_key)
+        )
+        """
+    }
+    
+    try:
+        execute_ddl(cursor, ddl["state"])
+        for resource in resources:
+            execute_ddl(cursor, ddl[resource])
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def get_subresource_state(connection: mysql.connector.MySQLConnection, table_name: str,
+                          issue_keys: List[str]) -> Dict[tuple, Optional[str]]:
+    """Return {(issue_key, resource): issue_updated} recorded for the given issues"""
+    cursor = connection.cursor()
+    state = {}
+    try:
+        for start in range(0, len(issue_keys), 1000):
+            chunk = issue_keys[start:start + 1000]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"SELECT issue_key, resource, issue_updated FROM `{table_name}_subresource_state` "
+                f"WHERE issue_key IN ({placeholders})",
+                chunk
+            )
+            for issue_key, resource, issue_updated in cursor.fetchall():
+                state[(issue_key, resource)] = issue_updated
+    finally:
+        cursor.close()
+    return state
+
+
+def fetch_changelogs_bulk(sync_request: JiraSyncRequest, issues: List[Dict[str, Any]]) -> Dict[str, List[tuple]]:
+    """Fetch changelogs of up to 1000 issues per call through the bulk changelog API"""
+    url = f"https://{sync_request.jira_domain}/rest/api/3/changelog/bulkfetch"
+    auth = HTTPBasicAuth(sync_request.jira_email, sync_request.jira_api_token)
+    headers = {"Accept": "application/json", "Content-Type": "application/json"}
+    
+    key_by_id = {str(issue.get("id")): issue.get("key") for issue in issues}
+    rows_by_issue: Dict[str, List[tuple]] = {issue.get("key"): [] for issue in issues}
+    next_page_token = None
+    
+    while True:
+        payload = {"issueIdsOrKeys": [issue.get("key") for issue in issues], "maxResults": 1000}
+        if next_page_token:
+            payload["nextPageToken"] = next_page_token
+        data = jira_request_with_retry("POST", url, auth, json=payload, headers=headers).json()
+        
+        for issue_log in data.get("issueChangeLogs", []):
+            issue_key = key_by_id.get(str(issue_log.get("issueId")), issue_log.get("issueId"))
+            for history in issue_log.get("changeHistories", []):
+                author = history.get("author") or {}
+                for item in history.get("items", []):
+                    rows_by_issue.setdefault(issue_key, []).append((
+                        issue_key,
+                        str(history.get("id")),
+                        author.get("accountId"),
+                        author.get("displayName"),
+                        history.get("created"),
+                        item.get("field"),
+                        item.get("fieldId"),
+                        item.get("from"),
+                        item.get("fromString"),
+                        item.get("to"),
+                        item.get("toString")
+                    ))
+        
+        next_page_token = data.get("nextPageToken")
+        if not next_page_token:
+            break
+    
+    return rows_by_issue
+
+
+def fetch_issue_comments(sync_request: JiraSyncRequest, issue_key: str) -> List[tuple]:
+    """Fetch every comment of an issue"""
+    url = f"https://{sync_request.jira_domain}/rest/api/3/issue/{issue_key}/comment"
+    auth = HTTPBasicAuth(sync_request.jira_email, sync_request.jira_api_token)
+    rows = []
+    start_at = 0
+    
+    while True:
+        data = jira_request_with_retry(
+            "GET", url, auth,
+            params={"startAt": start_at, "maxResults": 100},
+            headers={"Accept": "application/json"}
+        ).json()
+        comments = data.get("comments", [])
+        for comment in comments:
+            author = comment.get("author") or {}
+            rows.append((
+                str(comment.get("id")),
+                issue_key,
+                author.get("accountId"),
+                author.get("displayName"),
+                comment.get("created"),
+                comment.get("updated"),
+                json.dumps(comment.get("body")) if comment.get("body") is not None else None
+            ))
+        start_at += len(comments)
+        if not comments or start_at >= data.get("total", 0):
+            break
+    
+    return rows
+
+
+def fetch_issue_worklogs(sync_request: JiraSyncRequest, issue_key: str) -> List[tuple]:
+    """Fetch every worklog of an issue"""
+    url = f"https://{sync_request.jira_domain}/rest/api/3/issue/{issue_key}/worklog"
+    auth = HTTPBasicAuth(sync_request.jira_email, sync_request.jira_api_token)
+    rows = []
+    start_at = 0
+    
+    while True:
+        data = jira_request_with_retry(
+            "GET", url, auth,
+            params={"startAt": start_at, "maxResults": 1000},
+            headers={"Accept": "application/json"}
+        ).json()
+        worklogs = data.get("worklogs", [])
+        for worklog in worklogs:
+            author = worklog.get("author") or {}
+            rows.append((
+                str(worklog.get("id")),
+                issue_key,
+                author.get("accountId"),
+                author.get("displayName"),
+                worklog.get("started"),
+                worklog.get("timeSpentSeconds"),
+                worklog.get("created"),
+                worklog.get("updated"),
+                json.dumps(worklog.get("comment")) if worklog.get("comment") is not None else None
+            ))
+        start_at += len(worklogs)
+        if not worklogs or start_at >= data.get("total", 0):
+            break
+    
+    return rows
+
+
+SUBRESOURCE_INSERT_SQL = {
+    "changelog": """
+        INSERT INTO `{table}_changelog` (issue_key, history_id, author_account_id, author_name, created,
+                                         field, field_id, from_value, from_string, to_value, to_string)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """,
+    "comments": """
+        INSERT INTO `{table}_comments` (comment_id, issue_key, author_account_id, author_name,
+                                        created, updated, body)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """,
+    "worklogs": """
+        INSERT INTO `{table}_worklogs` (worklog_id, issue_key, author_account_id, author_name, started,
+                                        time_spent_seconds, created, updated, comment)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+}
+
+
+def write_subresource_rows(connection: mysql.connector.MySQLConnection, table_name: str, resource: str,
+                           rows_by_issue: Dict[str, List[tuple]], updated_by_key: Dict[str, Optional[str]]) -> int:
+    """Replace the child rows of the given issues with batched inserts and record their fetch state"""
+    cursor = connection.cursor()
+    issue_keys = list(rows_by_issue.keys())
+    rows = [row for issue_rows in rows_by_issue.values() for row in issue_rows]
+    
+    try:
+        for start in range(0, len(issue_keys), 1000):
+            chunk = issue_keys[start:start + 1000]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"DELETE FROM `{table_name}_{resource}` WHERE issue_key IN ({placeholders})", chunk
+            )
+        
+        insert_sql = SUBRESOURCE_INSERT_SQL[resource].format(table=table_name)
+        for start in range(0, len(rows), 1000):
+            # executemany rewrites simple INSERTs into one multi-row statement per batch
+            cursor.executemany(insert_sql, rows[start:start + 1000])
+        
+        cursor.executemany(
+            f"""
+            INSERT INTO `{table_name}_subresource_state` (issue_key, resource, issue_updated)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE issue_updated = VALUES(issue_updated)
+            """,
+            [(key, resource, updated_by_key.get(key)) for key in issue_keys]
+        )
+        connection.commit()
+    except Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    
+    return len(rows)
+
+
+def expand_subresources(connection: mysql.connector.MySQLConnection, sync_request: JiraSyncRequest,
+                        issues: List[Dict[str, Any]], task_id: str,
+                        stage_stats: Optional[Dict[str, int]] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Fetch changelogs, comments and worklogs into child tables of the synced table.
+    
+    Only issues whose `updated` value changed since the last expansion are re-fetched
+    (issues without an `updated` field are always re-fetched). When the search added
+    `updated` only for this, it is removed from the issues here so it does not become a
+    column of the synced table. Per-issue endpoints are
+    called with bounded concurrency and the results are written in chunks, so memory
+    stays proportional to SUBRESOURCE_ISSUE_CHUNK rather than to the whole sync.
+    """
+    resources = [r for r in SUBRESOURCE_TYPES if r in sync_request.expand_subresources]
+    unknown = set(sync_request.expand_subresources) - set(SUBRESOURCE_TYPES)
+    if unknown:
+        raise ValueError(f"Sub-recursos no soportados: {', '.join(sorted(unknown))}")
+    
+    table_name = sync_request.mysql_table
+    ensure_subresource_tables(connection, table_name, resources)
+    
+    updated_by_key = {issue.get("key"): (issue.get("fields") or {}).get("updated") for issue in issues}
+    if updated_field_added(sync_request):
+        for issue in issues:
+            (issue.get("fields") or {}).pop("updated", None)
+    if issues and all(value is None for value in updated_by_key.values()):
+        logger.warning(f"Task {task_id}: el campo 'updated' no está en la sincronización; "
+                       f"se volverán a descargar todos los sub-recursos")
+    
+    state = get_subresource_state(connection, table_name, list(updated_by_key.keys()))
+    concurrency = max(1, min(sync_request.subresource_concurrency, 16))
+    summary = {}
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for resource in resources:
+            pending = [
+                issue for issue in issues
+                if updated_by_key[issue.get("key")] is None
+                or state.get((issue.get("key"), resource)) != updated_by_key[issue.get("key")]
+            ]
+            resource_summary = {"issues_fetched": 0, "issues_skipped": len(issues) - len(pending), "rows": 0}
+            
+            for start in range(0, len(pending), SUBRESOURCE_ISSUE_CHUNK):
+                chunk = pending[start:start + SUBRESOURCE_ISSUE_CHUNK]
+                
+                if resource == "changelog":
+                    # The bulk API accepts up to 1000 issues, so one call per chunk suffices
+                    rows_by_issue = fetch_changelogs_bulk(sync_request, chunk)
+                else:
+                    fetcher = fetch_issue_comments if resource == "comments" else fetch_issue_worklogs
+                    keys = [issue.get("key") for issue in chunk]
+                    fetch = tracing.bind(lambda key: fetcher(sync_request, key))
+                    rows_by_issue = dict(zip(keys, pool.map(fetch, keys)))
+                
+                resource_summary["rows"] += write_subresource_rows(
+                    connection, table_name, resource, rows_by_issue, updated_by_key
+                )
+                resource_summary["issues_fetched"] += len(chunk)
+                
+                background_tasks_store[task_id]["message"] = (
+                    f"Expandiendo {resource}: {resource_summary['issues_fetched']}/{len(pending)} issues"
+                )
+            
+            logger.info(f"Task {task_id}: {resource} - {resource_summary['issues_fetched']} issues descargados, "
+                        f"{resource_summary['issues_skipped']} sin cambios, {resource_summary['rows']} filas")
+            summary[resource] = resource_summary
+            if stage_stats is not None:
+                stage_stats["rows"] += resource_summary["rows"]
+    
+    return summary
+
+
+def connect_to_mysql(sync_request: JiraSyncRequest) -> mysql.connector.MySQLConnection:
+    """Create MySQL connection"""
+    try:
+        connection = db_instrumentation.connect(
+            host=sync_request.mysql_host,
+            port=sync_request.mysql_port,
+            user=sync_request.mysql_user,
+            password=sync_request.mysql_password,
+            database=sync_request.mysql_database
+        )
+        return connection
+    except Error as e:
+        logger.error(f"Error connecting to MySQL: {e}")
+        raise
+
+
+# Columns and indexes added to sync_logs after its first release; applied to existing tables
+SYNC_LOGS_EXTRA_COLUMNS = {
+    "mysql_table": "VARCHAR(255) NULL AFTER jql_query",
+    "task_type": "VARCHAR(20) NOT NULL DEFAULT 'sync' AFTER task_id",
+    "progress": "INT DEFAULT 0 AFTER backup_file",
+    "stage": "VARCHAR(50) NULL AFTER progress",
+    "status_message": "VARCHAR(500) NULL AFTER stage",
+    "heartbeat_at": "TIMESTAMP NULL AFTER status_message",
+}
+SYNC_LOGS_EXTRA_INDEXES = {
+    "idx_started_at_id": "(started_at, id)",
+    "idx_status_started": "(status, started_at)",
+    "idx_table_started": "(mysql_table, started_at)",
+    "idx_type_started": "(task_type, started_at)",
+    "idx_created_at": "(created_at)",
+}
+
+
+def ensure_logs_table_exists(connection: mysql.connector.MySQLConnection) -> None:
+    """Ensure logs table exists for tracking sync history, with the columns and indexes queries need"""
+    cursor = connection.cursor()
+    
+    create_logs_table_sql = """
+    CREATE TABLE IF NOT EXISTS sync_logs (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        task_id VARCHAR(255) UNIQUE NOT NULL,
+        task_type VARCHAR(20) NOT NULL DEFAULT 'sync',
+        started_at TIMESTAMP NOT NULL,
+        completed_at TIMESTAMP NULL,
+        status VARCHAR(50) NOT NULL,
+        jql_query TEXT NOT NULL,
+        mysql_table VARCHAR(255) NULL,
+        total_issues INT DEFAULT 0,
+        processed_issues INT DEFAULT 0,
+        error_message TEXT NULL,
+        result JSON NULL,
+        backup_file VARCHAR(255) NULL,
+        progress INT DEFAULT 0,
+        stage VARCHAR(50) NULL,
+        status_message VARCHAR(500) NULL,
+        heartbeat_at TIMESTAMP NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_task_id (task_id),
+        INDEX idx_status (status),
+        INDEX idx_started_at (started_at),
+        INDEX idx_started_at_id (started_at, id),
+        INDEX idx_status_started (status, started_at),
+        INDEX idx_table_started (mysql_table, started_at),
+        INDEX idx_type_started (task_type, started_at),
+        INDEX idx_created_at (created_at)
+    )
+    """
+    
+    try:
+        cursor.execute(create_logs_table_sql)
+        
+        # Bring tables created by older versions up to date
+        cursor.execute("""
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'sync_logs'
+        """)
+        existing_columns = {row[0] for row in cursor.fetchall()}
+        for column, definition in SYNC_LOGS_EXTRA_COLUMNS.items():
+            if column not in existing_columns:
+                cursor.execute(f"ALTER TABLE sync_logs ADD COLUMN {column} {definition}")
+                invalidate_sync_logs_schema()
+                logger.info(f"Added column {column} to sync_logs")
+        
+        cursor.execute("""
+            SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'sync_logs'
+        """)
+        existing_indexes = {row[0] for row in cursor.fetchall()}
+        for index_name, columns in SYNC_LOGS_EXTRA_INDEXES.items():
+            if index_name not in existing_indexes:
+                cursor.execute(f"ALTER TABLE sync_logs ADD INDEX {index_name} {columns}")
+                logger.info(f"Added index {index_name} to sync_logs")
+        
+        connection.commit()
+        logger.info("Logs table ensured")
+    except Error as e:
+        logger.warning(f"Could not create logs table: {e}")
+    finally:
+        cursor.close()
+
+
+def get_logs_connection() -> mysql.connector.MySQLConnection:
+    """Connect to the database holding sync_logs, configured through environment variables"""
+    return db_instrumentation.connect(
+        host=os.getenv("MYSQL_HOST", "localhost"),
+        user=os.getenv("MYSQL_USER", "root"),
+        password=os.getenv("MYSQL_PASSWORD", ""),
+        database=os.getenv("MYSQL_DATABASE", "jiradb")
+    )
+
+
+@app.on_event("startup")
+async def bootstrap_logs_table():
+    """Create sync_logs and its indexes, mark orphaned tasks and reconcile the backup catalog at startup"""
+    def bootstrap():
+        try:
+            connection = get_logs_connection()
+            try:
+                ensure_logs_table_exists(connection)
+                recover_orphaned_sync_logs(connection)
+            finally:
+                connection.close()
+            reconcile_backup_catalog(force=True)
+        except (Error, OSError) as e:
+            logger.warning(f"Could not bootstrap sync_logs table or backup catalog: {e}")
+    
+    await asyncio.get_event_loop().run_in_executor(None, bootstrap)
+
+
+def save_sync_log(connection: mysql.connector.MySQLConnection, task_id: str, 
+                  sync_request: JiraSyncRequest, status: str, 
+                  total_issues: int = 0, processed_issues: int = 0,
+                  error_message: str = None, result: dict = None,
+                  backup_file: str = None) -> None:
+    """Save sync task information to logs table"""
+    cursor = connection.cursor()
+    
+    task_info = background_tasks_store.get(task_id, {})
+    
+    # First, try with the simpler table structure (without config column)
+    insert_log_sql = """
+    INSERT INTO sync_logs (task_id, started_at, completed_at, status, jql_query, mysql_table,
+                          total_issues, processed_issues, error_message, result, backup_file)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        completed_at = VALUES(completed_at),
+        status = VALUES(status),
+        total_issues = VALUES(total_issues),
+        processed_issues = VALUES(processed_issues),
+        error_message = VALUES(error_message),
+        result = VALUES(result),
+        backup_file = VALUES(backup_file),
+        heartbeat_at = NOW()
+    """
+    
+    values = (
+        task_id,
+        task_info.get("started_at", datetime.now().isoformat()),
+        task_info.get("completed_at"),
+        status,
+        sync_request.jql,
+        sync_request.mysql_table,
+        total_issues,
+        processed_issues,
+        error_message,
+        json.dumps(result) if result else None,
+        backup_file
+    )
+    
+    try:
+        cursor.execute(insert_log_sql, values)
+        connection.commit()
+        task_record_cache.invalidate(task_id)
+        logger.info(f"Saved log for task {task_id} with status {status}")
+    except Error as e:
+        # If the simple insert fails, it might be because we need to add the config column
+        if "Unknown column" not in str(e):
+            logger.error(f"Error saving log for task {task_id}: {e}")
+        else:
+            # Try to add the config column
+            try:
+                alter_sql = "ALTER TABLE sync_logs ADD COLUMN config JSON NULL AFTER jql_query"
+                cursor.execute(alter_sql)
+                connection.commit()
+                invalidate_sync_logs_schema()
+                logger.info("Added config column to sync_logs table")
+                
+                # Now try with config
+                config_data = {
+                    "jira_domain": sync_request.jira_domain,
+                    "jira_email": sync_request.jira_email,
+                    "jql": sync_request.jql,
+                    "fields": sync_request.fields,
+                    "mysql_host": sync_request.mysql_host,
+                    "mysql_port": sync_request.mysql_port,
+                    "mysql_database": sync_request.mysql_database,
+                    "mysql_table": sync_request.mysql_table,
+                    "max_results_per_page": sync_request.max_results_per_page
+                }
+                
+                insert_with_config_sql = """
+                INSERT INTO sync_logs (task_id, started_at, completed_at, status, jql_query, mysql_table, config,
+                                      total_issues, processed_issues, error_message, result, backup_file)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    completed_at = VALUES(completed_at),
+                    status = VALUES(status),
+                    config = VALUES(config),
+                    total_issues = VALUES(total_issues),
+                    processed_issues = VALUES(processed_issues),
+                    error_message = VALUES(error_message),
+                    result = VALUES(result),
+                    backup_file = VALUES(backup_file),
+                    heartbeat_at = NOW()
+                """
+                
+                values_with_config = (
+                    task_id,
+                    task_info.get("started_at", datetime.now().isoformat()),
+                    task_info.get("completed_at"),
+                    status,
+                    sync_request.jql,
+                    sync_request.mysql_table,
+                    json.dumps(config_data),
+                    total_issues,
+                    processed_issues,
+                    error_message,
+                    json.dumps(result) if result else None,
+                    backup_file
+                )
+                
+                cursor.execute(insert_with_config_sql, values_with_config)
+                connection.commit()
+                logger.info(f"Saved log with config for task {task_id}")
+            except Error as e2:
+                logger.error(f"Error adding config column or saving log: {e2}")
+    finally:
+        cursor.close()
+
+
+def is_generated_column(extra: Any) -> bool:
+    """
+    True for VIRTUAL/STORED generated columns, given the Extra of SHOW COLUMNS (EXTRA in information_schema).
+    
+    MySQL 8.0.13+ also reports DEFAULT_GENERATED for columns with an expression default
+    (e.g. DEFAULT CURRENT_TIMESTAMP); those hold real values and are not generated.
+    """
+    extra = str(extra or "").upper()
+    return "VIRTUAL GENERATED" in extra or "STORED GENERATED" in extra
+
+
+def get_insertable_columns(cursor, table_name: str) -> List[str]:
+    """Return the columns of a table that accept values, skipping generated columns"""
+    cursor.execute(f"SHOW COLUMNS FROM `{table_name}`")
+    return [row[0] for row in cursor.fetchall() if not is_generated_column(row[5])]
+
+
+class ChecksumWriter:
+    """Write text (as UTF-8) or bytes to a file while computing its SHA-256 and size on the fly"""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self._file = None
+    
+    def open(self) -> "ChecksumWriter":
+        self._file = open(self.path, 'wb')
+        return self
+    
+    def close(self) -> None:
+        self._file.close()
+    
+    def __enter__(self):
+        return self.open()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
+    def write(self, text: Union[str, bytes]) -> int:
+        data = text.encode('utf-8') if isinstance(text, str) else bytes(text)
+        self.sha256.update(data)
+        self.size += len(data)
+        self._file.write(data)
+        return len(data)
+    
+    # File-like methods so binary writers (pyarrow) can stream into it
+    def tell(self) -> int:
+        return self.size
+    
+    def flush(self) -> None:
+        self._file.flush()
+    
+    @property
+    def closed(self) -> bool:
+        return self._file is None or self._file.closed
+    
+    @property
+    def checksum(self) -> str:
+        return self.sha256.hexdigest()
+
+
+EXPORT_FORMATS = {"sql": ".sql", "csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+EXPORT_FETCH_SIZE = 5000  # Rows per fetchmany() and per Parquet row group / Arrow batch
+BACKUP_MEDIA_TYPES = {
+    ".gz": "application/gzip",
+    ".csv": "text/csv",
+    ".parquet": "application/vnd.apache.parquet",
+    ".arrow": "application/vnd.apache.arrow.file"
+}
+
+
+def import_pyarrow():
+    """Import pyarrow on demand; it is only needed for columnar exports"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise HTTPException(status_code=400,
+                            detail="Los formatos parquet y arrow requieren pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def mysql_type_to_arrow(pa, data_type: str, column_type: str, precision: Optional[int], scale: Optional[int]):
+    """Map an information_schema column type to an Arrow type"""
+    data_type = data_type.lower()
+    unsigned = "unsigned" in column_type.lower()
+    integer_types = {
+        "tinyint": (pa.int8(), pa.uint8()),
+        "smallint": (pa.int16(), pa.uint16()),
+        "mediumint": (pa.int32(), pa.uint32()),
+        "int": (pa.int32(), pa.uint32()),
+        "integer": (pa.int32(), pa.uint32()),
+        "bigint": (pa.int64(), pa.uint64()),
+    }
+    if data_type in integer_types:
+        return integer_types[data_type][1 if unsigned else 0]
+    if data_type == "decimal":
+        # decimal128 holds at most 38 digits; MySQL allows DECIMAL(65, s)
+        precision = precision or 10
+        if precision > 38:
+            return pa.decimal256(precision, scale or 0)
+        return pa.decimal128(precision, scale or 0)
+    if data_type == "float":
+        return pa.float32()
+    if data_type in ("double", "real"):
+        return pa.float64()
+    if data_type == "year":
+        return pa.int16()
+    if data_type == "bit":
+        return pa.uint64()
+    if data_type == "date":
+        return pa.date32()
+    if data_type in ("datetime", "timestamp"):
+        return pa.timestamp("us")
+    if data_type == "time":
+        return pa.duration("us")
+    if data_type in ("binary", "varbinary", "tinyblob", "blob", "mediumblob", "longblob", "geometry"):
+        return pa.binary()
+    return pa.string()  # char, varchar, text, json, enum, set
+
+
+def get_export_arrow_schema(pa, cursor, table_name: str, columns: List[str]):
+    """Build the Arrow schema of an export from information_schema"""
+    cursor.execute("""
+        SELECT COLUMN_NAME, DATA_TYPE, COLUMN_TYPE, NUMERIC_PRECISION, NUMERIC_SCALE, IS_NULLABLE
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table_name,))
+    types = {row[0]: row for row in cursor.fetchall()}
+    fields = []
+    for column in columns:
+        _, data_type, column_type, precision, scale, nullable = types[column]
+        arrow_type = mysql_type_to_arrow(pa, str(data_type), str(column_type), precision, scale)
+        fields.append(pa.field(column, arrow_type, nullable=(nullable == "YES")))
+    return pa.schema(fields)
+
+
+def to_arrow_value(value: Any, is_string: bool) -> Any:
+    """Normalize connector values that pyarrow does not accept as-is"""
+    if value is None:
+        return None
+    if isinstance(value, bytearray):
+        value = bytes(value)
+    if isinstance(value, set):
+        return ",".join(sorted(value))
+    if is_string and isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    if is_string and not isinstance(value, str):
+        return str(value)
+    return value
+
+
+def to_csv_value(value: Any) -> Any:
+    """Render a value for CSV output (NULL as an empty field, binary as hex)"""
+    if value is None:
+        return ""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()
+    if isinstance(value, set):
+        return ",".join(sorted(value))
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+BACKUP_CATALOG_RECONCILE_INTERVAL = int(os.getenv("BACKUP_CATALOG_RECONCILE_INTERVAL", "60"))
+_backup_catalog_lock = threading.Lock()
+_backup_catalog_last_reconcile = 0.0
+_backup_catalog_ready = False
+
+
+def ensure_backup_catalog_table(cursor) -> None:
+    """Create the backup catalog table (once per process)"""
+    global _backup_catalog_ready
+    if _backup_catalog_ready:
+        return
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS backup_catalog (
+        filename VARCHAR(255) PRIMARY KEY,
+        kind VARCHAR(20) NOT NULL,
+        task_id VARCHAR(255) NULL,
+        table_name VARCHAR(255) NULL,
+        row_count INT NULL,
+        size_bytes BIGINT NOT NULL,
+        checksum CHAR(64) NULL,
+        created_at TIMESTAMP NOT NULL,
+        file_mtime DOUBLE NULL,
+        INDEX idx_created_at (created_at),
+        INDEX idx_task_id (task_id),
+        INDEX idx_table_created (table_name, created_at),
+        INDEX idx_kind_created (kind, created_at)
+    )
+    """)
+    _backup_catalog_ready = True
+
+
+def guess_backup_metadata(filename: str) -> Dict[str, Optional[str]]:
+    """Infer kind and table of a backup file that was not recorded when written"""
+    if filename.startswith("jira_sync_"):
+        return {"kind": "sync", "table_name": None}
+    if filename.startswith("test_backup_"):
+        return {"kind": "test", "table_name": None}
+    if "_export_" in filename:
+        return {"kind": "export", "table_name": filename.split("_export_")[0]}
+    return {"kind": "unknown", "table_name": None}
+
+
+def record_backup_in_catalog(filename: str, kind: str, size_bytes: int, checksum: Optional[str] = None,
+                             task_id: Optional[str] = None, table_name: Optional[str] = None,
+                             row_count: Optional[int] = None, connection=None) -> None:
+    """Insert or refresh a backup's catalog entry; failures only log, reconcile catches up later"""
+    backup_path = BACKUPS_DIR / filename
+    own_connection = connection is None
+    try:
+        stats = backup_path.stat()
+        if own_connection:
+            connection = get_logs_connection()
+        cursor = connection.cursor()
+        try:
+            ensure_backup_catalog_table(cursor)
+            cursor.execute("""
+                INSERT INTO backup_catalog (filename, kind, task_id, table_name, row_count,
+                                            size_bytes, checksum, created_at, file_mtime)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    kind = VALUES(kind),
+                    task_id = COALESCE(VALUES(task_id), task_id),
+                    table_name = COALESCE(VALUES(table_name), table_name),
+                    row_count = COALESCE(VALUES(row_count), row_count),
+                    size_bytes = VALUES(size_bytes),
+                    checksum = VALUES(checksum),
+                    file_mtime = VALUES(file_mtime)
+            """, (filename, kind, task_id, table_name, row_count, size_bytes, checksum,
+                  datetime.fromtimestamp(stats.st_mtime), stats.st_mtime))
+            connection.commit()
+        finally:
+            cursor.close()
+    except (Error, OSError) as e:
+        logger.warning(f"Could not record backup {filename} in catalog: {e}")
+    finally:
+        if own_connection and connection is not None:
+            connection.close()
+
+
+def remove_from_backup_catalog(filenames: List[str]) -> None:
+    """Drop catalog entries of deleted backup files"""
+    if not filenames:
+        return
+    try:
+        connection = get_logs_connection()
+        cursor = connection.cursor()
+        try:
+            ensure_backup_catalog_table(cursor)
+            for start in range(0, len(filenames), 500):
+                chunk = filenames[start:start + 500]
+                cursor.execute(
+                    f"DELETE FROM backup_catalog WHERE filename IN ({', '.join(['%s'] * len(chunk))})", chunk
+                )
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+    except Error as e:
+        logger.warning(f"Could not remove backups from catalog: {e}")
+
+
+def reconcile_backup_catalog(force: bool = False) -> Dict[str, int]:
+    """
+    Bring the catalog in line with BACKUPS_DIR.
+    
+    Only directory entries are listed (no stat per file); files missing from the
+    catalog are stat-ed and added, entries whose file disappeared are removed.
+    Runs at most once per BACKUP_CATALOG_RECONCILE_INTERVAL unless forced.
+    """
+    global _backup_catalog_last_reconcile
+    
+    with _backup_catalog_lock:
+        if not force and time.monotonic() - _backup_catalog_last_reconcile < BACKUP_CATALOG_RECONCILE_INTERVAL:
+            return {"added": 0, "removed": 0, "skipped": 1}
+        
+        BACKUPS_DIR.mkdir(parents=True, exist_ok=True)
+        with os.scandir(BACKUPS_DIR) as entries:
+            on_disk = {entry.name for entry in entries if not entry.name.startswith(".") and entry.is_file()}
+        
+        connection = get_logs_connection()
+        cursor = connection.cursor()
+        try:
+            ensure_backup_catalog_table(cursor)
+            cursor.execute("SELECT filename FROM backup_catalog")
+            cataloged = {row[0] for row in cursor.fetchall()}
+            
+            missing = sorted(on_disk - cataloged)
+            removed = sorted(cataloged - on_disk)
+            
+            for filename in missing:
+                try:
+                    stats = (BACKUPS_DIR / filename).stat()
+                except OSError:
+                    continue
+                metadata = guess_backup_metadata(filename)
+                cursor.execute("""
+                    INSERT IGNORE INTO backup_catalog (filename, kind, table_name, size_bytes, created_at, file_mtime)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """, (filename, metadata["kind"], metadata["table_name"], stats.st_size,
+                      datetime.fromtimestamp(stats.st_mtime), stats.st_mtime))
+            
+            for start in range(0, len(removed), 500):
+                chunk = removed[start:start + 500]
+                cursor.execute(
+                    f"DELETE FROM backup_catalog WHERE filename IN ({', '.join(['%s'] * len(chunk))})", chunk
+                )
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+        
+        _backup_catalog_last_reconcile = time.monotonic()
+    
+    if missing or removed:
+        logger.info(f"Backup catalog reconciled: {len(missing)} added, {len(removed)} removed")
+    return {"added": len(missing), "removed": len(removed), "skipped": 0}
+
+
+def get_backup_catalog_entry(filename: str) -> Optional[Dict[str, Any]]:
+    """Return the catalog row of a backup, adding it first if the file exists but is not cataloged"""
+    connection = get_logs_connection()
+    cursor = connection.cursor(dictionary=True)
+    try:
+        ensure_backup_catalog_table(cursor)
+        cursor.execute("SELECT * FROM backup_catalog WHERE filename = %s", (filename,))
+        entry = cursor.fetchone()
+        if entry is None and (BACKUPS_DIR / filename).is_file():
+            metadata = guess_backup_metadata(filename)
+            record_backup_in_catalog(filename, metadata["kind"], (BACKUPS_DIR / filename).stat().st_size,
+                                     table_name=metadata["table_name"], connection=connection)
+            cursor.execute("SELECT * FROM backup_catalog WHERE filename = %s", (filename,))
+            entry = cursor.fetchone()
+        return entry
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def format_catalog_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a catalog row for API responses"""
+    return {
+        "filename": entry["filename"],
+        "kind": entry["kind"],
+        "task_id": entry["task_id"],
+        "table_name": entry["table_name"],
+        "row_count": entry["row_count"],
+        "size": entry["size_bytes"],
+        "size_mb": round(entry["size_bytes"] / (1024 * 1024), 2),
+        "checksum": entry["checksum"],
+        "created_at": entry["created_at"].isoformat() if entry["created_at"] else None,
+        "modified_at": datetime.fromtimestamp(entry["file_mtime"]).isoformat() if entry["file_mtime"] else None,
+        "download_url": f"/backups/{entry['filename']}"
+    }
+
+
+BACKUP_INSERT_ROWS = 100  # Rows per INSERT statement in sync backups
+BACKUP_MODES = ("reread", "tee")
+
+
+def new_backup_path() -> tuple:
+    """Generation time (Mexico City), file name and path of a new sync backup"""
+    mexico_time = datetime.now(pytz.timezone('America/Mexico_City'))
+    backup_filename = f"jira_sync_{mexico_time.strftime('%Y-%m-%d_%H-%M-%S')}.sql"
+    return mexico_time, backup_filename, BACKUPS_DIR / backup_filename
+
+
+def write_backup_header(f, task_id: str, config: JiraSyncRequest, table_name: str, total_issues: int,
+                        mexico_time: datetime, backup_path: Path) -> None:
+    f.write(f"-- Jira Sync Backup\n")
+    f.write(f"-- Generated: {mexico_time.strftime('%Y-%m-%d %H:%M:%S')} (Mexico/Ciudad de México)\n")
+    f.write(f"-- Task ID: {task_id}\n")
+    f.write(f"-- Table: {table_name}\n")
+    f.write(f"-- Total Issues: {total_issues}\n")
+    f.write(f"-- Database: {config.mysql_database}\n")
+    f.write(f"-- Host: {config.mysql_host}\n")
+    f.write(f"-- ====================================\n\n")
+    
+    f.write(f"-- Backup Path: {backup_path.absolute()}\n")
+    f.write(f"-- Container Path: /app/backups/{backup_path.name}\n\n")
+    
+    f.write(f"USE `{config.mysql_database}`;\n\n")
+
+
+def write_backup_rows(f, insert_prefix: str, rows: List[tuple]) -> None:
+    """Append rows as INSERT statements of BACKUP_INSERT_ROWS rows each"""
+    for batch_start in range(0, len(rows), BACKUP_INSERT_ROWS):
+        batch = rows[batch_start:batch_start + BACKUP_INSERT_ROWS]
+        chunk_span = tracing.span("backup.chunk", {"rows": len(batch)})
+        chunk_offset = f.tell()
+        f.write(insert_prefix)
+        f.write(sql_literals.format_rows(batch))
+        f.write(";\n\n")
+        chunk_span.set_attribute("bytes", f.tell() - chunk_offset)
+        chunk_span.end()
+
+
+def register_sync_backup(task_id: str, table_name: str, backup_path: Path, checksum: str) -> str:
+    """Record a finished sync backup in the task and the catalog; returns its file name"""
+    backup_filename = backup_path.name
+    file_size = backup_path.stat().st_size
+    logger.info(f"Task {task_id}: Backup generado exitosamente: {backup_filename} ({file_size} bytes)")
+    logger.debug(f"Task {task_id}: Ruta absoluta: {backup_path.absolute()}")
+    
+    # Update task with backup info
+    background_tasks_store[task_id]["backup_file"] = backup_filename
+    background_tasks_store[task_id]["backup_path"] = str(backup_path)
+    background_tasks_store[task_id]["backup_absolute_path"] = str(backup_path.absolute())
+    background_tasks_store[task_id]["backup_size"] = file_size
+    background_tasks_store[task_id]["backup_checksum"] = checksum
+    
+    record_backup_in_catalog(
+        backup_filename, "sync", file_size, checksum, task_id=task_id,
+        table_name=table_name, row_count=background_tasks_store[task_id].get("backup_rows", 0)
+    )
+    return backup_filename
+
+
+def generate_backup(task_id: str, config: JiraSyncRequest, table_name: str, total_issues: int):
+    """Generar un archivo SQL de respaldo de la tabla sincronizada"""
+    try:
+        logger.debug(f"Task {task_id}: === INICIANDO GENERACIÓN DE BACKUP ===")
+        
+        # Update task status
+        background_tasks_store[task_id]["status"] = "generando_respaldo"
+        background_tasks_store[task_id]["message"] = "Generando archivo de respaldo SQL..."
+        background_tasks_store[task_id]["progress"] = 95  # Set progress to 95%
+        
+        # Nombre con fecha y hora de México
+        mexico_time, backup_filename, backup_path = new_backup_path()
+        
+        logger.debug(f"Task {task_id}: Generando backup en: {backup_path}")
+        logger.debug(f"Task {task_id}: Directorio de backups: {BACKUPS_DIR.absolute()}")
+        
+        # Ensure backups directory exists
+        BACKUPS_DIR.mkdir(exist_ok=True)
+        
+        # Always use Python-based backup for reliability
+        logger.debug(f"Task {task_id}: Usando método Python para generar backup")
+        
+        # Generate backup using Python
+        connection = db_instrumentation.connect(
+            host=config.mysql_host,
+            port=config.mysql_port,
+            user=config.mysql_user,
+            password=config.mysql_password,
+            database=config.mysql_database
+        )
+        
+        cursor = connection.cursor()
+        
+        with ChecksumWriter(backup_path) as f:
+            # Write header
+            write_backup_header(f, task_id, config, table_name, total_issues, mexico_time, backup_path)
+            
+            # Get CREATE TABLE statement
+            cursor.execute(f"SHOW CREATE TABLE `{table_name}`")
+            create_result = cursor.fetchone()
+            if create_result:
+                create_table = create_result[1]
+                f.write(f"-- Table structure for table `{table_name}`\n")
+                f.write(f"DROP TABLE IF EXISTS `{table_name}`;\n")
+                f.write(f"{create_table};\n\n")
+                
+                # Get all data (generated columns are recomputed on restore and cannot be inserted)
+                columns = get_insertable_columns(cursor, table_name)
+                cursor.execute(f"SELECT {', '.join([f'`{col}`' for col in columns])} FROM `{table_name}`")
+                rows = cursor.fetchall()
+                memory_checkpoint(task_id, "backup_rows_loaded")
+                
+                logger.debug(f"Task {task_id}: Escribiendo {len(rows)} filas al backup")
+                background_tasks_store[task_id]["backup_rows"] = len(rows)
+                
+                if rows:
+                    f.write(f"-- Data for table `{table_name}`\n")
+                    f.write(f"LOCK TABLES `{table_name}` WRITE;\n")
+                    f.write(f"/*!40000 ALTER TABLE `{table_name}` DISABLE KEYS */;\n\n")
+                    
+                    # Write INSERT statements in batches
+                    insert_prefix = f"INSERT INTO `{table_name}` ({', '.join([f'`{col}`' for col in columns])}) VALUES\n"
+                    write_backup_rows(f, insert_prefix, rows)
+                    
+                    f.write(f"/*!40000 ALTER TABLE `{table_name}` ENABLE KEYS */;\n")
+                    f.write("UNLOCK TABLES;\n")
+                else:
+                    f.write(f"-- No data found in table `{table_name}`\n")
+            else:
+                f.write(f"-- ERROR: Could not get table structure for `{table_name}`\n")
+            
+            f.write(f"\n-- End of backup\n")
+            f.write(f"-- File size will be calculated after closing\n")
+        
+        cursor.close()
+        connection.close()
+        
+        # Verify file was created
+        if backup_path.exists():
+            return register_sync_backup(task_id, table_name, backup_path, f.checksum)
+        else:
+            logger.error(f"Task {task_id}: ERROR - El archivo de backup no se creó!")
+            return None
+    
+    except Exception as e:
+        logger.error(f"Task {task_id}: Error al generar backup: {str(e)}")
+        logger.exception(e)  # Log full traceback
+        background_tasks_store[task_id]["error"] = f"Error al generar backup: {str(e)}"
+        return None
+
+
+class BackupTee:
+    """
+    Sync backup written while the upsert runs (backup_mode "tee").
+
+    Each upsert batch appends the rows it wrote, from the values it sent. Columns the
+    upsert does not send (created_at, updated_at, columns of earlier field sets) are read
+    back by primary key in the same transaction: a narrow lookup of pages already in the
+    buffer pool. finish() appends the rows this run did not touch, found with a temporary
+    table of the touched keys, so the dump holds the whole table without a second full read.
+
+    Anything that would make the dump differ from the table (schema change, an issue
+    upserted twice, a write error) marks the tee failed; finish() then returns None and
+    the caller falls back to generate_backup().
+    """
+    
+    def __init__(self, task_id: str, config: JiraSyncRequest, total_issues: int):
+        self.task_id = task_id
+        self.config = config
+        self.table_name = config.mysql_table
+        self.total_issues = total_issues
+        self.failed: Optional[str] = None
+        self.rows = 0
+        self.keys: set = set()
+        self.columns: List[str] = []
+        self.create_table: Optional[str] = None
+        self.backup_path: Optional[Path] = None
+        self._temp_path: Optional[Path] = None
+        self._writer: Optional[ChecksumWriter] = None
+        self._insert_prefix = ""
+    
+    def _start(self, connection) -> None:
+        """Open the file and write header and table structure (the schema is final by the first batch)"""
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"SHOW CREATE TABLE `{self.table_name}`")
+            self.create_table = cursor.fetchone()[1]
+            self.columns = get_insertable_columns(cursor, self.table_name)
+        finally:
+            cursor.close()
+        if "key" not in self.columns:
+            raise ValueError("la tabla no tiene columna `key`")
+        
+        mexico_time, backup_filename, self.backup_path = new_backup_path()
+        BACKUPS_DIR.mkdir(exist_ok=True)
+        # Dot-prefixed until finished, so catalog reconciliation ignores the partial file
+        self._temp_path = BACKUPS_DIR / f".{backup_filename}.tmp"
+        self._writer = f = ChecksumWriter(self._temp_path).open()
+        write_backup_header(f, self.task_id, self.config, self.table_name, self.total_issues,
+                            mexico_time, self.backup_path)
+        f.write(f"-- Table structure for table `{self.table_name}`\n")
+        f.write(f"DROP TABLE IF EXISTS `{self.table_name}`;\n")
+        f.write(f"{self.create_table};\n\n")
+        f.write(f"-- Data for table `{self.table_name}`\n")
+        f.write(f"LOCK TABLES `{self.table_name}` WRITE;\n")
+        f.write(f"/*!40000 ALTER TABLE `{self.table_name}` DISABLE KEYS */;\n\n")
+        self._insert_prefix = (f"INSERT INTO `{self.table_name}` "
+                               f"({', '.join([f'`{col}`' for col in self.columns])}) VALUES\n")
+    
+    def write_batch(self, connection, flat_issues: List[Dict[str, Any]]) -> None:
+        """Append the rows of one upsert batch; call before the batch's transaction commits"""
+        if self.failed or not flat_issues:
+            return
+        try:
+            if self._writer is None:
+                self._start(connection)
+            
+            keys = [flat_issue["key"] for flat_issue in flat_issues]
+            if len(set(keys)) != len(keys) or not self.keys.isdisjoint(keys):
+                raise ValueError("un issue se sincronizó más de una vez")
+            
+            unsent = [col for col in self.columns
+                      if any(col not in flat_issue for flat_issue in flat_issues)]
+            stored: Dict[str, tuple] = {}
+            if unsent:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(
+                        f"SELECT `key`, {', '.join([f'`{col}`' for col in unsent])} FROM `{self.table_name}` "
+                        f"WHERE `key` IN ({', '.join(['%s'] * len(keys))})", keys
+                    )
+                    stored = {row[0]: row[1:] for row in cursor.fetchall()}
+                finally:
+                    cursor.close()
+            
+            rows = []
+            for flat_issue in flat_issues:
+                if unsent:
+                    if flat_issue["key"] not in stored:
+                        raise ValueError(f"no se encontró {flat_issue['key']} al leer las columnas no enviadas")
+                    flat_issue = {**dict(zip(unsent, stored[flat_issue["key"]])), **flat_issue}
+                rows.append(tuple(flat_issue[col] for col in self.columns))
+            
+            write_backup_rows(self._writer, self._insert_prefix, rows)
+            self.keys.update(keys)
+            self.rows += len(rows)
+        except Exception as e:
+            self.fail(str(e))
+    
+    def fail(self, reason: str) -> None:
+        if not self.failed:
+            self.failed = reason
+            logger.warning(f"Task {self.task_id}: Backup durante el upsert cancelado ({reason}); "
+                           f"se generará releyendo la tabla")
+        self.discard()
+    
+    def discard(self) -> None:
+        """Close and delete the partial file"""
+        if self._writer is not None and not self._writer.closed:
+            self._writer.close()
+        if self._temp_path is not None:
+            self._temp_path.unlink(missing_ok=True)
+    
+    def finish(self) -> Optional[str]:
+        """Append the untouched rows and publish the backup; None if the caller must fall back"""
+        if self._writer is None or self.failed:
+            self.discard()
+            return None
+        
+        background_tasks_store[self.task_id].update({
+            "status": "generando_respaldo",
+            "message": "Completando archivo de respaldo SQL...",
+            "progress": 95
+        })
+        connection = None
+        try:
+            connection = db_instrumentation.connect(
+                host=self.config.mysql_host,
+                port=self.config.mysql_port,
+                user=self.config.mysql_user,
+                password=self.config.mysql_password,
+                database=self.config.mysql_database
+            )
+            cursor = connection.cursor()
+            cursor.execute(f"SHOW CREATE TABLE `{self.table_name}`")
+            if cursor.fetchone()[1] != self.create_table:
+                raise ValueError("la estructura de la tabla cambió durante la sincronización")
+            
+            # Same definition as the key column created by ensure_table_exists
+            cursor.execute("CREATE TEMPORARY TABLE `_backup_tee_keys` (`key` VARCHAR(255) PRIMARY KEY)")
+            keys = list(self.keys)
+            for start in range(0, len(keys), 1000):
+                cursor.executemany("INSERT INTO `_backup_tee_keys` (`key`) VALUES (%s)",
+                                   [(key,) for key in keys[start:start + 1000]])
+            cursor.close()
+            
+            # Unbuffered: untouched rows are streamed and written a batch at a time
+            data_cursor = connection.cursor()
+            data_cursor.execute(
+                f"SELECT {', '.join([f't.`{col}`' for col in self.columns])} FROM `{self.table_name}` AS t "
+                f"LEFT JOIN `_backup_tee_keys` AS k ON k.`key` = t.`key` WHERE k.`key` IS NULL"
+            )
+            untouched = 0
+            while True:
+                rows = data_cursor.fetchmany(EXPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                write_backup_rows(self._writer, self._insert_prefix, rows)
+                untouched += len(rows)
+            data_cursor.close()
+            
+            f = self._writer
+            f.write(f"/*!40000 ALTER TABLE `{self.table_name}` ENABLE KEYS */;\n")
+            f.write("UNLOCK TABLES;\n")
+            f.write("\n-- End of backup\n")
+            f.close()
+            os.replace(self._temp_path, self.backup_path)
+        except Exception as e:
+            self.fail(str(e))
+            return None
+        finally:
+            if connection is not None:
+                connection.close()
+        
+        logger.info(f"Task {self.task_id}: Backup durante el upsert: {self.rows} filas escritas al sincronizar, "
+                    f"{untouched} filas no tocadas leídas al final")
+        background_tasks_store[self.task_id]["backup_rows"] = self.rows + untouched
+        return register_sync_backup(self.task_id, self.table_name, self.backup_path, self._writer.checksum)
+
+
+def get_field_type(value: Any) -> str:
+    """Determine MySQL field type based on value"""
+    if isinstance(value, bool):
+        return "BOOLEAN"
+    elif isinstance(value, int):
+        return "BIGINT"
+    elif isinstance(value, float):
+        return "DOUBLE"
+    elif isinstance(value, dict) or isinstance(value, list):
+        return "JSON"
+    else:
+        # Default to TEXT for strings and unknown types
+        return "TEXT"
+
+
+def flatten_issue_fields(issue: Dict[str, Any], field_mapping: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Flatten nested issue fields for database storage with optional custom mapping"""
+    flat_data = {"key": issue.get("key")}
+    
+    # Process standard fields
+    for field_name, field_value in issue.get("fields", {}).items():
+        # Determine the database column name
+        if field_mapping and field_name in field_mapping:
+            db_field_name = field_mapping[field_name]
+        else:
+            db_field_name = field_name
+            
+        if isinstance(field_value, dict):
+            # Handle complex fields (like status, priority, etc.)
+            if "name" in field_value:
+                flat_data[f"{db_field_name}_name"] = field_value.get("name")
+            if "value" in field_value:
+                flat_data[f"{db_field_name}_value"] = field_value.get("value")
+            # Store full JSON for complex objects
+            flat_data[db_field_name] = json.dumps(field_value)
+        elif isinstance(field_value, list):
+            # Store lists as JSON
+            flat_data[db_field_name] = json.dumps(field_value)
+        else:
+            flat_data[db_field_name] = field_value
+    
+    return flat_data
+
+
+def get_list_field_tables(sync_request: JiraSyncRequest) -> Dict[str, str]:
+    """Return {jira_field: child_table_name} for the list fields that are normalized"""
+    field_mapping = sync_request.fields if isinstance(sync_request.fields, dict) else {}
+    return {
+        jira_field: f"{sync_request.mysql_table}_{field_mapping.get(jira_field, jira_field)}"
+        for jira_field in sync_request.normalize_list_fields
+    }
+
+
+def get_list_item_value(item: Any) -> Optional[str]:
+    """Reduce a list element (label string, component/version object...) to its indexed value"""
+    if item is None:
+        return None
+    if isinstance(item, dict):
+        for attribute in ("name", "value", "key", "id"):
+            if item.get(attribute) is not None:
+                return str(item[attribute])[:255]
+        return json.dumps(item)[:255]
+    return str(item)[:255]
+
+
+def ensure_list_field_tables(connection: mysql.connector.MySQLConnection, sync_request: JiraSyncRequest) -> None:
+    """Create the (key, value) child tables of the normalized list fields"""
+    cursor = connection.cursor()
+    try:
+        for child_table in get_list_field_tables(sync_request).values():
+            execute_ddl(cursor, f"""
+            CREATE TABLE IF NOT EXISTS `{child_table}` (
+                `key` VARCHAR(255) NOT NULL,
+                value VARCHAR(255) COLLATE utf8mb4_bin NOT NULL,
+                PRIMARY KEY (`key`, value),
+                INDEX idx_value (value, `key`)
+            )
+            """)
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def sync_list_field_tables(connection: mysql.connector.MySQLConnection, sync_request: JiraSyncRequest,
+                           issues: List[Dict[str, Any]], chunk_size: int = 500) -> Dict[str, Dict[str, int]]:
+    """
+    Maintain the child tables of the normalized list fields with set-based diffs.
+    
+    For each chunk of issues the stored (key, value) pairs are compared with the
+    ones in Jira; only the difference is deleted or bulk-inserted, so unchanged
+    issues cost a single indexed read.
+    """
+    cursor = connection.cursor()
+    summary = {}
+    
+    try:
+        for jira_field, child_table in get_list_field_tables(sync_request).items():
+            inserted = deleted = 0
+            
+            for start in range(0, len(issues), chunk_size):
+                chunk = issues[start:start + chunk_size]
+                keys = [issue.get("key") for issue in chunk]
+                
+                desired = set()
+                for issue in chunk:
+                    field_value = (issue.get("fields") or {}).get(jira_field)
+                    if isinstance(field_value, list):
+                        for item in field_value:
+                            value = get_list_item_value(item)
+                            if value is not None:
+                                desired.add((issue.get("key"), value))
+                
+                placeholders = ", ".join(["%s"] * len(keys))
+                cursor.execute(f"SELECT `key`, value FROM `{child_table}` WHERE `key` IN ({placeholders})", keys)
+                existing = set(cursor.fetchall())
+                
+                to_delete = list(existing - desired)
+                to_insert = list(desired - existing)
+                
+                if to_delete:
+                    pairs = ", ".join(["(%s, %s)"] * len(to_delete))
+                    cursor.execute(
+                        f"DELETE FROM `{child_table}` WHERE (`key`, value) IN ({pairs})",
+                        [part for pair in to_delete for part in pair]
+                    )
+                if to_insert:
+                    cursor.executemany(
+                        f"INSERT INTO `{child_table}` (`key`, value) VALUES (%s, %s)", to_insert
+                    )
+                connection.commit()
+                
+                inserted += len(to_insert)
+                deleted += len(to_delete)
+            
+            logger.info(f"{child_table}: {inserted} valores insertados, {deleted} eliminados")
+            summary[child_table] = {"inserted": inserted, "deleted": deleted}
+    finally:
+        cursor.close()
+    
+    return summary
+
+
+GENERATED_COLUMN_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,63}$")
+GENERATED_COLUMN_PATH_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)((?:\.[A-Za-z_][A-Za-z0-9_]*|\[\d+\])+)$")
+# No DATE/DATETIME: Jira timestamps ("2024-01-01T10:00:00.000+0000") do not convert under
+# strict sql_mode, so a STORED or indexed column of those types would fail every upsert.
+# ISO text in a VARCHAR sorts chronologically and is what callers should use instead.
+GENERATED_COLUMN_TYPE_RE = re.compile(
+    r"^(VARCHAR\(\d{1,5}\)|CHAR\(\d{1,3}\)|TINYINT|SMALLINT|INT|BIGINT|DOUBLE|BOOLEAN|"
+    r"DECIMAL\(\d{1,2},\s*\d{1,2}\)|TEXT)$",
+    re.IGNORECASE
+)
+GENERATED_COLUMN_COMMENT_PREFIX = "jira-sync:"
+
+
+def build_generated_column_sql(spec: GeneratedColumn, field_mapping: Optional[Dict[str, str]]) -> tuple:
+    """
+    Validate a generated column declaration and return (source_column, column_definition, comment),
+    where comment is the COMMENT text holding the fingerprint.
+    
+    The definition carries a COMMENT fingerprint of the declaration so later runs can
+    tell whether the column must be rebuilt without parsing MySQL's normalized expression.
+    """
+    if not GENERATED_COLUMN_NAME_RE.match(spec.name):
+        raise ValueError(f"Nombre de columna generada inválido: {spec.name}")
+    match = GENERATED_COLUMN_PATH_RE.match(spec.path)
+    if not match:
+        raise ValueError(f"Ruta JSON inválida para {spec.name}: {spec.path}")
+    if not GENERATED_COLUMN_TYPE_RE.match(spec.sql_type.strip()):
+        if spec.sql_type.strip().upper().startswith(("DATE", "TIMESTAMP")):
+            raise ValueError(f"Tipo SQL no soportado para {spec.name}: {spec.sql_type} "
+                             f"(las fechas de Jira no se convierten en modo estricto; use VARCHAR(30))")
+        raise ValueError(f"Tipo SQL no soportado para {spec.name}: {spec.sql_type}")
+    storage = spec.storage.upper()
+    if storage not in ("VIRTUAL", "STORED"):
+        raise ValueError(f"storage debe ser VIRTUAL o STORED: {spec.storage}")
+    
+    jira_field, json_path = match.group(1), "$" + match.group(2)
+    source_column = field_mapping.get(jira_field, jira_field) if field_mapping else jira_field
+    
+    # Values are stored as JSON text; rows whose source is not valid JSON or is JSON null yield NULL
+    expression = (
+        f"IF(JSON_VALID(`{source_column}`), "
+        f"NULLIF(JSON_UNQUOTE(JSON_EXTRACT(`{source_column}`, '{json_path}')), 'null'), NULL)"
+    )
+    fingerprint = hashlib.sha1(f"{expression}|{spec.sql_type.upper()}|{storage}".encode()).hexdigest()[:16]
+    definition = (
+        f"`{spec.name}` {spec.sql_type} GENERATED ALWAYS AS ({expression}) {storage} "
+        f"COMMENT '{GENERATED_COLUMN_COMMENT_PREFIX}{fingerprint}'"
+    )
+    return source_column, definition, f"{GENERATED_COLUMN_COMMENT_PREFIX}{fingerprint}"
+
+
+def execute_ddl(cursor, sql: str) -> None:
+    """Run a DDL statement in its own trace span"""
+    with tracing.span("mysql.ddl", {"db.statement": " ".join(sql.split())[:500]}):
+        cursor.execute(sql)
+
+
+def alter_table_online(cursor, table_name: str, clause: str) -> None:
+    """Run an ALTER TABLE with the least locking algorithm MySQL accepts for it"""
+    with tracing.span("mysql.ddl", {"db.statement": f"ALTER TABLE `{table_name}` {clause}"[:500]}) as ddl_span:
+        for retries, options in enumerate((", ALGORITHM=INSTANT", ", ALGORITHM=INPLACE, LOCK=NONE", "")):
+            try:
+                cursor.execute(f"ALTER TABLE `{table_name}` {clause}{options}")
+                ddl_span.set_attributes({"retries": retries, "algorithm": options.strip(", ") or "DEFAULT"})
+                return
+            except Error as e:
+                # 1845/1846: algorithm/lock not supported for this operation, try the next one.
+                # 1064: MySQL before 8.0 does not know ALGORITHM=INSTANT and reports a syntax
+                # error; a genuine syntax error in the clause still raises on the last attempt.
+                if options and e.errno in (1845, 1846, 1064):
+                    continue
+                raise
+
+
+def ensure_generated_columns(connection: mysql.connector.MySQLConnection, sync_request: JiraSyncRequest) -> None:
+    """Create or update the declared JSON-path generated columns and their indexes"""
+    table_name = sync_request.mysql_table
+    field_mapping = sync_request.fields if isinstance(sync_request.fields, dict) else None
+    cursor = connection.cursor()
+    
+    try:
+        cursor.execute("""
+            SELECT COLUMN_NAME, EXTRA, COLUMN_COMMENT
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table_name,))
+        columns = {name: (extra or "", comment or "") for name, extra, comment in cursor.fetchall()}
+        
+        cursor.execute("""
+            SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table_name,))
+        indexes = {row[0] for row in cursor.fetchall()}
+        
+        for spec in sync_request.generated_columns:
+            source_column, definition, comment = build_generated_column_sql(spec, field_mapping)
+            
+            if source_column not in columns:
+                logger.warning(f"Columna generada {spec.name}: la columna origen {source_column} no existe todavía")
+                continue
+            
+            if spec.name not in columns:
+                alter_table_online(cursor, table_name, f"ADD COLUMN {definition}")
+                logger.info(f"Added generated column: {spec.name} ({spec.path})")
+            else:
+                extra, current_comment = columns[spec.name]
+                if not is_generated_column(extra):
+                    logger.warning(f"Columna generada {spec.name}: ya existe como columna normal, se omite")
+                    continue
+                if current_comment != comment:
+                    stored_now = "STORED" in extra.upper()
+                    if stored_now != (spec.storage.upper() == "STORED"):
+                        # VIRTUAL <-> STORED cannot be changed in place
+                        execute_ddl(cursor, f"ALTER TABLE `{table_name}` DROP COLUMN `{spec.name}`")
+                        alter_table_online(cursor, table_name, f"ADD COLUMN {definition}")
+                    else:
+                        execute_ddl(cursor, f"ALTER TABLE `{table_name}` MODIFY COLUMN {definition}")
+                    logger.info(f"Updated generated column: {spec.name} ({spec.path})")
+            
+            index_name = f"idx_gen_{spec.name}"[:64]
+            if spec.index and index_name not in indexes:
+                alter_table_online(cursor, table_name, f"ADD INDEX `{index_name}` (`{spec.name}`)")
+                indexes.add(index_name)
+                logger.info(f"Added index {index_name} on generated column {spec.name}")
+        
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def ensure_table_exists(connection: mysql.connector.MySQLConnection, 
+                       sync_request: JiraSyncRequest, 
+                       issues: List[Dict[str, Any]]) -> None:
+    """Ensure table exists with all necessary columns"""
+    cursor = connection.cursor()
+    
+    # Extract field mapping if provided
+    field_mapping = None
+    if isinstance(sync_request.fields, dict):
+        field_mapping = sync_request.fields
+    
+    # Get sample of fields from issues to determine structure
+    all_fields = set()
+    field_types = {}
+    
+    for issue in issues[:10]:  # Sample first 10 issues
+        flat_issue = flatten_issue_fields(issue, field_mapping)
+        for field_name, field_value in flat_issue.items():
+            all_fields.add(field_name)
+            if field_name not in field_types and field_value is not None:
+                field_types[field_name] = get_field_type(field_value)
+    
+    # Create table if not exists
+    create_table_sql = f"""
+    CREATE TABLE IF NOT EXISTS {sync_request.mysql_table} (
+        `key` VARCHAR(255) PRIMARY KEY,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+    """
+    execute_ddl(cursor, create_table_sql)
+    
+    # Get existing columns
+    cursor.execute(f"DESCRIBE {sync_request.mysql_table}")
+    existing_columns = set(row[0] for row in cursor.fetchall())
+    
+    # Add missing columns
+    for field_name in all_fields:
+        if field_name not in existing_columns:
+            field_type = field_types.get(field_name, "TEXT")
+            alter_sql = f"ALTER TABLE {sync_request.mysql_table} ADD COLUMN `{field_name}` {field_type}"
+            try:
+                execute_ddl(cursor, alter_sql)
+                logger.info(f"Added column: {field_name} ({field_type})")
+            except Error as e:
+                logger.warning(f"Could not add column {field_name}: {e}")
+    
+    connection.commit()
+    cursor.close()
+    
+    if sync_request.normalize_list_fields:
+        ensure_list_field_tables(connection, sync_request)
+    
+    if sync_request.generated_columns:
+        ensure_generated_columns(connection, sync_request)
+
+
+UPSERT_BATCH_SIZE = 500  # Issues per upsert trace span
+
+
+def build_upsert_sql(table_name: str, columns: List[str]) -> str:
+    """INSERT ... ON DUPLICATE KEY UPDATE for one flattened issue with the given columns"""
+    placeholders = ", ".join(["%s"] * len(columns))
+    update_clause = ", ".join([f"`{col}` = VALUES(`{col}`)" for col in columns if col != "key"])
+    return f"""
+    INSERT INTO {table_name} ({', '.join([f'`{col}`' for col in columns])})
+    VALUES ({placeholders})
+    ON DUPLICATE KEY UPDATE {update_clause}
+    """
+
+
+def sync_issues_to_database_with_progress(connection: mysql.connector.MySQLConnection,
+                                        sync_request: JiraSyncRequest,
+                                        issues: List[Dict[str, Any]],
+                                        task_id: str, done_before: int = 0,
+                                        overall_total: Optional[int] = None,
+                                        progress_base: int = 50, progress_span: int = 50,
+                                        backup_tee: Optional[BackupTee] = None) -> int:
+    """
+    Sync issues to database with progress tracking.
+    
+    Progress maps onto progress_base..progress_base+progress_span; chunked callers pass
+    the issues already synced (done_before) and the overall total. With a backup_tee,
+    the rows of each batch are appended to the backup as soon as the batch is upserted.
+    """
+    cursor = connection.cursor()
+    synced_count = 0
+    total_issues = len(issues)
+    progress_total = overall_total or total_issues
+    
+    logger.info(f"Task {task_id}: Iniciando sincronización de {total_issues} issues")
+    log_throttle = logging_setup.LogThrottle()
+    # A bad column fails every row the same way: log a few, count the rest
+    row_errors = logging_setup.RepeatedErrorLog(
+        logger, counts=background_tasks_store[task_id].setdefault("row_errors", {})
+    )
+    
+    # Extract field mapping if provided
+    field_mapping = None
+    if isinstance(sync_request.fields, dict):
+        field_mapping = sync_request.fields
+    
+    for batch_start in range(0, total_issues, UPSERT_BATCH_SIZE):
+        check_task_cancelled(task_id)
+        batch = issues[batch_start:batch_start + UPSERT_BATCH_SIZE]
+        with tracing.span("mysql.upsert_batch", {"batch.start": done_before + batch_start}) as batch_span:
+            synced_before_batch = synced_count
+            written_issues = []
+            for index, issue in enumerate(batch, start=batch_start):
+                flat_issue = flatten_issue_fields(issue, field_mapping)
+                
+                # Build dynamic INSERT ... ON DUPLICATE KEY UPDATE query
+                columns = list(flat_issue.keys())
+                values = [flat_issue[col] for col in columns]
+                insert_sql = build_upsert_sql(sync_request.mysql_table, columns)
+                
+                try:
+                    cursor.execute(insert_sql, values)
+                    synced_count += 1
+                    if backup_tee is not None:
+                        written_issues.append(flat_issue)
+                    
+                    # Update progress (50-100% range)
+                    if index % 10 == 0 or index == total_issues - 1:  # Update every 10 issues or on last
+                        progress = progress_base + min(int((done_before + index + 1) / progress_total * progress_span),
+                                                       progress_span)
+                        background_tasks_store[task_id].update({
+                            "progress": progress,
+                            "processed_issues": done_before + synced_count,
+                            "message": f"Sincronizando: {done_before + synced_count}/{progress_total} issues"
+                        })
+                        
+                        if log_throttle.ready():
+                            logger.info(f"Task {task_id}: Progreso {done_before + synced_count}/{progress_total} issues")
+                
+                except Error as e:
+                    row_errors.error(f"issue {issue.get('key')}", e)
+            
+            if backup_tee is not None:
+                backup_tee.write_batch(connection, written_issues)
+            batch_span.set_attributes({"rows": synced_count - synced_before_batch,
+                                       "errors": len(batch) - (synced_count - synced_before_batch)})
+    
+    connection.commit()
+    cursor.close()
+    row_errors.log_summary()
+    
+    logger.info(f"Task {task_id}: Sincronización completada - {synced_count}/{total_issues} issues")
+    
+    return synced_count
+
+
+@app.get("/sync-status/{task_id}")
+async def get_sync_status(task_id: str):
+    """Get the status of a background sync task"""
+    task_info = background_tasks_store.get(task_id)
+    if task_info is None and JOB_QUEUE_MODE == "mysql":
+        task_info = await run_in_threadpool(load_job_state, task_id)
+    if task_info is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    # Calculate percentage if in progress
+    if task_info["status"] in ["descargando", "sincronizando"] and task_info["total_issues"] > 0:
+        percentage = task_info["progress"]
+    elif task_info.get("type", "sync") != "sync" and task_info["status"] not in ["completado", "error"]:
+        percentage = task_info["progress"]
+    else:
+        percentage = 0 if task_info["status"] not in ["completado"] else 100
+    
+    return {
+        "task_id": task_id,
+        "type": task_info.get("type", "sync"),
+        "status": task_info["status"],
+        "progress_percentage": percentage,
+        "total_issues": task_info["total_issues"],
+        "processed_issues": task_info["processed_issues"],
+        "message": task_info["message"],
+        "started_at": task_info["started_at"],
+        "completed_at": task_info["completed_at"],
+        "error": task_info["error"],
+        "result": task_info.get("result"),
+        "timings": task_info.get("timings", {}),
+        "statements": task_info.get("statements", {})
+    }
+
+
+@app.get("/sync-tasks")
+async def list_sync_tasks(limit: int = 10):
+    """List recent sync tasks"""
+    tasks = list(background_tasks_store.values())
+    if JOB_QUEUE_MODE == "mysql":
+        # Jobs may run on other processes; the shared table has the freshest state of those
+        shared_tasks = await run_in_threadpool(list_job_states, limit)
+        shared_ids = {task["id"] for task in shared_tasks}
+        tasks = shared_tasks + [task for task in tasks if task["id"] not in shared_ids]
+    
+    # Get tasks sorted by start time (most recent first)
+    sorted_tasks = sorted(
+        tasks,
+        key=lambda x: x["started_at"],
+        reverse=True
+    )[:limit]
+    
+    return {
+        "tasks": sorted_tasks,
+        "total": len(tasks)
+    }
+
+
+@app.delete("/sync-tasks/{task_id}")
+def delete_sync_task(task_id: str):
+    """Delete a sync task and its associated backup file"""
+    try:
+        job_deleted = JOB_QUEUE_MODE == "mysql" and delete_job(task_id)
+        
+        # Get task info
+        if task_id not in background_tasks_store:
+            # Check in database
+            connection = db_instrumentation.connect(
+                host=os.getenv("MYSQL_HOST", "localhost"),
+                user=os.getenv("MYSQL_USER", "root"),
+                password=os.getenv("MYSQL_PASSWORD", ""),
+                database=os.getenv("MYSQL_DATABASE", "jiradb")
+            )
+            
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT backup_file FROM sync_logs WHERE task_id = %s
+            """, (task_id,))
+            
+            result = cursor.fetchone()
+            if not result and not job_deleted:
+                raise HTTPException(status_code=404, detail="Task not found")
+            
+            backup_file = result['backup_file'] if result else None
+            
+            # Delete from database
+            cursor.execute("DELETE FROM sync_logs WHERE task_id = %s", (task_id,))
+            connection.commit()
+            invalidate_log_totals()
+            task_record_cache.invalidate(task_id)
+            cursor.close()
+            connection.close()
+        else:
+            # Get backup file from memory
+            backup_file = background_tasks_store[task_id].get('backup_file')
+            
+            # Remove from memory
+            del background_tasks_store[task_id]
+        
+        # Delete backup file if exists
+        if backup_file:
+            backup_path = BACKUPS_DIR / backup_file
+            if backup_path.exists():
+                backup_path.unlink()
+                logger.info(f"Deleted backup file: {backup_file}")
+            remove_from_backup_catalog([backup_file])
+        
+        return {"message": f"Task {task_id} deleted successfully"}
+    
+    except Exception as e:
+        logger.error(f"Error deleting task: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/sync-logs/{task_id}")
+def get_sync_log_details(task_id: str):
+    """Get detailed information about a specific sync task"""
+    cached = task_record_cache.get("details", task_id)
+    if cached is not None:
+        return cached
+    
+    try:
+        connection = db_instrumentation.connect(
+            host=os.getenv("MYSQL_HOST", "localhost"),
+            user=os.getenv("MYSQL_USER", "root"),
+            password=os.getenv("MYSQL_PASSWORD", ""),
+            database=os.getenv("MYSQL_DATABASE", "jiradb")
+        )
+        
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT * FROM sync_logs WHERE task_id = %s
+        """, (task_id,))
+        
+        result = cursor.fetchone()
+        cursor.close()
+        connection.close()
+        
+        if not result:
+            raise HTTPException(status_code=404, detail="Task not found")
+        
+        # Parse JSON fields if they exist
+        if result.get('config') and result['config']:
+            try:
+                result['config'] = json.loads(result['config'])
+            except:
+                result['config'] = None
+                
+        if result.get('result') and result['result']:
+            try:
+                result['result'] = json.loads(result['result'])
+            except:
+                result['result'] = None
+        
+        # Convert datetime to string
+        if result.get('created_at'):
+            result['created_at'] = result['created_at'].isoformat()
+        if result.get('updated_at'):
+            result['updated_at'] = result['updated_at'].isoformat()
+        if result.get('started_at'):
+            result['started_at'] = result['started_at'].isoformat()
+        if result.get('completed_at'):
+            result['completed_at'] = result['completed_at'].isoformat()
+        if result.get('heartbeat_at'):
+            result['heartbeat_at'] = result['heartbeat_at'].isoformat()
+        
+        if result.get('status') in CACHEABLE_TASK_STATUSES:
+            task_record_cache.put("details", task_id, result)
+        
+        return result
+    
+    except HTTPException:
+        raise
+    except mysql.connector.Error as e:
+        logger.error(f"Database error: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error retrieving log details: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+SYNC_LOG_LIST_COLUMNS = [
+    "id", "task_id", "status", "total_issues", "processed_issues", "started_at", "completed_at",
+    "created_at", "backup_file", "error_message", "jql_query", "mysql_table", "task_type",
+    "progress", "stage", "status_message", "heartbeat_at"
+]
+LOG_TOTALS_CACHE_TTL = 30  # seconds
+_log_totals_cache: Dict[tuple, tuple] = {}  # filters -> (cached_at, total, is_estimate)
+_log_totals_lock = threading.Lock()
+
+
+def encode_log_cursor(log: Dict[str, Any]) -> str:
+    """Encode the (started_at, id) position of a log row as an opaque cursor"""
+    raw = json.dumps([log["started_at"].isoformat(), log["id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_log_cursor(cursor_token: str) -> tuple:
+    """Decode a cursor produced by encode_log_cursor"""
+    try:
+        started_at, log_id = json.loads(base64.urlsafe_b64decode(cursor_token.encode()).decode())
+        return datetime.fromisoformat(started_at), int(log_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def build_log_filters(status: Optional[str], date_from: Optional[str], date_to: Optional[str],
+                      table: Optional[str], jql: Optional[str], task_type: Optional[str] = None) -> tuple:
+    """Return (where_clauses, params) for the sync_logs listing filters"""
+    clauses, params = [], []
+    if task_type:
+        clauses.append("task_type = %s")
+        params.append(task_type)
+    if status:
+        clauses.append("status = %s")
+        params.append(status)
+    if date_from:
+        clauses.append("started_at >= %s")
+        params.append(date_from)
+    if date_to:
+        clauses.append("started_at <= %s")
+        params.append(date_to)
+    if table:
+        clauses.append("mysql_table = %s")
+        params.append(table)
+    if jql:
+        escaped = jql.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        clauses.append("jql_query LIKE %s")
+        params.append(f"%{escaped}%")
+    return clauses, params
+
+
+def get_approximate_log_total(cursor, filters_key: tuple, clauses: List[str], params: List[Any]) -> tuple:
+    """
+    Return (total, is_estimate) for a filter set, cached for LOG_TOTALS_CACHE_TTL seconds.
+    
+    Without filters the InnoDB row estimate is used instead of COUNT(*).
+    """
+    now = time.monotonic()
+    with _log_totals_lock:
+        cached = _log_totals_cache.get(filters_key)
+        if cached and now - cached[0] < LOG_TOTALS_CACHE_TTL:
+            return cached[1], cached[2]
+    
+    if clauses:
+        cursor.execute(f"SELECT COUNT(*) AS total FROM sync_logs WHERE {' AND '.join(clauses)}", params)
+        total, is_estimate = cursor.fetchone()["total"], False
+    else:
+        cursor.execute("""
+            SELECT TABLE_ROWS AS total FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'sync_logs'
+        """)
+        row = cursor.fetchone()
+        total, is_estimate = int(row["total"] or 0) if row else 0, True
+    
+    with _log_totals_lock:
+        _log_totals_cache[filters_key] = (now, total, is_estimate)
+    return total, is_estimate
+
+
+def invalidate_log_totals() -> None:
+    """Forget cached log totals after logs are deleted"""
+    with _log_totals_lock:
+        _log_totals_cache.clear()
+
+
+TASK_RECORD_CACHE_SIZE = int(os.getenv("TASK_RECORD_CACHE_SIZE", "512"))
+CACHEABLE_TASK_STATUSES = ("completado", "error")
+
+
+class TaskRecordCache:
+    """
+    Bounded LRU cache of sync_logs records of finished tasks.
+    
+    Records in a terminal state never change on their own, so they are only
+    dropped when evicted or when a delete/reset/retention path invalidates them.
+    Keys are (view, task_id) so each endpoint can cache its own shape.
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def get(self, view: str, task_id: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get((view, task_id))
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((view, task_id))
+            self.hits += 1
+        return copy.deepcopy(value)  # Callers decorate the record; keep the cached one pristine
+    
+    def put(self, view: str, task_id: str, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[(view, task_id)] = value
+            self._entries.move_to_end((view, task_id))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, task_id: Optional[str] = None) -> None:
+        """Drop one task's records, or everything when task_id is None"""
+        with self._lock:
+            if task_id is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[1] == task_id]:
+                    del self._entries[key]
+            self.invalidations += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "invalidations": self.invalidations
+            }
+
+
+task_record_cache = TaskRecordCache(TASK_RECORD_CACHE_SIZE)
+_sync_logs_columns: Optional[List[str]] = None  # DESCRIBE sync_logs, cached per process
+
+
+def get_sync_logs_columns(cursor) -> Optional[List[str]]:
+    """Column names of sync_logs (None if the table does not exist), introspected once per process"""
+    global _sync_logs_columns
+    if _sync_logs_columns is None:
+        cursor.execute("SHOW TABLES LIKE 'sync_logs'")
+        if not cursor.fetchall():
+            return None
+        cursor.execute("DESCRIBE sync_logs")
+        _sync_logs_columns = [row['Field'] if isinstance(row, dict) else row[0] for row in cursor.fetchall()]
+    return _sync_logs_columns
+
+
+def invalidate_sync_logs_schema() -> None:
+    global _sync_logs_columns
+    _sync_logs_columns = None
+
+
+def query_sync_logs(limit: int, cursor_token: Optional[str] = None, offset: int = 0,
+                    status: Optional[str] = None, date_from: Optional[str] = None,
+                    date_to: Optional[str] = None, table: Optional[str] = None,
+                    jql: Optional[str] = None, include_total: bool = True,
+                    task_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    List sync_logs newest first using keyset pagination on (started_at, id).
+    
+    A cursor continues after the last row of the previous page through the
+    idx_started_at_id index; offset is only kept for older clients.
+    """
+    connection = get_logs_connection()
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        clauses, params = build_log_filters(status, date_from, date_to, table, jql, task_type)
+        filters_key = (status, date_from, date_to, table, jql, task_type)
+        
+        total, total_is_estimate = (None, None)
+        if include_total:
+            total, total_is_estimate = get_approximate_log_total(cursor, filters_key, clauses, params)
+        
+        page_clauses, page_params = list(clauses), list(params)
+        if cursor_token:
+            started_at, log_id = decode_log_cursor(cursor_token)
+            page_clauses.append("(started_at < %s OR (started_at = %s AND id < %s))")
+            page_params.extend([started_at, started_at, log_id])
+            offset = 0
+        
+        where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+        cursor.execute(f"""
+            SELECT {', '.join(SYNC_LOG_LIST_COLUMNS)}
+            FROM sync_logs
+            {where}
+            ORDER BY started_at DESC, id DESC
+            LIMIT %s OFFSET %s
+        """, page_params + [limit + 1, offset])
+        logs = cursor.fetchall()
+    finally:
+        cursor.close()
+        connection.close()
+    
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+    next_cursor = encode_log_cursor(logs[-1]) if has_more and logs else None
+    
+    # Convert datetime to string
+    for log in logs:
+        for key in ("started_at", "completed_at", "created_at"):
+            if log.get(key):
+                log[key] = log[key].isoformat()
+    
+    return {
+        "logs": logs,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "total": total,
+        "total_is_estimate": total_is_estimate
+    }
+
+
+@app.get("/api/logs")
+def list_sync_logs(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    table: Optional[str] = None,
+    jql: Optional[str] = None,
+    task_type: Optional[str] = None,
+    include_total: bool = True
+):
+    """List sync logs with cursor pagination and filters on type, status, dates, table and JQL substring"""
+    try:
+        return query_sync_logs(limit, cursor, 0, status, date_from, date_to, table, jql, include_total, task_type)
+    except HTTPException:
+        raise
+    except mysql.connector.Error as e:
+        logger.error(f"Database error: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error listing logs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/sync-logs")
+def get_all_sync_logs(
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None
+):
+    """Get all sync logs with pagination (prefer cursor over offset)"""
+    try:
+        page = query_sync_logs(limit, cursor, offset)
+        page["offset"] = offset
+        return page
+    
+    except HTTPException:
+        raise
+    except mysql.connector.Error as e:
+        logger.error(f"Database error: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error retrieving logs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/sync-memory")
+async def get_sync_memory():
+    """Memory budget, current reservations and the per-table footprint estimates used for admission"""
+    with _memory_admission:
+        reservations = dict(_memory_reservations)
+    rss = read_rss_bytes()
+    return {
+        "budget_mb": SYNC_MEMORY_BUDGET_MB,
+        "reserved_mb": round(sum(reservations.values()) / (1024 * 1024), 1),
+        "reservations": {task_id: round(size / (1024 * 1024), 1) for task_id, size in reservations.items()},
+        "rss_mb": round(rss / (1024 * 1024), 1) if rss is not None else None,
+        "bytes_per_issue": {table: int(value) for table, value in _observed_bytes_per_issue.items()},
+        "default_bytes_per_issue": SYNC_DEFAULT_BYTES_PER_ISSUE,
+        "min_bytes_per_issue": SYNC_MIN_BYTES_PER_ISSUE
+    }
+
+
+@app.get("/debug/slow-statements")
+async def get_slow_statements(limit: int = Query(50, ge=1, le=1000), task_id: Optional[str] = None):
+    """Statements slower than SLOW_STATEMENT_MS (newest first) and per-class totals since startup"""
+    return {
+        "threshold_ms": db_instrumentation.SLOW_STATEMENT_MS,
+        "buffer_size": db_instrumentation.SLOW_STATEMENT_BUFFER_SIZE,
+        "statements": db_instrumentation.get_slow_statements(limit, task_id),
+        "totals": db_instrumentation.get_statement_stats()
+    }
+
+
+@app.delete("/debug/slow-statements")
+async def clear_slow_statements():
+    """Empty the slow-statement buffer"""
+    return {"cleared": db_instrumentation.clear_slow_statements()}
+
+
+@app.get("/debug/profile/{task_id}")
+def profile_task(
+    task_id: str,
+    seconds: float = Query(10, gt=0, le=sampling_profiler.PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$")
+):
+    """
+    Sample the worker thread of a running task for `seconds` and return its stacks.
+    
+    `collapsed` is plain text for flamegraph.pl / speedscope; `json` adds the
+    functions with the most self and total samples.
+    """
+    thread_id = sampling_profiler.get_task_thread(task_id)
+    if thread_id is None:
+        if task_id in background_tasks_store or (JOB_QUEUE_MODE == "mysql" and load_job_state(task_id)):
+            raise HTTPException(status_code=409, detail="La tarea no se está ejecutando en este proceso")
+        raise HTTPException(status_code=404, detail="Task not found")
+    
     try:
-        logger.info(f"Task {task_id}: === INICIANDO GENERACIÓN DE BACKUP ===")
-        
-        # Update task status
-        background_tasks_store[task_id]["status"] = "generando_respaldo"
-        background_tasks_store[task_id]["message"] = "Generando archivo de respaldo SQL..."
-        background_tasks_store[task_id]["progress"] = 95  # Set progress to 95%
-        
-        # Obtener zona horaria de México
-        mexico_tz = pytz.timezone('America/Mexico_City')
-        mexico_time = datetime.now(mexico_tz)
-        
-        # Formato de fecha y hora para el nombre del archivo
-        timestamp = mexico_time.strftime("%Y-%m-%d_%H-%M-%S")
-        backup_filename = f"jira_sync_{timestamp}.sql"
-        backup_path = BACKUPS_DIR / backup_filename
-        
-        logger.info(f"Task {task_id}: Generando backup en: {backup_path}")
-        logger.info(f"Task {task_id}: Directorio de backups: {BACKUPS_DIR.absolute()}")
-        
-        # Ensure backups directory exists
-        BACKUPS_DIR.mkdir(exist_ok=True)
-        
-        # Always use Python-based backup for reliability
-        logger.info(f"Task {task_id}: Usando método Python para generar backup")
-        
-        # Generate backup using Python
-        connection = mysql.connector.connect(
-            host=config.mysql_host,
-            port=config.mysql_port,
-            user=config.mysql_user,
-            password=config.mysql_password,
-            database=config.mysql_database
-        )
-        
-        cursor = connection.cursor()
-        
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            # Write header
-            f.write(f"-- Jira Sync Backup\n")
-            f.write(f"-- Generated: {mexico_time.strftime('%Y-%m-%d %H:%M:%S')} (Mexico/Ciudad de México)\n")
-            f.write(f"-- Task ID: {task_id}\n")
-            f.write(f"-- Table: {table_name}\n")
-            f.write(f"-- Total Issues: {total_issues}\n")
-            f.write(f"-- Database: {config.mysql_database}\n")
-            f.write(f"-- Host: {config.mysql_host}\n")
-            f.write(f"-- ====================================\n\n")
-            
-            f.write(f"-- Backup Path: {backup_path.absolute()}\n")
-            f.write(f"-- Container Path: /app/backups/{backup_filename}\n\n")
-            
-            f.write(f"USE `{config.mysql_database}`;\n\n")
-            
-            # Get CREATE TABLE statement
-            cursor.execute(f"SHOW CREATE TABLE `{table_name}`")
-            create_result = cursor.fetchone()
-            if create_result:
-                create_table = create_result[1]
-                f.write(f"-- Table structure for table `{table_name}`\n")
-                f.write(f"DROP TABLE IF EXISTS `{table_name}`;\n")
-                f.write(f"{create_table};\n\n")
-                
-                # Get all data
-                cursor.execute(f"SELECT * FROM `{table_name}`")
-                columns = [desc[0] for desc in cursor.description]
-                rows = cursor.fetchall()
-                
-                logger.info(f"Task {task_id}: Escribiendo {len(rows)} filas al backup")
-                
-                if rows:
-                    f.write(f"-- Data for table `{table_name}`\n")
-                    f.write(f"LOCK TABLES `{table_name}` WRITE;\n")
-                    f.write(f"/*!40000 ALTER TABLE `{table_name}` DISABLE KEYS */;\n\n")
-                    
-                    # Write INSERT statements in batches
-                    batch_size = 100
-                    for batch_start in range(0, len(rows), batch_size):
-                        batch_end = min(batch_start + batch_size, len(rows))
-                        f.write(f"INSERT INTO `{table_name}` ({', '.join([f'`{col}`' for col in columns])}) VALUES\n")
-                        
-                        for i in range(batch_start, batch_end):
-                            row = rows[i]
-                            values = []
-                            for value in row:
-                                if value is None:
-                                    values.append("NULL")
-                                elif isinstance(value, (int, float)):
-                                    values.append(str(value))
-                                elif isinstance(value, datetime):
-                                    values.append(f"'{value.strftime('%Y-%m-%d %H:%M:%S')}'")
-                                elif isinstance(value, bytes):
-                                    hex_value = value.hex()
-                                    values.append(f"0x{hex_value}")
-                                else:
-                                    # Escape special characters
-                                    escaped = str(value).replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
-                                    values.append(f"'{escaped}'")
-                            
-                            if i < batch_end - 1:
-                                f.write(f"({', '.join(values)}),\n")
-                            else:
-                                f.write(f"({', '.join(values)});\n")
-                        
-                        f.write("\n")
-                    
-                    f.write(f"/*!40000 ALTER TABLE `{table_name}` ENABLE KEYS */;\n")
-                    f.write("UNLOCK TABLES;\n")
-                else:
-                    f.write(f"-- No data found in table `{table_name}`\n")
-            else:
-                f.write(f"-- ERROR: Could not get table structure for `{table_name}`\n")
-            
-            f.write(f"\n-- End of backup\n")
-            f.write(f"-- File size will be calculated after closing\n")
+        profile = sampling_profiler.sample_thread(thread_id, seconds, interval_ms / 1000)
+    except sampling_profiler.ProfilerBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    if format == "collapsed":
+        return PlainTextResponse(sampling_profiler.to_collapsed(profile["stacks"]), headers={
+            "X-Profile-Samples": str(profile["samples"]),
+            "X-Profile-Duration": str(profile["duration_s"])
+        })
+    stacks = profile.pop("stacks")
+    return {
+        "task_id": task_id,
+        **profile,
+        "top_functions": sampling_profiler.top_functions(stacks),
+        "stacks": [{"stack": stack, "count": count} for stack, count in stacks.most_common()]
+    }
+
+
+@app.get("/sync-timings")
+def get_sync_timings(
+    limit: int = Query(50, ge=1, le=500),
+    table: Optional[str] = None
+):
+    """Aggregate per-stage timings of recent completed syncs, grouped by table"""
+    try:
+        connection = get_logs_connection()
         
+        cursor = connection.cursor(dictionary=True)
+        # Filter in SQL, before the LIMIT: a table missing from the last `limit` runs still has history
+        table_filter = "AND mysql_table = %s" if table else ""
+        cursor.execute(f"""
+            SELECT task_id, started_at, result
+            FROM sync_logs
+            WHERE status = 'completado' AND result IS NOT NULL {table_filter}
+            ORDER BY started_at DESC
+            LIMIT %s
+        """, (table, limit) if table else (limit,))
+        rows = cursor.fetchall()
         cursor.close()
         connection.close()
         
-        # Verify file was created
-        if backup_path.exists():
-            file_size = backup_path.stat().st_size
-            logger.info(f"Task {task_id}: Backup generado exitosamente: {backup_filename} ({file_size} bytes)")
-            logger.info(f"Task {task_id}: Ruta absoluta: {backup_path.absolute()}")
-            
-            # Update task with backup info
-            background_tasks_store[task_id]["backup_file"] = backup_filename
-            background_tasks_store[task_id]["backup_path"] = str(backup_path)
-            background_tasks_store[task_id]["backup_absolute_path"] = str(backup_path.absolute())
-            background_tasks_store[task_id]["backup_size"] = file_size
-            
-            return backup_filename
-        else:
-            logger.error(f"Task {task_id}: ERROR - El archivo de backup no se creó!")
-            return None
+        # table -> stage -> list of timing entries
+        per_table: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        runs_per_table: Dict[str, int] = {}
+        for row in rows:
+            result = row["result"]
+            if isinstance(result, (str, bytes)):
+                try:
+                    result = json.loads(result)
+                except ValueError:
+                    continue
+            if not result or not result.get("timings"):
+                continue
+            table_name = result.get("mysql_table") or "desconocida"
+            runs_per_table[table_name] = runs_per_table.get(table_name, 0) + 1
+            stages = per_table.setdefault(table_name, {})
+            for stage, entry in result["timings"].items():
+                stages.setdefault(stage, []).append(entry)
+        
+        tables = []
+        for table_name, stages in per_table.items():
+            stage_summary = {}
+            ordered = [s for s in SYNC_STAGES if s in stages] + [s for s in stages if s not in SYNC_STAGES]
+            for stage in ordered:
+                entries = stages[stage]
+                walls = sorted(e.get("wall_ms", 0) for e in entries)
+                rates = [e["rows_per_sec"] for e in entries if e.get("rows_per_sec")]
+                stage_summary[stage] = {
+                    "runs": len(entries),
+                    "avg_wall_ms": round(sum(walls) / len(walls), 2),
+                    "p50_wall_ms": walls[len(walls) // 2],
+                    "max_wall_ms": walls[-1],
+                    "avg_cpu_ms": round(sum(e.get("cpu_ms", 0) for e in entries) / len(entries), 2),
+                    "avg_bytes": int(sum(e.get("bytes", 0) for e in entries) / len(entries)),
+                    "avg_rows_per_sec": round(sum(rates) / len(rates), 2) if rates else None
+                }
+            tables.append({
+                "table": table_name,
+                "runs": runs_per_table[table_name],
+                "stages": stage_summary
+            })
+        
+        return {
+            "limit": limit,
+            "tables": tables
+        }
     
+    except mysql.connector.Error as e:
+        logger.error(f"Database error: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except Exception as e:
-        logger.error(f"Task {task_id}: Error al generar backup: {str(e)}")
-        logger.exception(e)  # Log full traceback
-        background_tasks_store[task_id]["error"] = f"Error al generar backup: {str(e)}"
-        return None
+        logger.error(f"Error aggregating sync timings: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 
-def get_field_type(value: Any) -> str:
-    """Determine MySQL field type based on value"""
-    if isinstance(value, bool):
-        return "BOOLEAN"
-    elif isinstance(value, int):
-        return "BIGINT"
-    elif isinstance(value, float):
-        return "DOUBLE"
-    elif isinstance(value, dict) or isinstance(value, list):
-        return "JSON"
-    else:
-        # Default to TEXT for strings and unknown types
-        return "TEXT"
+@app.get("/backups")
+def list_backups(
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    table: Optional[str] = None,
+    task_id: Optional[str] = None,
+    kind: Optional[str] = None
+):
+    """List backup files from the backup catalog, newest first"""
+    try:
+        reconcile_backup_catalog()
+        
+        clauses, params = [], []
+        if table:
+            clauses.append("table_name = %s")
+            params.append(table)
+        if task_id:
+            clauses.append("task_id = %s")
+            params.append(task_id)
+        if kind:
+            clauses.append("kind = %s")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        connection = get_logs_connection()
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(f"SELECT COUNT(*) AS total FROM backup_catalog {where}", params)
+            total = cursor.fetchone()["total"]
+            cursor.execute(f"""
+                SELECT * FROM backup_catalog {where}
+                ORDER BY created_at DESC, filename DESC
+                LIMIT %s OFFSET %s
+            """, params + [limit, offset])
+            entries = cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
+        
+        return {
+            "backups": [format_catalog_entry(entry) for entry in entries],
+            "total": total,
+            "limit": limit,
+            "offset": offset
+        }
+    
+    except mysql.connector.Error as e:
+        logger.error(f"Database error listing backups: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-def flatten_issue_fields(issue: Dict[str, Any], field_mapping: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-    """Flatten nested issue fields for database storage with optional custom mapping"""
-    flat_data = {"key": issue.get("key")}
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+RANGE_HEADER_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class BackupFileResponse(Response):
+    """
+    Stream a byte range of a backup file.
     
-    # Process standard fields
-    for field_name, field_value in issue.get("fields", {}).items():
-        # Determine the database column name
-        if field_mapping and field_name in field_mapping:
-            db_field_name = field_mapping[field_name]
-        else:
-            db_field_name = field_name
+    Uses the ASGI zero-copy extension (sendfile) when the server offers it and
+    falls back to chunked reads; with `compress` the body is gzipped on the fly.
+    """
+    
+    def __init__(self, path: Path, start: int, length: int, status_code: int,
+                 headers: Dict[str, str], media_type: str, compress: bool = False):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.length = length
+        self.compress = compress
+        if compress:
+            # Unknown length: drop the Content-Length computed for the empty body
+            self.raw_headers = [(k, v) for k, v in self.raw_headers if k != b"content-length"]
+    
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        
+        if scope.get("method") == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        
+        with open(self.path, "rb") as file:
+            if not self.compress and "http.response.zerocopy" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": file,
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False
+                })
+                return
             
-        if isinstance(field_value, dict):
-            # Handle complex fields (like status, priority, etc.)
-            if "name" in field_value:
-                flat_data[f"{db_field_name}_name"] = field_value.get("name")
-            if "value" in field_value:
-                flat_data[f"{db_field_name}_value"] = field_value.get("value")
-            # Store full JSON for complex objects
-            flat_data[db_field_name] = json.dumps(field_value)
-        elif isinstance(field_value, list):
-            # Store lists as JSON
-            flat_data[db_field_name] = json.dumps(field_value)
-        else:
-            flat_data[db_field_name] = field_value
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if self.compress else None
+            await run_in_threadpool(file.seek, self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await run_in_threadpool(file.read, min(DOWNLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                    if remaining <= 0:
+                        chunk += compressor.flush()
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # File shrank while streaming; close the body
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def get_backup_etag(filename: str, stat_result: os.stat_result) -> str:
+    """Strong ETag from the catalog checksum, or a weak one from size/mtime when unavailable"""
+    try:
+        entry = get_backup_catalog_entry(filename)
+    except Exception as e:
+        logger.warning(f"Could not read catalog entry for {filename}: {e}")
+        entry = None
+    if entry and entry.get("checksum") and entry.get("size_bytes") == stat_result.st_size:
+        return f'"{entry["checksum"]}"'
+    return f'W/"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def etag_matches(header_value: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if header_value.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header_value.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def parse_range_header(range_header: str, size: int) -> Optional[tuple]:
+    """
+    Parse a single `bytes=` range into (start, end) inclusive.
     
-    return flat_data
+    Returns None when the header should be ignored (multiple or malformed ranges)
+    and raises ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_HEADER_RE.match(range_header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    if not match.group(1):
+        suffix = int(match.group(2))
+        if suffix == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - suffix, 0), size - 1
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
 
 
-def ensure_table_exists(connection: mysql.connector.MySQLConnection, 
-                       sync_request: JiraSyncRequest, 
-                       issues: List[Dict[str, Any]]) -> None:
-    """Ensure table exists with all necessary columns"""
-    cursor = connection.cursor()
+@app.api_route("/backups/{filename}", methods=["GET", "HEAD"])
+async def download_backup(filename: str, request: Request):
+    """Download a backup file with Range, conditional request and gzip support"""
+    backup_path = BACKUPS_DIR / filename
     
-    # Extract field mapping if provided
-    field_mapping = None
-    if isinstance(sync_request.fields, dict):
-        field_mapping = sync_request.fields
+    if not backup_path.exists() or not backup_path.is_file():
+        raise HTTPException(status_code=404, detail="Backup file not found")
     
-    # Get sample of fields from issues to determine structure
-    all_fields = set()
-    field_types = {}
+    stat_result = await run_in_threadpool(backup_path.stat)
+    size = stat_result.st_size
+    etag = await run_in_threadpool(get_backup_etag, filename, stat_result)
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    is_compressed = backup_path.suffix in (".gz", ".parquet", ".arrow")
+    media_type = BACKUP_MEDIA_TYPES.get(backup_path.suffix, "application/sql")
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Content-Disposition": f"attachment; filename={filename}"
+    }
     
-    for issue in issues[:10]:  # Sample first 10 issues
-        flat_issue = flatten_issue_fields(issue, field_mapping)
-        for field_name, field_value in flat_issue.items():
-            all_fields.add(field_name)
-            if field_name not in field_types and field_value is not None:
-                field_types[field_name] = get_field_type(field_value)
+    byte_range = None
+    range_unsatisfiable = False
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # If-Range needs a strong validator match (or the exact Last-Modified date)
+    if range_header and (not if_range or if_range.strip() == last_modified or
+                         (not etag.startswith("W/") and if_range.strip() == etag)):
+        try:
+            byte_range = parse_range_header(range_header, size)
+        except ValueError:
+            range_unsatisfiable = True
     
-    # Create table if not exists
-    create_table_sql = f"""
-    CREATE TABLE IF NOT EXISTS {sync_request.mysql_table} (
-        `key` VARCHAR(255) PRIMARY KEY,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-    )
-    """
-    cursor.execute(create_table_sql)
+    accepts_gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    compress = byte_range is None and not range_unsatisfiable and accepts_gzip and not is_compressed and size > 0
+    if not is_compressed:
+        headers["Vary"] = "Accept-Encoding"
+    if compress:
+        # The gzip representation has different bytes, so it gets its own validator
+        headers.update({"Content-Encoding": "gzip", "ETag": etag[:-1] + '-gzip"'})
     
-    # Get existing columns
-    cursor.execute(f"DESCRIBE {sync_request.mysql_table}")
-    existing_columns = set(row[0] for row in cursor.fetchall())
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers={
+            k: v for k, v in headers.items() if k in ("ETag", "Last-Modified", "Vary")
+        })
     
-    # Add missing columns
-    for field_name in all_fields:
-        if field_name not in existing_columns:
-            field_type = field_types.get(field_name, "TEXT")
-            alter_sql = f"ALTER TABLE {sync_request.mysql_table} ADD COLUMN `{field_name}` {field_type}"
-            try:
-                cursor.execute(alter_sql)
-                logger.info(f"Added column: {field_name} ({field_type})")
-            except Error as e:
-                logger.warning(f"Could not add column {field_name}: {e}")
+    if range_unsatisfiable:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}", "ETag": etag})
+    
+    if byte_range is not None:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return BackupFileResponse(backup_path, start, end - start + 1, 206, headers, media_type)
+    
+    if not compress:
+        headers["Content-Length"] = str(size)
+    return BackupFileResponse(backup_path, 0, size, 200, headers, media_type, compress=compress)
+
+
+class RestoreRequest(BaseModel):
+    # Target MySQL (defaults to the server's own database from the environment)
+    mysql_host: Optional[str] = None
+    mysql_port: int = 3306
+    mysql_user: Optional[str] = None
+    mysql_password: Optional[str] = None
+    mysql_database: Optional[str] = None
+    
+    target_table: Optional[str] = None  # Restore under another table name
+    parallelism: int = 1  # Connections executing INSERT batches concurrently (1-8)
+
+
+RESTORE_READ_CHUNK = 1024 * 1024
+RESTORE_SKIPPED_PREFIXES = ("USE ", "USE`", "START TRANSACTION", "BEGIN", "COMMIT", "ROLLBACK",
+                            "LOCK TABLES", "UNLOCK TABLES", "/*!40000")
+RESTORE_TABLE_HEAD_RE = re.compile(
+    r"^((?:DROP TABLE(?: IF EXISTS)?|CREATE TABLE(?: IF NOT EXISTS)?|INSERT INTO|ALTER TABLE)\s+)`[^`]+`",
+    re.IGNORECASE
+)
+TABLE_NAME_RE = re.compile(r"^[A-Za-z0-9_$]{1,64}$")
+_SQL_TOKEN_RE = re.compile(r"['\"`;#]|--|/\*")
+_SQL_QUOTE_END_RES = {q: re.compile(r"\\.|" + re.escape(q), re.DOTALL) for q in ("'", '"', "`")}
+
+
+def find_sql_token_end(buf: str, token: str, start: int) -> Optional[int]:
+    """Return the end of the string or comment opened by `token`, or None if it is not in buf yet"""
+    if token in _SQL_QUOTE_END_RES:
+        closer = _SQL_QUOTE_END_RES[token]
+        while True:
+            match = closer.search(buf, start)
+            if match is None:
+                return None
+            if match.group() == token:
+                return match.end()
+            start = match.end()  # Skip backslash escape
+    if token == "/*":
+        end = buf.find("*/", start)
+        return None if end == -1 else end + 2
+    end = buf.find("\n", start)  # "--" and "#" comments
+    return None if end == -1 else end + 1
+
+
+def strip_leading_sql_comments(text: str) -> str:
+    """Remove whitespace and comments before a statement (conditional /*! */ comments are kept)"""
+    while True:
+        text = text.lstrip()
+        if text.startswith("--") or text.startswith("#"):
+            newline = text.find("\n")
+            text = "" if newline == -1 else text[newline + 1:]
+        elif text.startswith("/*") and not text.startswith("/*!"):
+            end = text.find("*/")
+            text = "" if end == -1 else text[end + 2:]
+        else:
+            return text
+
+
+def iter_sql_statements(stream, chunk_size: int = RESTORE_READ_CHUNK):
+    """
+    Yield the statements of a SQL dump one by one, reading it in chunks.
+    
+    Semicolons inside quoted strings (with backslash escapes) and comments do not
+    split statements. Only the statement being parsed is kept in memory.
+    """
+    buf = ""
+    start = pos = 0
+    eof = False
     
-    connection.commit()
-    cursor.close()
+    while True:
+        match = _SQL_TOKEN_RE.search(buf, pos)
+        end = None
+        if match is not None and match.group() != ";":
+            end = find_sql_token_end(buf, match.group(), match.end())
+        
+        if match is None or (match.group() != ";" and end is None):
+            if eof:
+                if match is not None and match.group() in ("'", '"', "`"):
+                    raise ValueError("Unterminated quoted string in SQL dump")
+                break
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                eof = True
+                if match is not None and match.group() in ("--", "#"):
+                    break  # Trailing comment without newline
+                continue
+            # Keep only the current statement; rescan from the unfinished token
+            buf = buf[start:] + chunk
+            pos = (match.start() if match is not None else pos) - start
+            start = 0
+            continue
+        
+        if match.group() == ";":
+            statement = strip_leading_sql_comments(buf[start:match.start()])
+            if statement:
+                yield statement
+            start = pos = match.end()
+        else:
+            pos = end
+    
+    statement = strip_leading_sql_comments(buf[start:])
+    if statement:
+        yield statement
 
 
-def sync_issues_to_database_with_progress(connection: mysql.connector.MySQLConnection,
-                                        sync_request: JiraSyncRequest,
-                                        issues: List[Dict[str, Any]],
-                                        task_id: str) -> int:
-    """Sync issues to database with progress tracking"""
-    cursor = connection.cursor()
-    synced_count = 0
-    total_issues = len(issues)
+def get_restore_connection_config(restore_request: RestoreRequest) -> Dict[str, Any]:
+    """
+    MySQL settings of a restore, falling back to the server's environment.
     
-    logger.info(f"Task {task_id}: Iniciando sincronización de {total_issues} issues")
+    The server's credentials are only used for the server's own database (no mysql_host);
+    another host must come with its own user and password (see restore_backup).
+    """
+    if restore_request.mysql_host:
+        return {
+            "host": restore_request.mysql_host,
+            "port": restore_request.mysql_port,
+            "user": restore_request.mysql_user,
+            "password": restore_request.mysql_password,
+            "database": restore_request.mysql_database or os.getenv("MYSQL_DATABASE", "jiradb")
+        }
+    return {
+        "host": os.getenv("MYSQL_HOST", "localhost"),
+        "port": restore_request.mysql_port,
+        "user": restore_request.mysql_user or os.getenv("MYSQL_USER", "root"),
+        "password": restore_request.mysql_password if restore_request.mysql_password is not None
+                    else os.getenv("MYSQL_PASSWORD", ""),
+        "database": restore_request.mysql_database or os.getenv("MYSQL_DATABASE", "jiradb")
+    }
+
+
+def run_restore_task(task_id: str, filename: str, restore_request_dict: dict) -> None:
+    """
+    Restore a backup or export into MySQL, streaming it statement by statement.
     
-    # Extract field mapping if provided
-    field_mapping = None
-    if isinstance(sync_request.fields, dict):
-        field_mapping = sync_request.fields
+    DDL and session statements run on a coordinator connection; INSERT batches go
+    through a bounded queue to `parallelism` worker connections, each committing
+    its own batches. DDL waits for queued inserts so statement order is preserved.
+    """
+    restore_request = RestoreRequest(**restore_request_dict)
+    task = background_tasks_store[task_id]
+    backup_path = BACKUPS_DIR / filename
+    config = get_restore_connection_config(restore_request)
+    parallelism = max(1, min(restore_request.parallelism, 8))
+    started = time.perf_counter()
     
-    for index, issue in enumerate(issues):
-        flat_issue = flatten_issue_fields(issue, field_mapping)
-        
-        # Build dynamic INSERT ... ON DUPLICATE KEY UPDATE query
-        columns = list(flat_issue.keys())
-        values = [flat_issue[col] for col in columns]
-        
-        # Create placeholders
-        placeholders = ", ".join(["%s"] * len(columns))
-        
-        # Update columns for ON DUPLICATE KEY UPDATE
-        update_clause = ", ".join([f"`{col}` = VALUES(`{col}`)" for col in columns if col != "key"])
-        
-        insert_sql = f"""
-        INSERT INTO {sync_request.mysql_table} ({', '.join([f'`{col}`' for col in columns])})
-        VALUES ({placeholders})
-        ON DUPLICATE KEY UPDATE {update_clause}
-        """
-        
+    work: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=parallelism * 2)
+    errors: List[Exception] = []
+    counters = {"rows": 0, "statements": 0}
+    counters_lock = threading.Lock()
+    session_statements: List[str] = []
+    workers: List[threading.Thread] = []
+    # One stats dict per worker (stats updates are lock-free), merged into the task's after join()
+    worker_stats: List[Dict[str, Dict[str, Any]]] = []
+    
+    def insert_worker(stats: Dict[str, Dict[str, Any]]):
+        # Worker threads start with an empty context: tag their statements with the task
+        db_instrumentation.bind_task(task_id, stats)
+        connection = cursor = None
         try:
-            cursor.execute(insert_sql, values)
-            synced_count += 1
+            connection = db_instrumentation.connect(**config)
+            cursor = connection.cursor()
+            cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+            for statement in session_statements:
+                cursor.execute(statement)
+        except Exception as e:
+            # Keep consuming below: the coordinator blocks on put()/join() until the sentinel
+            errors.append(e)
+        try:
+            while True:
+                statement = work.get()
+                try:
+                    if statement is None:
+                        return
+                    if errors:
+                        continue  # Drain the queue after a failure
+                    cursor.execute(statement)
+                    connection.commit()
+                    with counters_lock:
+                        counters["rows"] += max(cursor.rowcount, 0)
+                        counters["statements"] += 1
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    work.task_done()
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if connection is not None:
+                connection.close()
+    
+    connection = None
+    statement_token = db_instrumentation.bind_task(task_id, task.setdefault("statements", {}))
+    sampling_profiler.register_task_thread(task_id)
+    log_token = logging_setup.bind_log_context(task_id=task_id, stage="restore")
+    try:
+        total_bytes = backup_path.stat().st_size
+        connection = db_instrumentation.connect(**config)
+        cursor = connection.cursor()
+        
+        with open(backup_path, 'rb') as raw:
+            binary = gzip.GzipFile(fileobj=raw) if filename.endswith(".gz") else raw
+            stream = io.TextIOWrapper(binary, encoding='utf-8', newline='')
             
-            # Update progress (50-100% range)
-            if index % 10 == 0 or index == total_issues - 1:  # Update every 10 issues or on last
-                progress = 50 + int((index + 1) / total_issues * 50)
-                background_tasks_store[task_id].update({
-                    "progress": progress,
-                    "processed_issues": synced_count,
-                    "message": f"Sincronizando: {synced_count}/{total_issues} issues"
-                })
+            for statement in iter_sql_statements(stream):
+                if errors:
+                    break
+                head = statement[:32].upper()
+                if head.startswith(RESTORE_SKIPPED_PREFIXES):
+                    continue
+                if restore_request.target_table:
+                    statement = RESTORE_TABLE_HEAD_RE.sub(
+                        lambda m: f"{m.group(1)}`{restore_request.target_table}`", statement, count=1
+                    )
                 
-                if index % 50 == 0:  # Log every 50 issues
-                    logger.info(f"Task {task_id}: Progreso {synced_count}/{total_issues} issues")
+                if head.startswith("INSERT"):
+                    if not workers:
+                        worker_stats = [{} for _ in range(parallelism)]
+                        workers = [threading.Thread(target=insert_worker, args=(stats,), daemon=True)
+                                   for stats in worker_stats]
+                        for worker in workers:
+                            worker.start()
+                    work.put(statement)
+                else:
+                    if workers:
+                        work.join()  # DDL must see every earlier INSERT
+                    cursor.execute(statement)
+                    connection.commit()
+                    if head.startswith(("SET", "/*!")):
+                        session_statements.append(statement)
                 
-        except Error as e:
-            logger.error(f"Error syncing issue {issue.get('key')}: {e}")
-    
-    connection.commit()
-    cursor.close()
-    
-    logger.info(f"Task {task_id}: Sincronización completada - {synced_count}/{total_issues} issues")
+                with counters_lock:
+                    rows = counters["rows"]
+                task.update({
+                    "progress": min(int(raw.tell() / total_bytes * 100), 99) if total_bytes else 0,
+                    "processed_issues": rows,
+                    "message": f"Restaurando {filename}: {rows} filas"
+                })
+        
+        for _ in workers:
+            work.put(None)
+        for worker in workers:
+            worker.join()
+        cursor.close()
+        
+        if errors:
+            raise errors[0]
+        
+        result = {
+            "filename": filename,
+            "target_table": restore_request.target_table,
+            "database": config["database"],
+            "statements": counters["statements"],
+            "rows": counters["rows"],
+            "parallelism": parallelism,
+            "duration_seconds": round(time.perf_counter() - started, 2)
+        }
+        task.update({
+            "status": "completado",
+            "progress": 100,
+            "processed_issues": counters["rows"],
+            "message": f"Restauración completada: {counters['rows']} filas desde {filename}",
+            "completed_at": datetime.now().isoformat(),
+            "result": result
+        })
+        logger.info(f"Task {task_id}: Restauración de {filename} completada ({counters['rows']} filas)")
     
-    return synced_count
+    except Exception as e:
+        logger.error(f"Error restoring backup {filename} (task {task_id}): {e}")
+        for _ in workers:
+            work.put(None)
+        for worker in workers:
+            worker.join()
+        task.update({
+            "status": "error",
+            "error": str(e),
+            "message": f"Error: {str(e)}",
+            "completed_at": datetime.now().isoformat()
+        })
+    finally:
+        for stats in worker_stats:
+            db_instrumentation.merge_stats(task["statements"], stats)
+        db_instrumentation.unbind_task(statement_token)
+        sampling_profiler.unregister_task_thread(task_id)
+        logging_setup.unbind_log_context(log_token)
+        if connection is not None:
+            connection.close()
 
 
-@app.get("/sync-status/{task_id}")
-async def get_sync_status(task_id: str):
-    """Get the status of a background sync task"""
-    if task_id not in background_tasks_store:
-        raise HTTPException(status_code=404, detail="Task not found")
+@app.post("/backups/{filename}/restore")
+async def restore_backup(filename: str, restore_request: RestoreRequest):
+    """Start restoring a backup (plain or .gz) in the background; progress via /sync-status"""
+    backup_path = BACKUPS_DIR / filename
+    if not backup_path.is_file():
+        raise HTTPException(status_code=404, detail="Backup file not found")
+    if not filename.endswith((".sql", ".sql.gz")):
+        raise HTTPException(status_code=400, detail="Only .sql and .sql.gz files can be restored")
+    if restore_request.target_table and not TABLE_NAME_RE.match(restore_request.target_table):
+        raise HTTPException(status_code=400, detail="Invalid target_table")
+    if restore_request.mysql_host and (restore_request.mysql_user is None or restore_request.mysql_password is None):
+        # Never send the server's own credentials to a host chosen by the caller
+        raise HTTPException(status_code=422, detail="mysql_user and mysql_password are required with mysql_host")
     
-    task_info = background_tasks_store[task_id]
+    task_id = str(uuid.uuid4())
+    background_tasks_store[task_id] = {
+        "id": task_id,
+        "type": "restore",
+        "status": "restaurando",
+        "progress": 0,
+        "total_issues": 0,
+        "processed_issues": 0,
+        "message": f"Restaurando {filename}...",
+        "started_at": datetime.now().isoformat(),
+        "completed_at": None,
+        "error": None,
+        "result": None,
+        "timings": {}
+    }
     
-    # Calculate percentage if in progress
-    if task_info["status"] in ["descargando", "sincronizando"] and task_info["total_issues"] > 0:
-        percentage = task_info["progress"]
-    else:
-        percentage = 0 if task_info["status"] not in ["completado"] else 100
+    loop = asyncio.get_event_loop()
+    loop.run_in_executor(executor, run_restore_task, task_id, filename, restore_request.dict())
     
     return {
         "task_id": task_id,
-        "status": task_info["status"],
-        "progress_percentage": percentage,
-        "total_issues": task_info["total_issues"],
-        "processed_issues": task_info["processed_issues"],
-        "message": task_info["message"],
-        "started_at": task_info["started_at"],
-        "completed_at": task_info["completed_at"],
-        "error": task_info["error"],
-        "result": task_info.get("result")
+        "message": "Restauración iniciada en segundo plano",
+        "status_url": f"/sync-status/{task_id}"
     }
 
 
-@app.get("/sync-tasks")
-async def list_sync_tasks(limit: int = 10):
-    """List recent sync tasks"""
-    # Get tasks sorted by start time (most recent first)
-    sorted_tasks = sorted(
-        background_tasks_store.values(),
-        key=lambda x: x["started_at"],
-        reverse=True
-    )[:limit]
+@app.delete("/backups/{filename}")
+def delete_backup(filename: str):
+    """Delete a specific backup file"""
+    backup_path = BACKUPS_DIR / filename
     
-    return {
-        "tasks": sorted_tasks,
-        "total": len(background_tasks_store)
-    }
+    if not backup_path.exists() or not backup_path.is_file():
+        raise HTTPException(status_code=404, detail="Backup file not found")
+    
+    try:
+        backup_path.unlink()
+        remove_from_backup_catalog([filename])
+        return {"message": f"Backup {filename} deleted successfully"}
+    except Exception as e:
+        logger.error(f"Error deleting backup: {e}")
+        raise HTTPException(status_code=500, detail=f"Error deleting backup: {str(e)}")
 
 
-@app.delete("/sync-tasks/{task_id}")
-async def delete_sync_task(task_id: str):
-    """Delete a sync task and its associated backup file"""
-    try:
-        # Get task info
-        if task_id not in background_tasks_store:
-            # Check in database
-            connection = mysql.connector.connect(
-                host=os.getenv("MYSQL_HOST", "localhost"),
-                user=os.getenv("MYSQL_USER", "root"),
-                password=os.getenv("MYSQL_PASSWORD", ""),
-                database=os.getenv("MYSQL_DATABASE", "jiradb")
-            )
-            
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT backup_file FROM sync_logs WHERE task_id = %s
-            """, (task_id,))
-            
-            result = cursor.fetchone()
-            if not result:
-                raise HTTPException(status_code=404, detail="Task not found")
-            
-            backup_file = result['backup_file']
-            
-            # Delete from database
-            cursor.execute("DELETE FROM sync_logs WHERE task_id = %s", (task_id,))
+BACKUP_RETENTION_INTERVAL_SECONDS = int(os.getenv("BACKUP_RETENTION_INTERVAL_SECONDS", "3600"))
+BACKUP_RETENTION_BATCH_SIZE = 100
+BACKUP_RETENTION_BATCH_PAUSE = 0.5  # seconds between batches, keeps I/O pressure low
+_retention_run_lock = threading.Lock()
+
+
+def ensure_retention_policies_table(cursor) -> None:
+    """Create the backup retention policies table"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS backup_retention_policies (
+        table_name VARCHAR(255) PRIMARY KEY,
+        keep_last INT NOT NULL,
+        keep_daily_days INT NOT NULL,
+        keep_weekly_weeks INT NOT NULL,
+        recompress_after_days INT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+    """)
+
+
+def plan_retention(entries: List[Dict[str, Any]], policy: RetentionPolicy, now: datetime) -> tuple:
+    """
+    Split the backups of one table into (keep, delete) following a GFS policy.
+    
+    Kept are the newest `keep_last` backups, the newest backup of each of the last
+    `keep_daily_days` days and the newest of each of the last `keep_weekly_weeks` ISO weeks.
+    """
+    ordered = sorted(entries, key=lambda e: e["created_at"], reverse=True)
+    keep = {e["filename"] for e in ordered[:max(policy.keep_last, 0)]}
+    
+    daily_cutoff = now - timedelta(days=policy.keep_daily_days)
+    weekly_cutoff = now - timedelta(weeks=policy.keep_weekly_weeks)
+    seen_days, seen_weeks = set(), set()
+    for entry in ordered:
+        created = entry["created_at"]
+        day = created.date()
+        week = created.isocalendar()[:2]
+        if created >= daily_cutoff and day not in seen_days:
+            seen_days.add(day)
+            keep.add(entry["filename"])
+        if created >= weekly_cutoff and week not in seen_weeks:
+            seen_weeks.add(week)
+            keep.add(entry["filename"])
+    
+    delete = [e for e in ordered if e["filename"] not in keep]
+    kept = [e for e in ordered if e["filename"] in keep]
+    return kept, delete
+
+
+def delete_backups_batch(connection: mysql.connector.MySQLConnection, filenames: List[str]) -> List[str]:
+    """Delete backup files and clear their sync_logs references and catalog entries"""
+    deleted = []
+    for filename in filenames:
+        try:
+            (BACKUPS_DIR / filename).unlink()
+            deleted.append(filename)
+        except FileNotFoundError:
+            deleted.append(filename)
+        except OSError as e:
+            logger.error(f"Retención: no se pudo eliminar {filename}: {e}")
+    
+    if deleted:
+        placeholders = ", ".join(["%s"] * len(deleted))
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"UPDATE sync_logs SET backup_file = NULL WHERE backup_file IN ({placeholders})", deleted)
+            cursor.execute(f"DELETE FROM backup_catalog WHERE filename IN ({placeholders})", deleted)
             connection.commit()
+            task_record_cache.invalidate()
+        finally:
             cursor.close()
-            connection.close()
-        else:
-            # Get backup file from memory
-            backup_file = background_tasks_store[task_id].get('backup_file')
-            
-            # Remove from memory
-            del background_tasks_store[task_id]
-        
-        # Delete backup file if exists
-        if backup_file:
-            backup_path = BACKUPS_DIR / backup_file
-            if backup_path.exists():
-                backup_path.unlink()
-                logger.info(f"Deleted backup file: {backup_file}")
-        
-        return {"message": f"Task {task_id} deleted successfully"}
-    
-    except Exception as e:
-        logger.error(f"Error deleting task: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return deleted
 
 
-@app.get("/sync-logs/{task_id}")
-async def get_sync_log_details(task_id: str):
-    """Get detailed information about a specific sync task"""
+def recompress_backup(connection: mysql.connector.MySQLConnection, entry: Dict[str, Any]) -> Optional[str]:
+    """Gzip a kept backup at the highest level and repoint its references; returns the new name"""
+    source = BACKUPS_DIR / entry["filename"]
+    target_name = f"{entry['filename']}.gz"
+    target = BACKUPS_DIR / target_name
+    temp_target = BACKUPS_DIR / f".{target_name}.tmp"
+    
+    try:
+        with open(source, 'rb') as src, gzip.open(temp_target, 'wb', compresslevel=9) as dst:
+            shutil.copyfileobj(src, dst, length=1024 * 1024)
+        # Keep the original mtime: the catalog's created_at (and so the retention tiers) come from it
+        shutil.copystat(source, temp_target)
+        os.replace(temp_target, target)
+    except OSError as e:
+        logger.error(f"Retención: no se pudo recomprimir {entry['filename']}: {e}")
+        temp_target.unlink(missing_ok=True)
+        return None
+    
+    sha256 = hashlib.sha256()
+    with open(target, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(block)
+    
+    cursor = connection.cursor()
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv("MYSQL_HOST", "localhost"),
-            user=os.getenv("MYSQL_USER", "root"),
-            password=os.getenv("MYSQL_PASSWORD", ""),
-            database=os.getenv("MYSQL_DATABASE", "jiradb")
-        )
-        
-        cursor = connection.cursor(dictionary=True)
         cursor.execute("""
-            SELECT * FROM sync_logs WHERE task_id = %s
-        """, (task_id,))
-        
-        result = cursor.fetchone()
+            UPDATE sync_logs
+            SET backup_file = %s,
+                result = IF(result IS NULL, NULL, JSON_SET(result, '$.backup_file', %s, '$.backup_url', %s))
+            WHERE backup_file = %s
+        """, (target_name, target_name, f"/backups/{target_name}", entry["filename"]))
+        cursor.execute("DELETE FROM backup_catalog WHERE filename = %s", (entry["filename"],))
+        connection.commit()
+        task_record_cache.invalidate()
+    finally:
         cursor.close()
-        connection.close()
-        
-        if not result:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        # Parse JSON fields if they exist
-        if result.get('config') and result['config']:
+    
+    record_backup_in_catalog(target_name, entry["kind"], target.stat().st_size, sha256.hexdigest(),
+                             task_id=entry["task_id"], table_name=entry["table_name"],
+                             row_count=entry["row_count"], connection=connection)
+    source.unlink()
+    return target_name
+
+
+def apply_backup_retention(dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Apply the retention policies to every cataloged sync backup and export.
+    
+    Tables without their own policy use the "*" policy; when neither exists, nothing
+    is touched. Backups whose table is unknown (files reconciled from disk) are never
+    pruned, only listed under "unknown_table". Deletions run in batches with a pause in between.
+    """
+    if not _retention_run_lock.acquire(blocking=False):
+        return {"skipped": True, "reason": "Retention is already running"}
+    
+    try:
+        reconcile_backup_catalog(force=True)
+        connection = get_logs_connection()
+        try:
+            cursor = connection.cursor(dictionary=True)
             try:
-                result['config'] = json.loads(result['config'])
-            except:
-                result['config'] = None
+                ensure_retention_policies_table(cursor)
+                cursor.execute("SELECT * FROM backup_retention_policies")
+                policies = {
+                    row["table_name"]: RetentionPolicy(**{k: row[k] for k in RetentionPolicy.__fields__})
+                    for row in cursor.fetchall()
+                }
+                cursor.execute("SELECT * FROM backup_catalog WHERE kind IN ('sync', 'export')")
+                entries = cursor.fetchall()
+            finally:
+                cursor.close()
+            
+            # Without a table, keep_last and the daily/weekly tiers would count backups of
+            # different tables together and could delete a table's only backups
+            by_table: Dict[str, List[Dict[str, Any]]] = {}
+            unknown_table = []
+            for entry in entries:
+                if entry["table_name"] is None:
+                    unknown_table.append(entry["filename"])
+                else:
+                    by_table.setdefault(entry["table_name"], []).append(entry)
+            
+            now = datetime.now()
+            report = {"dry_run": dry_run, "tables": {}, "deleted": 0, "recompressed": 0,
+                      "unknown_table": unknown_table}
+            for table_name, table_entries in by_table.items():
+                policy = policies.get(table_name) or policies.get("*")
+                if policy is None:
+                    continue
+                kept, to_delete = plan_retention(table_entries, policy, now)
+                to_recompress = []
+                if policy.recompress_after_days is not None:
+                    cutoff = now - timedelta(days=policy.recompress_after_days)
+                    to_recompress = [e for e in kept if e["created_at"] < cutoff and not e["filename"].endswith(".gz")]
                 
-        if result.get('result') and result['result']:
-            try:
-                result['result'] = json.loads(result['result'])
-            except:
-                result['result'] = None
-        
-        # Convert datetime to string
-        if result.get('created_at'):
-            result['created_at'] = result['created_at'].isoformat()
-        if result.get('updated_at'):
-            result['updated_at'] = result['updated_at'].isoformat()
-        if result.get('started_at'):
-            result['started_at'] = result['started_at'].isoformat()
-        if result.get('completed_at'):
-            result['completed_at'] = result['completed_at'].isoformat()
+                table_report = {
+                    "policy": policy.table_name,
+                    "kept": len(kept),
+                    "delete": [e["filename"] for e in to_delete],
+                    "recompress": [e["filename"] for e in to_recompress]
+                }
+                report["tables"][table_name] = table_report
+                if dry_run:
+                    continue
+                
+                filenames = table_report["delete"]
+                for start in range(0, len(filenames), BACKUP_RETENTION_BATCH_SIZE):
+                    report["deleted"] += len(delete_backups_batch(
+                        connection, filenames[start:start + BACKUP_RETENTION_BATCH_SIZE]
+                    ))
+                    time.sleep(BACKUP_RETENTION_BATCH_PAUSE)
+                
+                for entry in to_recompress:
+                    if recompress_backup(connection, entry):
+                        report["recompressed"] += 1
+        finally:
+            connection.close()
         
-        return result
+        if not dry_run and (report["deleted"] or report["recompressed"]):
+            logger.info(f"Retención aplicada: {report['deleted']} backups eliminados, "
+                        f"{report['recompressed']} recomprimidos")
+        return report
+    finally:
+        _retention_run_lock.release()
+
+
+def backup_retention_worker() -> None:
+    """Periodically apply backup retention from a low-priority daemon thread"""
+    try:
+        # Linux allows a per-thread nice value; elsewhere the thread keeps the default priority
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
     
-    except mysql.connector.Error as e:
-        logger.error(f"Database error: {e}")
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    except Exception as e:
-        logger.error(f"Error retrieving log details: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    while True:
+        time.sleep(BACKUP_RETENTION_INTERVAL_SECONDS)
+        try:
+            apply_backup_retention()
+        except Exception as e:
+            logger.error(f"Error applying backup retention: {e}")
 
 
-@app.get("/sync-logs")
-async def get_all_sync_logs(
-    limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0)
-):
-    """Get all sync logs with pagination"""
+@app.on_event("startup")
+async def start_backup_retention_worker():
+    """Start the periodic retention job unless disabled with BACKUP_RETENTION_INTERVAL_SECONDS=0"""
+    if BACKUP_RETENTION_INTERVAL_SECONDS > 0:
+        threading.Thread(target=backup_retention_worker, name="backup-retention", daemon=True).start()
+
+
+@app.get("/api/backups/retention/policies")
+def list_retention_policies():
+    """List the configured backup retention policies"""
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv("MYSQL_HOST", "localhost"),
-            user=os.getenv("MYSQL_USER", "root"),
-            password=os.getenv("MYSQL_PASSWORD", ""),
-            database=os.getenv("MYSQL_DATABASE", "jiradb")
-        )
-        
+        connection = get_logs_connection()
         cursor = connection.cursor(dictionary=True)
+        try:
+            ensure_retention_policies_table(cursor)
+            cursor.execute("SELECT * FROM backup_retention_policies ORDER BY table_name")
+            policies = cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
         
-        # Get total count
-        cursor.execute("SELECT COUNT(*) as total FROM sync_logs")
-        total = cursor.fetchone()['total']
-        
-        # Get logs with pagination - check which columns exist
-        cursor.execute("SHOW COLUMNS FROM sync_logs")
-        columns = [col[0] for col in cursor.fetchall()]
-        
-        # Build dynamic select based on available columns
-        select_columns = ['task_id', 'status', 'total_issues', 'processed_issues', 
-                         'created_at', 'backup_file', 'error_message']
-        if 'updated_at' in columns:
-            select_columns.insert(5, 'updated_at')
-        if 'started_at' in columns:
-            select_columns.insert(5, 'started_at')
-        if 'completed_at' in columns:
-            select_columns.insert(6, 'completed_at')
-            
-        columns_str = ', '.join(select_columns)
-        
-        cursor.execute(f"""
-            SELECT {columns_str}
-            FROM sync_logs 
-            ORDER BY created_at DESC 
-            LIMIT %s OFFSET %s
-        """, (limit, offset))
-        
-        logs = cursor.fetchall()
-        
-        # Convert datetime to string
-        for log in logs:
-            if log.get('created_at'):
-                log['created_at'] = log['created_at'].isoformat()
-            if log.get('updated_at'):
-                log['updated_at'] = log['updated_at'].isoformat()
-            if log.get('started_at'):
-                log['started_at'] = log['started_at'].isoformat()
-            if log.get('completed_at'):
-                log['completed_at'] = log['completed_at'].isoformat()
-        
-        cursor.close()
-        connection.close()
-        
-        return {
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "logs": logs
-        }
-    
+        for policy in policies:
+            if policy.get("updated_at"):
+                policy["updated_at"] = policy["updated_at"].isoformat()
+        return {"policies": policies}
     except mysql.connector.Error as e:
-        logger.error(f"Database error: {e}")
+        logger.error(f"Database error listing retention policies: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    except Exception as e:
-        logger.error(f"Error retrieving logs: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/backups")
-async def list_backups():
-    """List all available backup files"""
-    backups = []
-    
-    for backup_file in BACKUPS_DIR.glob("backup_*.sql"):
-        stats = backup_file.stat()
-        backups.append({
-            "filename": backup_file.name,
-            "size": stats.st_size,
-            "created_at": datetime.fromtimestamp(stats.st_ctime).isoformat(),
-            "task_id": backup_file.stem.split("_")[1]  # Extract task_id from filename
-        })
-    
-    # Sort by creation date descending
-    backups.sort(key=lambda x: x["created_at"], reverse=True)
-    
-    return {
-        "backups": backups,
-        "total": len(backups)
-    }
+@app.put("/api/backups/retention/policies")
+def save_retention_policy(policy: RetentionPolicy):
+    """Create or replace the retention policy of a table ("*" for the default policy)"""
+    if min(policy.keep_last, policy.keep_daily_days, policy.keep_weekly_weeks) < 0:
+        raise HTTPException(status_code=400, detail="Retention values must not be negative")
+    try:
+        connection = get_logs_connection()
+        cursor = connection.cursor()
+        try:
+            ensure_retention_policies_table(cursor)
+            cursor.execute("""
+                INSERT INTO backup_retention_policies
+                    (table_name, keep_last, keep_daily_days, keep_weekly_weeks, recompress_after_days)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    keep_last = VALUES(keep_last),
+                    keep_daily_days = VALUES(keep_daily_days),
+                    keep_weekly_weeks = VALUES(keep_weekly_weeks),
+                    recompress_after_days = VALUES(recompress_after_days)
+            """, (policy.table_name, policy.keep_last, policy.keep_daily_days,
+                  policy.keep_weekly_weeks, policy.recompress_after_days))
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+        return {"success": True, "policy": policy.dict()}
+    except mysql.connector.Error as e:
+        logger.error(f"Database error saving retention policy: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@app.get("/backups/{filename}")
-async def download_backup(filename: str):
-    """Download a specific backup file"""
-    backup_path = BACKUPS_DIR / filename
-    
-    if not backup_path.exists() or not backup_path.is_file():
-        raise HTTPException(status_code=404, detail="Backup file not found")
-    
-    return FileResponse(
-        path=backup_path,
-        filename=filename,
-        media_type="application/sql",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+@app.delete("/api/backups/retention/policies/{table_name}")
+def delete_retention_policy(table_name: str):
+    """Remove the retention policy of a table"""
+    try:
+        connection = get_logs_connection()
+        cursor = connection.cursor()
+        try:
+            ensure_retention_policies_table(cursor)
+            cursor.execute("DELETE FROM backup_retention_policies WHERE table_name = %s", (table_name,))
+            deleted = cursor.rowcount
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Policy not found")
+        return {"success": True, "message": f"Policy {table_name} deleted"}
+    except mysql.connector.Error as e:
+        logger.error(f"Database error deleting retention policy: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@app.delete("/backups/{filename}")
-async def delete_backup(filename: str):
-    """Delete a specific backup file"""
-    backup_path = BACKUPS_DIR / filename
-    
-    if not backup_path.exists() or not backup_path.is_file():
-        raise HTTPException(status_code=404, detail="Backup file not found")
-    
+@app.post("/api/backups/retention/run")
+async def run_backup_retention(dry_run: bool = True):
+    """Apply the retention policies now (dry run by default: only report what would change)"""
     try:
-        backup_path.unlink()
-        return {"message": f"Backup {filename} deleted successfully"}
-    except Exception as e:
-        logger.error(f"Error deleting backup: {e}")
-        raise HTTPException(status_code=500, detail=f"Error deleting backup: {str(e)}")
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(executor, apply_backup_retention, dry_run)
+    except mysql.connector.Error as e:
+        logger.error(f"Database error applying retention: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
 @app.post("/sync-logs")
-async def get_sync_logs_from_db(connection_info: Dict[str, Any]):
+def get_sync_logs_from_db(connection_info: Dict[str, Any]):
     """Get sync logs from MySQL database"""
     try:
         # Create connection using provided info
-        connection = mysql.connector.connect(
+        connection = db_instrumentation.connect(
             host=connection_info["mysql_host"],
             port=connection_info.get("mysql_port", 3306),
             user=connection_info["mysql_user"],
@@ -1160,7 +4686,7 @@ def get_sync_example():
 
 
 @app.post("/test-jira-connection")
-async def test_jira_connection(jira_config: Dict[str, Any]):
+def test_jira_connection(jira_config: Dict[str, Any]):
     """
     Test Jira connection and JQL query without MySQL
     """
@@ -1188,7 +4714,7 @@ async def test_jira_connection(jira_config: Dict[str, Any]):
         )
         
         # Get issue count
-        issue_count = await get_issue_count(sync_request)
+        issue_count = get_issue_count(sync_request)
         
         # Fetch first page of issues
         url = f"https://{sync_request.jira_domain}/rest/api/3/search/jql"
@@ -1231,10 +4757,11 @@ async def test_jira_connection(jira_config: Dict[str, Any]):
         }
 
 
-async def fetch_all_issues(sync_request: JiraSyncRequest, total_count: int) -> List[Dict[str, Any]]:
+def fetch_all_issues(sync_request: JiraSyncRequest, total_count: int) -> List[Dict[str, Any]]:
     """Fetch all issues using pagination (original function for compatibility)"""
     all_issues = []
     next_page_token = None
+    log_throttle = logging_setup.LogThrottle()
     
     url = f"https://{sync_request.jira_domain}/rest/api/3/search/jql"
     auth = HTTPBasicAuth(sync_request.jira_email, sync_request.jira_api_token)
@@ -1266,7 +4793,8 @@ async def fetch_all_issues(sync_request: JiraSyncRequest, total_count: int) -> L
         issues = data.get("issues", [])
         all_issues.extend(issues)
         
-        logger.info(f"Fetched {len(all_issues)}/{total_count} issues")
+        if log_throttle.ready():
+            logger.info(f"Fetched {len(all_issues)}/{total_count} issues")
         
         # Check if there are more pages
         next_page_token = data.get("nextPageToken")
@@ -1282,6 +4810,7 @@ def sync_issues_to_database(connection: mysql.connector.MySQLConnection,
     """Sync issues to database (original function for compatibility)"""
     cursor = connection.cursor()
     synced_count = 0
+    row_errors = logging_setup.RepeatedErrorLog(logger)
     
     # Extract field mapping if provided
     field_mapping = None
@@ -1294,19 +4823,7 @@ def sync_issues_to_database(connection: mysql.connector.MySQLConnection,
         # Build dynamic INSERT ... ON DUPLICATE KEY UPDATE query
         columns = list(flat_issue.keys())
         values = [flat_issue[col] for col in columns]
-        
-        # Create placeholders
-        placeholders = ", ".join(["%s"] * len(columns))
-        column_names = ", ".join([f"`{col}`" for col in columns])
-        
-        # Build update clause for ON DUPLICATE KEY UPDATE
-        update_pairs = ", ".join([f"`{col}` = VALUES(`{col}`)" for col in columns if col != 'key'])
-        
-        insert_sql = f"""
-        INSERT INTO {sync_request.mysql_table} ({column_names})
-        VALUES ({placeholders})
-        ON DUPLICATE KEY UPDATE {update_pairs}
-        """
+        insert_sql = build_upsert_sql(sync_request.mysql_table, columns)
         
         try:
             cursor.execute(insert_sql, values)
@@ -1316,24 +4833,25 @@ def sync_issues_to_database(connection: mysql.connector.MySQLConnection,
                 logger.info(f"Synced {synced_count} issues...")
                 connection.commit()
         except Error as e:
-            logger.error(f"Error syncing issue {flat_issue.get('key')}: {e}")
+            row_errors.error(f"issue {flat_issue.get('key')}", e)
             # Continue with next issue
     
     connection.commit()
     cursor.close()
+    row_errors.log_summary()
     
     return synced_count
 
 
 @app.post("/sync-jira-issues-sync")
-async def sync_jira_issues_synchronous(sync_request: JiraSyncRequest):
+def sync_jira_issues_synchronous(sync_request: JiraSyncRequest):
     """
     Synchronize Jira issues to MySQL database (synchronous version for backward compatibility)
     """
     try:
         # Step 1: Get approximate count of issues
         logger.info(f"Getting approximate count for JQL: {sync_request.jql}")
-        issue_count = await get_issue_count(sync_request)
+        issue_count = get_issue_count(sync_request)
         logger.info(f"Found approximately {issue_count} issues")
         
         # Step 2: Connect to MySQL
@@ -1341,7 +4859,7 @@ async def sync_jira_issues_synchronous(sync_request: JiraSyncRequest):
         
         # Step 3: Fetch all issues with pagination
         logger.info("Fetching all issues...")
-        all_issues = await fetch_all_issues(sync_request, issue_count)
+        all_issues = fetch_all_issues(sync_request, issue_count)
         logger.info(f"Fetched {len(all_issues)} issues")
         
         # Step 4: Ensure table exists and has all necessary columns
@@ -1366,10 +4884,10 @@ async def sync_jira_issues_synchronous(sync_request: JiraSyncRequest):
 
 
 @app.post("/test-mysql-connection")
-async def test_mysql_connection(config: JiraSyncRequest):
+def test_mysql_connection(config: JiraSyncRequest):
     """Test MySQL connection with provided credentials"""
     try:
-        connection = mysql.connector.connect(
+        connection = db_instrumentation.connect(
             host=config.mysql_host,
             port=config.mysql_port,
             user=config.mysql_user,
@@ -1395,41 +4913,47 @@ async def test_mysql_connection(config: JiraSyncRequest):
 
 
 @app.get("/backups/{filename}/info")
-async def get_backup_info(filename: str):
-    """Get detailed information about a backup file"""
-    backup_path = BACKUPS_DIR / filename
-    
-    if not backup_path.exists():
-        raise HTTPException(status_code=404, detail="Backup file not found")
-    
+def get_backup_info(filename: str):
+    """Get detailed information about a backup file from the backup catalog"""
     try:
-        stat = backup_path.stat()
-        
-        # Get absolute path
-        absolute_path = str(backup_path.absolute())
+        entry = get_backup_catalog_entry(filename)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Backup file not found")
         
-        return {
-            "filename": filename,
+        backup_path = BACKUPS_DIR / filename
+        info = format_catalog_entry(entry)
+        info.update({
             "path": str(backup_path),
-            "absolute_path": absolute_path,
+            "absolute_path": str(backup_path.absolute()),
             "container_path": f"/app/backups/{filename}",  # Path inside Docker container
-            "size": stat.st_size,
-            "size_mb": round(stat.st_size / (1024 * 1024), 2),
-            "created_at": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-            "modified_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-            "download_url": f"/backups/{filename}",
             "exists": True
-        }
+        })
+        return info
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting backup info: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def add_backup_file_state(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Add whether the record's backup file exists right now (never cached)"""
+    if record.get('backup_filename'):
+        backup_path = BACKUPS_DIR / record['backup_filename']
+        record['backup_exists'] = backup_path.exists()
+        record['backup_absolute_path'] = str(backup_path.absolute()) if record['backup_exists'] else None
+    return record
+
+
 @app.get("/sync-logs/load-from-db/{task_id}")
-async def load_sync_log_from_db(task_id: str):
+def load_sync_log_from_db(task_id: str):
     """Load sync log directly from database"""
+    result = task_record_cache.get("load", task_id)
+    if result is not None:
+        return add_backup_file_state(result)
+    
     try:
-        connection = mysql.connector.connect(
+        connection = db_instrumentation.connect(
             host=os.getenv("MYSQL_HOST", "localhost"),
             user=os.getenv("MYSQL_USER", "root"),
             password=os.getenv("MYSQL_PASSWORD", ""),
@@ -1461,21 +4985,20 @@ async def load_sync_log_from_db(task_id: str):
             result['result'] = json.loads(result['result'])
         
         # Convert datetime to string
-        for field in ['started_at', 'completed_at', 'created_at']:
+        for field in ['started_at', 'completed_at', 'created_at', 'heartbeat_at']:
             if result.get(field):
                 result[field] = result[field].isoformat()
         
-        # Add backup info if exists
-        if result.get('backup_filename'):
-            backup_path = BACKUPS_DIR / result['backup_filename']
-            result['backup_exists'] = backup_path.exists()
-            result['backup_absolute_path'] = str(backup_path.absolute()) if backup_path.exists() else None
-        
         cursor.close()
         connection.close()
         
-        return result
+        if result.get('status') in CACHEABLE_TASK_STATUSES:
+            task_record_cache.put("load", task_id, result)
+        
+        return add_backup_file_state(result)
         
+    except HTTPException:
+        raise
     except mysql.connector.Error as e:
         logger.error(f"Database error: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -1484,26 +5007,90 @@ async def load_sync_log_from_db(task_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/export-table")
-async def export_table(export_request: Dict[str, Any]):
-    """Export any MySQL table as SQL file"""
-    try:
-        # Extract parameters
-        mysql_config = {
-            "host": export_request.get("mysql_host", "localhost"),
-            "port": export_request.get("mysql_port", 3306),
-            "user": export_request.get("mysql_user", "root"),
-            "password": export_request.get("mysql_password", ""),
-            "database": export_request.get("mysql_database", "jiradb")
-        }
-        table_name = export_request.get("table_name")
-        
-        if not table_name:
-            raise HTTPException(status_code=400, detail="table_name is required")
+EXPORT_MAX_CONCURRENCY = int(os.getenv("EXPORT_MAX_CONCURRENCY", "2"))
+export_executor = ThreadPoolExecutor(max_workers=EXPORT_MAX_CONCURRENCY, thread_name_prefix="export")
+
+
+def save_export_log(task_id: str, status: str, total_rows: int = 0, exported_rows: int = 0,
+                    error_message: str = None, result: dict = None, backup_file: str = None) -> None:
+    """Record an export job in sync_logs (task_type 'export'); failures only log"""
+    task_info = background_tasks_store.get(task_id, {})
+    try:
+        connection = get_logs_connection()
+    except Error as e:
+        logger.warning(f"Could not save export log for task {task_id}: {e}")
+        return
+    cursor = connection.cursor()
+    try:
+        ensure_logs_table_exists(connection)
+        cursor.execute("""
+            INSERT INTO sync_logs (task_id, task_type, started_at, completed_at, status, jql_query, mysql_table,
+                                  total_issues, processed_issues, error_message, result, backup_file)
+            VALUES (%s, 'export', %s, %s, %s, '', %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                completed_at = VALUES(completed_at),
+                status = VALUES(status),
+                total_issues = VALUES(total_issues),
+                processed_issues = VALUES(processed_issues),
+                error_message = VALUES(error_message),
+                result = VALUES(result),
+                backup_file = VALUES(backup_file),
+                heartbeat_at = NOW()
+        """, (
+            task_id,
+            task_info.get("started_at", datetime.now().isoformat()),
+            task_info.get("completed_at"),
+            status,
+            task_info.get("table_name"),
+            total_rows,
+            exported_rows,
+            error_message,
+            json.dumps(result) if result else None,
+            backup_file
+        ))
+        connection.commit()
+        invalidate_log_totals()
+        task_record_cache.invalidate(task_id)
+    except Error as e:
+        logger.warning(f"Could not save export log for task {task_id}: {e}")
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def run_export_task(task_id: str, export_request: Dict[str, Any]) -> None:
+    """Export a MySQL table to BACKUPS_DIR as SQL, CSV, Parquet or Arrow IPC, reporting progress"""
+    task = background_tasks_store[task_id]
+    table_name = export_request["table_name"]
+    export_format = str(export_request.get("format", "sql")).lower()
+    mysql_config = {
+        "host": export_request.get("mysql_host", "localhost"),
+        "port": export_request.get("mysql_port", 3306),
+        "user": export_request.get("mysql_user", "root"),
+        "password": export_request.get("mysql_password", ""),
+        "database": export_request.get("mysql_database", "jiradb")
+    }
+    task.update({
+        "status": "exportando",
+        "started_at": datetime.now().isoformat(),
+        "message": f"Exportando {table_name}..."
+    })
+    save_export_log(task_id, "exportando")
+    task["stage"] = "export"
+    register_progress_task(task_id)
+    statement_token = db_instrumentation.bind_task(task_id, task.setdefault("statements", {}))
+    sampling_profiler.register_task_thread(task_id)
+    log_token = logging_setup.bind_log_context(task_id=task_id, stage="export")
+    
+    connection = None
+    filepath = None
+    temp_path = None
+    try:
+        pa = import_pyarrow() if export_format in ("parquet", "arrow") else None
         
         # Connect to MySQL
-        connection = mysql.connector.connect(**mysql_config)
-        cursor = connection.cursor()
+        connection = db_instrumentation.connect(**mysql_config)
+        cursor = connection.cursor(buffered=True)
         
         # Get Mexico timezone
         mexico_tz = pytz.timezone('America/Mexico_City')
@@ -1511,117 +5098,207 @@ async def export_table(export_request: Dict[str, Any]):
         timestamp = mexico_time.strftime("%Y-%m-%d_%H-%M-%S")
         
         # Generate filename
-        filename = f"{table_name}_export_{timestamp}.sql"
+        filename = f"{table_name}_export_{timestamp}{EXPORT_FORMATS[export_format]}"
         filepath = BACKUPS_DIR / filename
+        # Written under a hidden name: catalog reconcile and /backups skip dot-files until the rename
+        temp_path = BACKUPS_DIR / f".{filename}.tmp"
         
         # Get table structure
         cursor.execute(f"SHOW CREATE TABLE `{table_name}`")
-        create_table_result = cursor.fetchone()
-        if not create_table_result:
-            raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
-        
-        create_table_sql = create_table_result[1]
+        create_table_sql = cursor.fetchone()[1]
         
         # Get row count
         cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
         row_count = cursor.fetchone()[0]
+        task["total_issues"] = row_count
+        
+        # Get column names (generated columns are recomputed on restore)
+        columns = get_insertable_columns(cursor, table_name)
+        column_names = ", ".join([f"`{col}`" for col in columns])
+        schema = get_export_arrow_schema(pa, cursor, table_name, columns) if pa else None
+        cursor.close()
+        
+        # Unbuffered cursor: rows are streamed from the server in fetchmany() batches
+        data_cursor = connection.cursor()
+        data_cursor.execute(f"SELECT {column_names} FROM `{table_name}`")
+        exported = 0
+        
+        def fetch_batches():
+            nonlocal exported
+            while True:
+                check_task_cancelled(task_id)
+                rows = data_cursor.fetchmany(EXPORT_FETCH_SIZE)
+                if not rows:
+                    return
+                exported += len(rows)
+                yield rows
+                task.update({
+                    "processed_issues": exported,
+                    "progress": min(int(exported / row_count * 100), 99) if row_count else 0,
+                    "message": f"Exportadas {exported}/{row_count} filas de {table_name}"
+                })
+                logger.debug(f"Exported {exported}/{row_count} rows from {table_name}")
         
         # Write to file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            # Write header
-            f.write(f"-- Table Export\n")
-            f.write(f"-- Generated: {mexico_time.strftime('%Y-%m-%d %H:%M:%S')} (Mexico/Ciudad de México)\n")
-            f.write(f"-- Database: {mysql_config['database']}\n")
-            f.write(f"-- Table: {table_name}\n")
-            f.write(f"-- Total Rows: {row_count}\n")
-            f.write(f"-- Generated by Jira Sync Manager\n\n")
-            
-            f.write("SET SQL_MODE = 'NO_AUTO_VALUE_ON_ZERO';\n")
-            f.write("START TRANSACTION;\n")
-            f.write("SET time_zone = '+00:00';\n\n")
-            
-            # Write table structure
-            f.write(f"-- Table structure for table `{table_name}`\n")
-            f.write(f"DROP TABLE IF EXISTS `{table_name}`;\n")
-            f.write(f"{create_table_sql};\n\n")
-            
-            # Export data
-            if row_count > 0:
-                f.write(f"-- Dumping data for table `{table_name}`\n\n")
+        with ChecksumWriter(temp_path) as f:
+            if export_format == "sql":
+                # Write header
+                f.write(f"-- Table Export\n")
+                f.write(f"-- Generated: {mexico_time.strftime('%Y-%m-%d %H:%M:%S')} (Mexico/Ciudad de México)\n")
+                f.write(f"-- Database: {mysql_config['database']}\n")
+                f.write(f"-- Table: {table_name}\n")
+                f.write(f"-- Total Rows: {row_count}\n")
+                f.write(f"-- Generated by Jira Sync Manager\n\n")
                 
-                # Get column names
-                cursor.execute(f"SHOW COLUMNS FROM `{table_name}`")
-                columns = [col[0] for col in cursor.fetchall()]
-                column_names = ", ".join([f"`{col}`" for col in columns])
+                f.write("SET SQL_MODE = 'NO_AUTO_VALUE_ON_ZERO';\n")
+                f.write("START TRANSACTION;\n")
+                f.write("SET time_zone = '+00:00';\n\n")
                 
-                # Fetch and write data in batches
-                batch_size = 1000
-                offset = 0
+                # Write table structure
+                f.write(f"-- Table structure for table `{table_name}`\n")
+                f.write(f"DROP TABLE IF EXISTS `{table_name}`;\n")
+                f.write(f"{create_table_sql};\n\n")
                 
-                while offset < row_count:
-                    cursor.execute(f"SELECT * FROM `{table_name}` LIMIT {batch_size} OFFSET {offset}")
-                    rows = cursor.fetchall()
-                    
-                    if rows:
-                        values_list = []
-                        for row in rows:
-                            values = []
-                            for value in row:
-                                if value is None:
-                                    values.append("NULL")
-                                elif isinstance(value, (int, float)):
-                                    values.append(str(value))
-                                elif isinstance(value, datetime):
-                                    values.append(f"'{value.strftime('%Y-%m-%d %H:%M:%S')}'")
-                                elif isinstance(value, bytes):
-                                    # Handle binary data
-                                    hex_string = value.hex()
-                                    values.append(f"0x{hex_string}")
-                                else:
-                                    # Escape single quotes and backslashes
-                                    escaped_value = str(value).replace('\\', '\\\\').replace("'", "\\'")
-                                    values.append(f"'{escaped_value}'")
-                            values_list.append(f"({', '.join(values)})")
-                        
-                        # Write INSERT statement
+                if row_count > 0:
+                    f.write(f"-- Dumping data for table `{table_name}`\n\n")
+                
+                for rows in fetch_batches():
+                    # One INSERT per 1000 rows keeps statements under max_allowed_packet
+                    for batch_start in range(0, len(rows), 1000):
                         f.write(f"INSERT INTO `{table_name}` ({column_names}) VALUES\n")
-                        f.write(",\n".join(values_list))
+                        f.write(sql_literals.format_rows(rows[batch_start:batch_start + 1000]))
                         f.write(";\n\n")
-                    
-                    offset += batch_size
-                    logger.info(f"Exported {min(offset, row_count)}/{row_count} rows from {table_name}")
+                
+                f.write("COMMIT;\n")
             
-            f.write("COMMIT;\n")
+            elif export_format == "csv":
+                csv_writer = csv.writer(f, lineterminator="\n")
+                csv_writer.writerow(columns)
+                for rows in fetch_batches():
+                    csv_writer.writerows([to_csv_value(value) for value in row] for row in rows)
+            
+            else:
+                sink = pa.PythonFile(f, mode="w")
+                string_columns = [pa.types.is_string(field.type) for field in schema]
+                if export_format == "parquet":
+                    writer = pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+                else:
+                    writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+                try:
+                    for rows in fetch_batches():
+                        arrays = [
+                            pa.array([to_arrow_value(row[i], string_columns[i]) for row in rows], type=field.type)
+                            for i, field in enumerate(schema)
+                        ]
+                        # Each batch becomes one Parquet row group / Arrow record batch
+                        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                finally:
+                    writer.close()
         
         # Get file info
-        file_stat = filepath.stat()
-        file_size = file_stat.st_size
+        file_size = f.size
         
-        cursor.close()
-        connection.close()
+        data_cursor.close()
+        os.replace(temp_path, filepath)
         
-        return {
-            "success": True,
+        record_backup_in_catalog(filename, "export", file_size, f.checksum, task_id=task_id,
+                                 table_name=table_name, row_count=exported)
+        
+        result = {
             "filename": filename,
-            "filepath": str(filepath),
             "download_url": f"/backups/{filename}",
             "table_name": table_name,
-            "row_count": row_count,
+            "format": export_format,
+            "row_count": exported,
             "file_size": file_size,
             "file_size_mb": round(file_size / (1024 * 1024), 2),
             "generated_at": mexico_time.isoformat()
         }
+        task.update({
+            "status": "completado",
+            "progress": 100,
+            "processed_issues": exported,
+            "message": f"Tabla {table_name} exportada: {exported} filas ({result['file_size_mb']} MB)",
+            "completed_at": datetime.now().isoformat(),
+            "result": result
+        })
+        save_export_log(task_id, "completado", row_count, exported, result=result, backup_file=filename)
+        logger.info(f"Task {task_id}: Exported {exported} rows from {table_name} to {filename}")
         
-    except mysql.connector.Error as e:
-        logger.error(f"MySQL error during table export: {e}")
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except Exception as e:
-        logger.error(f"Error exporting table: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"Error exporting table {table_name} (task {task_id}): {e}")
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)  # Never leave a truncated export behind
+        if filepath is not None and filepath.exists():
+            filepath.unlink()
+        task.update({
+            "status": "error",
+            "error": str(e),
+            "message": f"Error: {str(e)}",
+            "completed_at": datetime.now().isoformat()
+        })
+        save_export_log(task_id, "error", task["total_issues"], task["processed_issues"], error_message=str(e))
+    finally:
+        db_instrumentation.unbind_task(statement_token)
+        sampling_profiler.unregister_task_thread(task_id)
+        logging_setup.unbind_log_context(log_token)
+        unregister_progress_task(task_id)
+        if connection is not None:
+            connection.close()
+
+
+@app.post("/export-table")
+async def export_table(export_request: Dict[str, Any]):
+    """Queue a background export of a MySQL table (sql, csv, parquet or arrow); progress via /sync-status"""
+    table_name = export_request.get("table_name")
+    export_format = str(export_request.get("format", "sql")).lower()
+    
+    if not table_name:
+        raise HTTPException(status_code=400, detail="table_name is required")
+    if not TABLE_NAME_RE.match(table_name):
+        raise HTTPException(status_code=400, detail="Invalid table_name")
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400,
+                            detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if export_format in ("parquet", "arrow"):
+        import_pyarrow()
+    
+    task_id = str(uuid.uuid4())
+    background_tasks_store[task_id] = {
+        "id": task_id,
+        "type": "export",
+        "status": "en_cola",
+        "progress": 0,
+        "total_issues": 0,
+        "processed_issues": 0,
+        "table_name": table_name,
+        "format": export_format,
+        "message": f"Exportación de {table_name} en cola",
+        "started_at": datetime.now().isoformat(),
+        "completed_at": None,
+        "error": None,
+        "result": None,
+        "timings": {}
+    }
+    
+    await run_in_threadpool(submit_job, task_id, "export", dict(export_request), export_executor, run_export_task)
+    
+    return {
+        "task_id": task_id,
+        "status": "en_cola",
+        "message": "Exportación iniciada en segundo plano",
+        "status_url": f"/sync-status/{task_id}"
+    }
+
+
+@app.get("/api/logs/cache-stats")
+async def get_task_record_cache_stats():
+    """Size and hit rate of the finished-task record cache"""
+    return task_record_cache.stats()
 
 
 @app.post("/api/logs/by-task")
-async def get_logs_by_task_id(request: Dict[str, Any]):
+def get_logs_by_task_id(request: Dict[str, Any]):
     """
     Get logs for a specific task_id
     
@@ -1636,8 +5313,12 @@ async def get_logs_by_task_id(request: Dict[str, Any]):
         if not task_id:
             raise HTTPException(status_code=400, detail="task_id is required")
         
+        cached = task_record_cache.get("by_task", task_id)
+        if cached is not None:
+            return cached
+        
         # Conectar a la base de datos
-        connection = mysql.connector.connect(
+        connection = db_instrumentation.connect(
             host=os.getenv("MYSQL_HOST", "localhost"),
             user=os.getenv("MYSQL_USER", "root"),
             password=os.getenv("MYSQL_PASSWORD", ""),
@@ -1646,11 +5327,10 @@ async def get_logs_by_task_id(request: Dict[str, Any]):
         
         cursor = connection.cursor(dictionary=True)
         
-        # Primero verificar si la tabla existe
-        cursor.execute("SHOW TABLES LIKE 'sync_logs'")
-        table_exists = cursor.fetchone()
+        # Verificar que la tabla exista y obtener sus columnas (cacheado por proceso)
+        columns = get_sync_logs_columns(cursor)
         
-        if not table_exists:
+        if columns is None:
             cursor.close()
             connection.close()
             return {
@@ -1659,11 +5339,6 @@ async def get_logs_by_task_id(request: Dict[str, Any]):
                 "logs": []
             }
         
-        # Obtener las columnas de la tabla
-        cursor.execute("DESCRIBE sync_logs")
-        columns = [row['Field'] for row in cursor.fetchall()]
-        logger.info(f"Available columns in sync_logs: {columns}")
-        
         # Consultar los logs para el task_id específico
         query = """
         SELECT * FROM sync_logs 
@@ -1689,12 +5364,16 @@ async def get_logs_by_task_id(request: Dict[str, Any]):
         cursor.close()
         connection.close()
         
-        return {
+        response = {
             "task_id": task_id,
             "total_logs": len(logs),
             "logs": logs,
             "available_columns": columns
         }
+        if logs and all(log.get("status") in CACHEABLE_TASK_STATUSES for log in logs):
+            task_record_cache.put("by_task", task_id, response)
+        
+        return response
         
     except mysql.connector.Error as e:
         logger.error(f"Database error in get_logs_by_task_id: {e}")
@@ -1714,10 +5393,10 @@ async def get_logs_by_task_id(request: Dict[str, Any]):
 
 
 @app.post("/api/logs/test-connection")
-async def test_logs_connection():
+def test_logs_connection():
     """Test connection to sync_logs table and show its structure"""
     try:
-        connection = mysql.connector.connect(
+        connection = db_instrumentation.connect(
             host=os.getenv("MYSQL_HOST", "localhost"),
             user=os.getenv("MYSQL_USER", "root"),
             password=os.getenv("MYSQL_PASSWORD", ""),
@@ -1782,8 +5461,8 @@ async def test_logs_connection():
 
 
 @app.get("/api/backups/verify")
-async def verify_backups():
-    """Verify backup files existence and get full server paths"""
+def verify_backups(reconcile: bool = True):
+    """Verify the backups directory and list the cataloged backups with their server paths"""
     try:
         # Get absolute path of backups directory
         backups_abs_path = BACKUPS_DIR.resolve()
@@ -1792,11 +5471,12 @@ async def verify_backups():
             "backups_directory": str(backups_abs_path),
             "directory_exists": BACKUPS_DIR.exists(),
             "is_directory": BACKUPS_DIR.is_dir(),
+            "directory_readable": os.access(str(BACKUPS_DIR), os.R_OK),
+            "directory_writable": os.access(str(BACKUPS_DIR), os.W_OK),
             "backups": [],
             "debug_info": {
                 "cwd": str(Path.cwd()),
-                "backups_dir_relative": str(BACKUPS_DIR),
-                "all_files_in_dir": []
+                "backups_dir_relative": str(BACKUPS_DIR)
             }
         }
         
@@ -1804,63 +5484,32 @@ async def verify_backups():
             BACKUPS_DIR.mkdir(parents=True, exist_ok=True)
             backups_info["message"] = "Backups directory was created"
         
-        # Debug: List ALL files in the directory
-        if BACKUPS_DIR.exists() and BACKUPS_DIR.is_dir():
-            try:
-                all_files = list(BACKUPS_DIR.iterdir())
-                backups_info["debug_info"]["all_files_in_dir"] = [f.name for f in all_files]
-                backups_info["debug_info"]["total_files_found"] = len(all_files)
-            except Exception as e:
-                backups_info["debug_info"]["error_listing_files"] = str(e)
-        
-        # List all SQL files in the directory - try different patterns
-        sql_files = []
+        if reconcile:
+            backups_info["debug_info"]["reconcile"] = reconcile_backup_catalog(force=True)
         
-        # Method 1: Using glob with *.sql
+        connection = get_logs_connection()
+        cursor = connection.cursor(dictionary=True)
         try:
-            sql_files = list(BACKUPS_DIR.glob("*.sql"))
-            backups_info["debug_info"]["glob_sql_count"] = len(sql_files)
-        except Exception as e:
-            backups_info["debug_info"]["glob_error"] = str(e)
-        
-        # Method 2: If no files found, try iterdir with manual filter
-        if not sql_files and BACKUPS_DIR.exists():
-            try:
-                for item in BACKUPS_DIR.iterdir():
-                    if item.is_file() and item.suffix.lower() == '.sql':
-                        sql_files.append(item)
-                backups_info["debug_info"]["iterdir_sql_count"] = len(sql_files)
-            except Exception as e:
-                backups_info["debug_info"]["iterdir_error"] = str(e)
-        
-        # Process SQL files found
-        for backup_file in sql_files:
-            try:
-                stats = backup_file.stat()
-                file_info = {
-                    "filename": backup_file.name,
-                    "full_path": str(backup_file.resolve()),
-                    "relative_path": str(backup_file.relative_to(Path.cwd())),
-                    "size_bytes": stats.st_size,
-                    "size_mb": round(stats.st_size / (1024 * 1024), 2),
-                    "created_at": datetime.fromtimestamp(stats.st_ctime).isoformat(),
-                    "modified_at": datetime.fromtimestamp(stats.st_mtime).isoformat(),
-                    "is_file": backup_file.is_file(),
-                    "exists": backup_file.exists(),
-                    "readable": os.access(str(backup_file), os.R_OK),
-                    "writable": os.access(str(backup_file), os.W_OK)
-                }
-                backups_info["backups"].append(file_info)
-            except Exception as e:
-                logger.error(f"Error processing backup file {backup_file}: {e}")
+            cursor.execute("SELECT * FROM backup_catalog ORDER BY created_at DESC, filename DESC")
+            entries = cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
         
-        # Sort by creation date descending
-        backups_info["backups"].sort(key=lambda x: x["created_at"], reverse=True)
+        for entry in entries:
+            file_info = format_catalog_entry(entry)
+            file_info.update({
+                "full_path": str(backups_abs_path / entry["filename"]),
+                "relative_path": str(BACKUPS_DIR / entry["filename"]),
+                "size_bytes": entry["size_bytes"],
+                "exists": True
+            })
+            backups_info["backups"].append(file_info)
         
         # Add summary
         backups_info["summary"] = {
-            "total_backups": len(backups_info["backups"]),
-            "total_size_mb": round(sum(b["size_mb"] for b in backups_info["backups"]), 2),
+            "total_backups": len(entries),
+            "total_size_mb": round(sum(e["size_bytes"] for e in entries) / (1024 * 1024), 2),
             "working_directory": str(Path.cwd()),
             "python_version": sys.version,
             "platform": sys.platform
@@ -1878,7 +5527,7 @@ async def verify_backups():
 
 
 @app.get("/api/backups/check/{filename}")
-async def check_backup_file(filename: str):
+def check_backup_file(filename: str):
     """Check if a specific backup file exists and get detailed info"""
     try:
         backup_path = BACKUPS_DIR / filename
@@ -1931,7 +5580,7 @@ async def check_backup_file(filename: str):
 
 
 @app.post("/api/backups/create-test")
-async def create_test_backup():
+def create_test_backup():
     """Create a test backup file to verify the backup system is working"""
     try:
         # Ensure backups directory exists
@@ -1961,9 +5610,11 @@ INSERT INTO test_table VALUES
 -- End of test backup
 """
         
-        with open(test_filepath, 'w', encoding='utf-8') as f:
+        with ChecksumWriter(test_filepath) as f:
             f.write(test_content)
         
+        record_backup_in_catalog(test_filename, "test", f.size, f.checksum)
+        
         # Verify file was created
         if test_filepath.exists():
             stats = test_filepath.stat()
@@ -1992,10 +5643,10 @@ INSERT INTO test_table VALUES
 
 
 @app.post("/api/logs/reset-table")
-async def reset_logs_table():
+def reset_logs_table():
     """Reset the sync_logs table - delete all records and associated backup files"""
     try:
-        connection = mysql.connector.connect(
+        connection = db_instrumentation.connect(
             host=os.getenv("MYSQL_HOST", "localhost"),
             user=os.getenv("MYSQL_USER", "root"),
             password=os.getenv("MYSQL_PASSWORD", ""),
@@ -2011,6 +5662,9 @@ async def reset_logs_table():
         # Delete all records from sync_logs
         cursor.execute("TRUNCATE TABLE sync_logs")
         connection.commit()
+        invalidate_log_totals()
+        task_record_cache.invalidate()
+        invalidate_sync_logs_schema()
         
         # Delete physical backup files
         deleted_files = []
@@ -2031,6 +5685,8 @@ async def reset_logs_table():
                     logger.error(f"Error deleting backup file {backup_file}: {e}")
                     failed_files.append(backup_file)
         
+        remove_from_backup_catalog(deleted_files)
+        
         cursor.close()
         connection.close()
         
@@ -2060,10 +5716,10 @@ async def reset_logs_table():
 
 
 @app.delete("/api/logs/{task_id}")
-async def delete_single_log(task_id: str):
+def delete_single_log(task_id: str):
     """Delete a single log record and its associated backup file"""
     try:
-        connection = mysql.connector.connect(
+        connection = db_instrumentation.connect(
             host=os.getenv("MYSQL_HOST", "localhost"),
             user=os.getenv("MYSQL_USER", "root"),
             password=os.getenv("MYSQL_PASSWORD", ""),
@@ -2086,6 +5742,8 @@ async def delete_single_log(task_id: str):
         # Delete the log record
         cursor.execute("DELETE FROM sync_logs WHERE task_id = %s", (task_id,))
         connection.commit()
+        invalidate_log_totals()
+        task_record_cache.invalidate(task_id)
         
         # Delete the physical backup file if exists
         file_deleted = False
@@ -2098,6 +5756,7 @@ async def delete_single_log(task_id: str):
                     logger.info(f"Deleted backup file: {backup_file}")
             except Exception as e:
                 logger.error(f"Error deleting backup file {backup_file}: {e}")
+            remove_from_backup_catalog([backup_file])
         
         # Also remove from memory if exists
         if task_id in background_tasks_store:
@@ -2124,42 +5783,25 @@ async def delete_single_log(task_id: str):
 
 
 @app.get("/api/logs/all")
-async def get_all_logs_simple():
-    """Get all logs in a simple format for the logs viewer"""
+def get_all_logs_simple(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None
+):
+    """Get logs in a simple format for the logs viewer, one page at a time"""
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv("MYSQL_HOST", "localhost"),
-            user=os.getenv("MYSQL_USER", "root"),
-            password=os.getenv("MYSQL_PASSWORD", ""),
-            database=os.getenv("MYSQL_DATABASE", "jiradb")
-        )
-        
-        cursor = connection.cursor(dictionary=True)
-        
-        # Get all logs ordered by creation date
-        cursor.execute("""
-            SELECT task_id, status, total_issues, processed_issues, 
-                   created_at, backup_file, error_message, jql_query
-            FROM sync_logs 
-            ORDER BY created_at DESC
-        """)
-        
-        logs = cursor.fetchall()
-        
-        # Convert datetime to string and parse result JSON
-        for log in logs:
-            if log.get('created_at'):
-                log['created_at'] = log['created_at'].isoformat()
-        
-        cursor.close()
-        connection.close()
+        page = query_sync_logs(limit, cursor)
         
         return {
             "success": True,
-            "logs": logs,
-            "total": len(logs)
+            "logs": page["logs"],
+            "total": page["total"],
+            "total_is_estimate": page["total_is_estimate"],
+            "next_cursor": page["next_cursor"],
+            "has_more": page["has_more"]
         }
         
+    except HTTPException:
+        raise
     except mysql.connector.Error as e:
         logger.error(f"Database error getting all logs: {e}")
         return {
@@ -2173,4 +5815,4 @@ async def get_all_logs_simple():
             "success": False,
             "error": f"Error inesperado: {str(e)}",
             "logs": []
-        } 
\ No newline at end of file
+        } 
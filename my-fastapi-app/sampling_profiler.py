@@ -0,0 +1,153 @@
+"""
+On-demand sampling profiler for the worker thread of a running task.
+
+Tasks register the thread they run on with `task_thread()`. `sample_thread()` then reads
+that thread's Python stack from `sys._current_frames()` at a fixed interval, from the
+calling thread, without tracing hooks: the profiled task keeps running at full speed and
+only pays for the GIL hand-offs. Stacks are aggregated in the collapsed format
+("root;caller;leaf count") read by flamegraph.pl, speedscope and similar tools.
+
+Blocking C calls (socket reads, MySQL round trips) show up as time spent in the Python
+frame that made the call, e.g. `ssl.py:recv_into` or `mysql/connector/network.py:recv_plain`.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+PROFILER_MAX_CONCURRENT = int(os.getenv("PROFILER_MAX_CONCURRENT", "2"))
+PROFILER_MIN_INTERVAL = 0.001
+PROFILER_MAX_DEPTH = 128
+
+_task_threads: Dict[str, int] = {}
+_task_threads_lock = threading.Lock()
+_sampling_slots = threading.BoundedSemaphore(PROFILER_MAX_CONCURRENT)
+_frame_labels: Dict[tuple, str] = {}
+_STDLIB_DIR = os.path.dirname(os.__file__).replace("\\", "/") + "/"
+
+
+class ProfilerBusyError(Exception):
+    """Raised when PROFILER_MAX_CONCURRENT samplings are already running"""
+
+
+def register_task_thread(task_id: str) -> None:
+    """Record the current thread as the one running task_id"""
+    with _task_threads_lock:
+        _task_threads[task_id] = threading.get_ident()
+
+
+def unregister_task_thread(task_id: str) -> None:
+    with _task_threads_lock:
+        if _task_threads.get(task_id) == threading.get_ident():
+            del _task_threads[task_id]
+
+
+@contextmanager
+def task_thread(task_id: str):
+    """Register the current thread as the one running task_id while the block runs"""
+    register_task_thread(task_id)
+    try:
+        yield
+    finally:
+        unregister_task_thread(task_id)
+
+
+def get_task_thread(task_id: str) -> Optional[int]:
+    with _task_threads_lock:
+        return _task_threads.get(task_id)
+
+
+def frame_label(code) -> str:
+    """`file.py:function`; library paths are kept from the package root (json/encoder.py)"""
+    key = (code.co_filename, code.co_name)
+    label = _frame_labels.get(key)
+    if label is None:
+        filename = code.co_filename.replace("\\", "/")
+        marker = filename.rfind("-packages/")
+        if marker != -1:
+            filename = filename[marker + len("-packages/"):]
+        elif filename.startswith(_STDLIB_DIR):
+            filename = filename[len(_STDLIB_DIR):]
+        else:
+            filename = os.path.basename(filename)
+        label = _frame_labels[key] = f"{filename}:{code.co_name}"
+    return label
+
+
+def collapse_stack(frame) -> str:
+    labels = []
+    while frame is not None and len(labels) < PROFILER_MAX_DEPTH:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+def sample_thread(thread_id: int, seconds: float, interval: float) -> Dict[str, Any]:
+    """
+    Sample the stack of thread_id every `interval` seconds for up to `seconds`.
+
+    Stops early when the thread finishes. Raises ProfilerBusyError if too many
+    samplings are already running.
+    """
+    if not _sampling_slots.acquire(blocking=False):
+        raise ProfilerBusyError(f"Ya hay {PROFILER_MAX_CONCURRENT} perfiles en curso")
+    try:
+        seconds = min(max(seconds, interval), PROFILER_MAX_SECONDS)
+        interval = max(interval, PROFILER_MIN_INTERVAL)
+        stacks: Counter = Counter()
+        samples = 0
+        thread_finished = False
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_sample = started
+        while True:
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                thread_finished = True
+                break
+            stacks[collapse_stack(frame)] += 1
+            samples += 1
+            del frame
+            next_sample += interval
+            now = time.perf_counter()
+            if next_sample >= deadline:
+                break
+            if next_sample > now:
+                time.sleep(next_sample - now)
+            else:
+                # Fell behind (GIL contention): skip the missed ticks instead of bursting
+                next_sample = now
+        return {
+            "samples": samples,
+            "interval_ms": round(interval * 1000, 3),
+            "duration_s": round(time.perf_counter() - started, 3),
+            "thread_finished": thread_finished,
+            "stacks": stacks
+        }
+    finally:
+        _sampling_slots.release()
+
+
+def to_collapsed(stacks: Counter) -> str:
+    """Collapsed-stack text, one "frame;frame;frame count" line per distinct stack"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def top_functions(stacks: Counter, limit: int = 20) -> Dict[str, Dict[str, int]]:
+    """Self (leaf) and total (anywhere on the stack) sample counts per frame"""
+    self_counts: Counter = Counter()
+    total_counts: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        self_counts[frames[-1]] += count
+        for label in set(frames):
+            total_counts[label] += count
+    return {
+        "self": dict(self_counts.most_common(limit)),
+        "total": dict(total_counts.most_common(limit))
+    }
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app is a set of flat modules (main.py, sql_literals.py, ...) in the parent directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
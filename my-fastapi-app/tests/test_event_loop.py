@@ -0,0 +1,54 @@
+"""
+A blocking MySQL call in one request must not hold up the rest of the API: the endpoints
+that talk to MySQL run in the threadpool, so /health and /sync-status keep answering.
+Runs offline: mysql.connector.connect is replaced by a call that just sleeps.
+"""
+import asyncio
+import threading
+import time
+
+import httpx
+import mysql.connector
+
+import main
+
+SLOW_CONNECT_SECONDS = 1.5
+RESPONSE_BOUND_SECONDS = 0.5
+
+
+def test_slow_mysql_does_not_block_health_or_status(monkeypatch):
+    connect_entered = threading.Event()
+
+    def slow_connect(**kwargs):
+        connect_entered.set()
+        time.sleep(SLOW_CONNECT_SECONDS)
+        raise mysql.connector.Error("MySQL lento simulado")
+
+    monkeypatch.setattr(mysql.connector, "connect", slow_connect)
+    monkeypatch.setitem(main.background_tasks_store, "event-loop-test", {
+        "type": "sync", "status": "sincronizando", "progress": 40, "total_issues": 100,
+        "processed_issues": 40, "message": "Sincronizando", "started_at": "2024-01-01T00:00:00",
+        "completed_at": None, "error": None
+    })
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            slow_request = asyncio.create_task(client.get("/sync-logs"))
+            while not connect_entered.is_set():
+                await asyncio.sleep(0.01)
+
+            timings = {}
+            for path in ("/health", "/sync-status/event-loop-test"):
+                start = time.perf_counter()
+                response = await client.get(path)
+                timings[path] = time.perf_counter() - start
+                assert response.status_code == 200, (path, response.text)
+
+            assert not slow_request.done()
+            await slow_request
+            return timings
+
+    timings = asyncio.run(scenario())
+    for path, elapsed in timings.items():
+        assert elapsed < RESPONSE_BOUND_SECONDS, f"{path} tardó {elapsed:.2f}s con una consulta MySQL lenta"
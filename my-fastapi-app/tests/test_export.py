@@ -0,0 +1,84 @@
+"""Exports are written under a hidden temp name and only appear once complete"""
+import pytest
+
+import main
+
+
+class FakeCursor:
+    def __init__(self, on_fetch):
+        self.sql = ""
+        self.on_fetch = on_fetch
+        self.batches = [[("SAC-1", "uno"), ("SAC-2", "dos")]]
+
+    def execute(self, sql, params=None):
+        self.sql = sql
+
+    def fetchone(self):
+        if self.sql.startswith("SHOW CREATE TABLE"):
+            return ("jira_issues", "CREATE TABLE `jira_issues` (`key` varchar(255), `summary` text)")
+        return (2,)
+
+    def fetchall(self):
+        return [("key", "varchar(255)", "NO", "PRI", None, ""),
+                ("summary", "text", "YES", "", None, "")]
+
+    def fetchmany(self, size):
+        self.on_fetch()
+        return self.batches.pop(0) if self.batches else []
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, on_fetch):
+        self.on_fetch = on_fetch
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self.on_fetch)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def export_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "BACKUPS_DIR", tmp_path)
+    monkeypatch.setattr(main, "save_export_log", lambda *args, **kwargs: None)
+    monkeypatch.setattr(main, "record_backup_in_catalog", lambda *args, **kwargs: None)
+    seen_during_write = []
+
+    def on_fetch():
+        seen_during_write.append(sorted(path.name for path in tmp_path.iterdir()))
+
+    monkeypatch.setattr(main.db_instrumentation, "connect", lambda **kwargs: FakeConnection(on_fetch))
+    task_id = "export-test"
+    main.background_tasks_store[task_id] = {"total_issues": 0, "processed_issues": 0}
+    yield tmp_path, task_id, seen_during_write
+    main.background_tasks_store.pop(task_id, None)
+
+
+@pytest.mark.parametrize("export_format", ["sql", "csv"])
+def test_export_is_hidden_until_complete(export_env, export_format):
+    backups_dir, task_id, seen_during_write = export_env
+    main.run_export_task(task_id, {"table_name": "jira_issues", "format": export_format})
+
+    task = main.background_tasks_store[task_id]
+    assert task["status"] == "completado", task.get("error")
+    filename = task["result"]["filename"]
+    assert seen_during_write and all(names == [f".{filename}.tmp"] for names in seen_during_write)
+    assert sorted(path.name for path in backups_dir.iterdir()) == [filename]
+    assert "SAC-2" in (backups_dir / filename).read_text()
+
+
+def test_failed_export_leaves_nothing(export_env, monkeypatch):
+    backups_dir, task_id, _ = export_env
+
+    def fail(*args):
+        raise RuntimeError("fallo simulado")
+
+    monkeypatch.setattr(main.sql_literals, "format_rows", fail)
+    main.run_export_task(task_id, {"table_name": "jira_issues", "format": "sql"})
+
+    assert main.background_tasks_store[task_id]["status"] == "error"
+    assert list(backups_dir.iterdir()) == []
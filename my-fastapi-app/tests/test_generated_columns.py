@@ -0,0 +1,56 @@
+"""Detection and validation of generated columns, offline"""
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("extra, generated", [
+    ("VIRTUAL GENERATED", True),
+    ("STORED GENERATED", True),
+    ("stored generated", True),
+    ("DEFAULT_GENERATED", False),
+    ("DEFAULT_GENERATED on update CURRENT_TIMESTAMP", False),
+    ("auto_increment", False),
+    ("", False),
+    (None, False),
+])
+def test_is_generated_column(extra, generated):
+    assert main.is_generated_column(extra) is generated
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_insertable_columns_keep_timestamp_defaults():
+    rows = [
+        ("id", "int", "NO", "PRI", None, "auto_increment"),
+        ("created_at", "timestamp", "YES", "", "CURRENT_TIMESTAMP", "DEFAULT_GENERATED"),
+        ("updated_at", "timestamp", "YES", "", "CURRENT_TIMESTAMP",
+         "DEFAULT_GENERATED on update CURRENT_TIMESTAMP"),
+        ("assignee_account_id", "varchar(255)", "YES", "", None, "VIRTUAL GENERATED"),
+    ]
+    assert main.get_insertable_columns(FakeCursor(rows), "jira_issues") == ["id", "created_at", "updated_at"]
+
+
+@pytest.mark.parametrize("sql_type", ["DATE", "DATETIME", "datetime", "TIMESTAMP"])
+def test_date_types_are_rejected(sql_type):
+    spec = main.GeneratedColumn(name="resolved_on", path="resolution.date", sql_type=sql_type)
+    with pytest.raises(ValueError, match="VARCHAR"):
+        main.build_generated_column_sql(spec, None)
+
+
+def test_varchar_definition():
+    spec = main.GeneratedColumn(name="sprint_state", path="customfield_10020[0].state", storage="STORED")
+    source_column, definition, comment = main.build_generated_column_sql(spec, {"customfield_10020": "sprint"})
+    assert source_column == "sprint"
+    assert "JSON_EXTRACT(`sprint`, '$[0].state')" in definition
+    assert definition.startswith("`sprint_state` VARCHAR(255) GENERATED ALWAYS AS") and "STORED" in definition
+    assert comment.startswith(main.GENERATED_COLUMN_COMMENT_PREFIX)
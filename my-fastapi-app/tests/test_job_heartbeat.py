@@ -0,0 +1,67 @@
+"""Job heartbeat: survives connection and serialization failures, and stops a job whose lease is lost"""
+import time
+
+import mysql.connector
+
+import main
+
+
+class FakeConnection:
+    def close(self):
+        pass
+
+
+def test_heartbeat_survives_failures_and_cancels_on_lost_lease(monkeypatch):
+    monkeypatch.setattr(main, "JOB_HEARTBEAT_SECONDS", 0.01)
+    connects = []
+    beats = []
+
+    def get_logs_connection():
+        connects.append(1)
+        if len(connects) == 1:
+            raise mysql.connector.Error("MySQL caído")
+        return FakeConnection()
+
+    def publish_job_state(connection, task_id, final_status=None):
+        if final_status:
+            return False
+        beats.append(1)
+        if len(beats) == 1:
+            raise RuntimeError("dictionary changed size during iteration")
+        if len(beats) == 2:
+            raise mysql.connector.Error("Lost connection to MySQL server")
+        return len(beats) < 5
+
+    def fake_sync(task_id, payload):
+        deadline = time.monotonic() + 5
+        try:
+            while time.monotonic() < deadline:
+                main.check_task_cancelled(task_id)
+                time.sleep(0.005)
+            main.background_tasks_store[task_id]["status"] = "completado"
+        except main.TaskCancelled as e:
+            main.background_tasks_store[task_id].update({"status": "error", "error": str(e)})
+
+    monkeypatch.setattr(main, "get_logs_connection", get_logs_connection)
+    monkeypatch.setattr(main, "publish_job_state", publish_job_state)
+    monkeypatch.setattr(main, "run_sync_task", fake_sync)
+
+    task_id = "heartbeat-test"
+    started = time.monotonic()
+    try:
+        main.run_claimed_job({"task_id": task_id, "state": {}, "job_type": "sync", "payload": {}})
+        state = main.background_tasks_store[task_id]
+    finally:
+        main.background_tasks_store.pop(task_id, None)
+
+    assert time.monotonic() - started < 3
+    assert state["status"] == "error"
+    assert "lease" in state["error"]
+    assert len(beats) == 5
+    # First connect failed, the MySQL error dropped the second connection
+    assert len(connects) >= 3
+    assert task_id not in main._cancelled_tasks
+
+
+def test_check_task_cancelled_is_noop_without_cancel():
+    main.check_task_cancelled("not-cancelled")
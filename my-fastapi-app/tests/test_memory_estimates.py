@@ -0,0 +1,44 @@
+"""Bytes-per-issue estimates used by memory admission never collapse toward 0"""
+import main
+
+
+def test_moving_average_is_clamped(monkeypatch):
+    monkeypatch.setattr(main, "_observed_bytes_per_issue", {})
+    main.record_bytes_per_issue("jira_issues", 40000)
+    for _ in range(50):
+        main.record_bytes_per_issue("jira_issues", 10)
+    assert main._observed_bytes_per_issue["jira_issues"] == main.SYNC_MIN_BYTES_PER_ISSUE
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return FakeCursor(self.rows)
+
+
+def test_history_estimate_is_clamped(monkeypatch):
+    monkeypatch.setattr(main, "_observed_bytes_per_issue", {})
+    estimate = main.get_bytes_per_issue_estimate(FakeConnection([("12",), ("3",)]), "jira_issues")
+    assert estimate == main.SYNC_MIN_BYTES_PER_ISSUE
+
+
+def test_history_estimate_above_minimum_is_kept(monkeypatch):
+    monkeypatch.setattr(main, "_observed_bytes_per_issue", {})
+    estimate = main.get_bytes_per_issue_estimate(FakeConnection([("60000",), ("40000",)]), "jira_issues")
+    assert estimate == 50000
@@ -0,0 +1,51 @@
+"""Restore connection settings: the server's credentials never go to another host"""
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+
+@pytest.fixture
+def server_env(monkeypatch):
+    monkeypatch.setenv("MYSQL_HOST", "db.internal")
+    monkeypatch.setenv("MYSQL_USER", "jira_sync")
+    monkeypatch.setenv("MYSQL_PASSWORD", "server-secret")
+    monkeypatch.setenv("MYSQL_DATABASE", "jiradb")
+
+
+def test_own_database_uses_server_credentials(server_env):
+    config = main.get_restore_connection_config(main.RestoreRequest())
+    assert (config["host"], config["user"], config["password"]) == ("db.internal", "jira_sync", "server-secret")
+
+
+def test_other_host_never_gets_server_credentials(server_env):
+    config = main.get_restore_connection_config(main.RestoreRequest(mysql_host="attacker.example"))
+    assert config["host"] == "attacker.example"
+    assert config["user"] is None and config["password"] is None
+
+
+def post_restore(tmp_path, monkeypatch, body):
+    monkeypatch.setattr(main, "BACKUPS_DIR", tmp_path)
+    (tmp_path / "jira_backup.sql").write_text("SELECT 1;\n")
+
+    async def request():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/backups/jira_backup.sql/restore", json=body)
+
+    return asyncio.run(request())
+
+
+@pytest.mark.parametrize("body", [
+    {"mysql_host": "attacker.example"},
+    {"mysql_host": "attacker.example", "mysql_user": "root"},
+    {"mysql_host": "attacker.example", "mysql_password": "x"},
+])
+def test_restore_to_other_host_requires_credentials(server_env, tmp_path, monkeypatch, body):
+    started = []
+    monkeypatch.setattr(main, "run_restore_task", lambda *args: started.append(args))
+    response = post_restore(tmp_path, monkeypatch, body)
+    assert response.status_code == 422
+    assert started == []
@@ -0,0 +1,100 @@
+"""Backup retention: which files plan_retention keeps, and recompression keeping their age"""
+import os
+from datetime import datetime, timedelta
+
+import main
+
+NOW = datetime(2024, 6, 15, 12, 0, 0)  # a Saturday
+
+
+def entry(name, age):
+    return {"filename": name, "created_at": NOW - age}
+
+
+def plan(entries, **policy):
+    kept, delete = main.plan_retention(entries, main.RetentionPolicy(**policy), NOW)
+    return [e["filename"] for e in kept], [e["filename"] for e in delete]
+
+
+def test_keep_last_keeps_newest():
+    entries = [entry(f"b{i}.sql", timedelta(days=100 + i)) for i in range(5)]
+    kept, delete = plan(entries, keep_last=2, keep_daily_days=0, keep_weekly_weeks=0)
+    assert kept == ["b0.sql", "b1.sql"]
+    assert delete == ["b2.sql", "b3.sql", "b4.sql"]
+
+
+def test_daily_keeps_newest_of_each_day():
+    entries = [
+        entry("today_late.sql", timedelta(hours=1)),
+        entry("today_early.sql", timedelta(hours=10)),
+        entry("yesterday.sql", timedelta(days=1)),
+        entry("old.sql", timedelta(days=3)),
+    ]
+    kept, delete = plan(entries, keep_last=0, keep_daily_days=2, keep_weekly_weeks=0)
+    assert kept == ["today_late.sql", "yesterday.sql"]
+    assert delete == ["today_early.sql", "old.sql"]
+
+
+def test_weekly_keeps_newest_of_each_iso_week():
+    entries = [
+        entry("this_week.sql", timedelta(days=1)),
+        entry("this_week_older.sql", timedelta(days=4)),
+        entry("last_week.sql", timedelta(days=8)),
+        entry("two_weeks_ago.sql", timedelta(days=14)),
+        entry("too_old.sql", timedelta(weeks=6)),
+    ]
+    kept, delete = plan(entries, keep_last=0, keep_daily_days=0, keep_weekly_weeks=3)
+    assert kept == ["this_week.sql", "last_week.sql", "two_weeks_ago.sql"]
+    assert delete == ["this_week_older.sql", "too_old.sql"]
+
+
+def test_tiers_combine_and_nothing_is_lost():
+    entries = [entry(f"b{i}.sql", timedelta(hours=12 * i)) for i in range(40)]
+    kept, delete = plan(entries, keep_last=3, keep_daily_days=7, keep_weekly_weeks=4)
+    assert {"b0.sql", "b1.sql", "b2.sql"} <= set(kept)
+    assert sorted(kept + delete) == sorted(e["filename"] for e in entries)
+    assert not set(kept) & set(delete)
+
+
+def test_empty_and_zero_policy():
+    assert plan([], keep_last=5) == ([], [])
+    kept, delete = plan([entry("a.sql", timedelta(days=1))], keep_last=0, keep_daily_days=0,
+                        keep_weekly_weeks=0)
+    assert kept == [] and delete == ["a.sql"]
+
+
+class FakeCursor:
+    def execute(self, sql, params=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def cursor(self):
+        return FakeCursor()
+
+    def commit(self):
+        pass
+
+
+def test_recompress_keeps_original_mtime(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "BACKUPS_DIR", tmp_path)
+    recorded = []
+    monkeypatch.setattr(main, "record_backup_in_catalog",
+                        lambda filename, *args, **kwargs: recorded.append(
+                            datetime.fromtimestamp((tmp_path / filename).stat().st_mtime)))
+    source = tmp_path / "jira_backup_old.sql"
+    source.write_text("INSERT INTO t VALUES (1);\n")
+    old_mtime = (NOW - timedelta(days=30)).timestamp()
+    os.utime(source, (old_mtime, old_mtime))
+
+    new_name = main.recompress_backup(FakeConnection(), {
+        "filename": source.name, "kind": "sync", "task_id": None, "table_name": "t", "row_count": 1
+    })
+
+    assert new_name == "jira_backup_old.sql.gz"
+    assert not source.exists()
+    assert (tmp_path / new_name).stat().st_mtime == old_mtime
+    assert recorded == [datetime.fromtimestamp(old_mtime)]
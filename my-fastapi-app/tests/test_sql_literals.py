@@ -0,0 +1,131 @@
+"""
+Round trips of sql_literals: every literal, read back the way MySQL reads it, gives the
+original value. The offline tests decode literals with a small reader of MySQL's literal
+syntax; test_mysql_round_trip inserts them into a real server when MYSQL_HOST is set.
+"""
+import io
+import json
+import os
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import pytest
+
+import sql_literals
+
+_SQL_UNESCAPES = {"0": "\x00", "n": "\n", "r": "\r", "Z": "\x1a", "\\": "\\", "'": "'"}
+
+# (value, what MySQL stores once the literal is read back)
+ROUND_TRIP_CASES = [
+    (None, None), (True, "1"), (False, "0"), (0, "0"), (-12345678901234, "-12345678901234"),
+    (3.25, "3.25"), (float("nan"), None), (float("inf"), None), (1e-7, "1e-07"),
+    (Decimal("1234.50"), "1234.50"), (Decimal("NaN"), None),
+    (datetime(2024, 5, 1, 10, 0, 0), "2024-05-01 10:00:00"),
+    (datetime(2024, 5, 1, 10, 0, 0, 123), "2024-05-01 10:00:00.000123"),
+    (date(2024, 5, 1), "2024-05-01"), (time(23, 59, 1, 5), "23:59:01.000005"),
+    (timedelta(hours=30, minutes=5), "30:05:00"), (timedelta(seconds=-90), "-00:01:30"),
+    (b"\x00\x01\xff", b"\x00\x01\xff"), (b"", b""), (bytearray(b"ab"), b"ab"),
+    ({"b", "a"}, "a,b"), ({"k": "ñ'\\"}, '{"k": "ñ\'\\\\"}'), ([1, "x"], '[1, "x"]'),
+    ("", ""), ("O'Brien \\ \"x\" \n\r\t\x00\x1a ÁÉ ✓", "O'Brien \\ \"x\" \n\r\t\x00\x1a ÁÉ ✓"),
+]
+
+
+def decode_sql_literal(text: str):
+    """Read a literal back the way MySQL does: NULL, numbers, 0x/X'' binary, escaped strings"""
+    if text == "NULL":
+        return None
+    if text.startswith("0x"):
+        return bytes.fromhex(text[2:])
+    if text == "X''":
+        return b""
+    if not text.startswith("'"):
+        return text
+    assert text.endswith("'") and len(text) >= 2, text
+    out, i, body = [], 0, text[1:-1]
+    while i < len(body):
+        char = body[i]
+        if char == "\\":
+            out.append(_SQL_UNESCAPES.get(body[i + 1], body[i + 1]))
+            i += 2
+            continue
+        assert char != "'", f"unescaped quote in {text!r}"
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+@pytest.mark.parametrize("value, expected", ROUND_TRIP_CASES, ids=[repr(case[0])[:40] for case in ROUND_TRIP_CASES])
+def test_literal_round_trip(value, expected):
+    assert decode_sql_literal(sql_literals.literal(value)) == expected
+
+
+def test_subclass_uses_base_serializer():
+    class IssueKey(str):
+        pass
+
+    assert sql_literals.literal(IssueKey("SAC-'1")) == "'SAC-\\'1'"
+
+
+def test_unknown_type_is_quoted_text():
+    class Opaque:
+        def __str__(self):
+            return "it's"
+
+    assert sql_literals.literal(Opaque()) == "'it\\'s'"
+
+
+def test_format_rows_splits_back_into_one_statement():
+    """The restore parser sees the rows as one INSERT, whatever the strings contain"""
+    import main
+
+    rows = [(f"SAC-{i}", "a;b'c\\\n--x", None, i, b"\x00;") for i in range(5)]
+    sql = "INSERT INTO `t` VALUES\n" + sql_literals.format_rows(rows) + ";\nSELECT 1;"
+    statements = list(main.iter_sql_statements(io.StringIO(sql), chunk_size=7))
+    assert len(statements) == 2
+    assert statements[0].count("SAC-") == 5
+
+
+@pytest.fixture
+def mysql_cursor():
+    if not os.getenv("MYSQL_HOST"):
+        pytest.skip("MYSQL_HOST not set")
+    import mysql.connector
+
+    try:
+        connection = mysql.connector.connect(
+            host=os.getenv("MYSQL_HOST"), port=int(os.getenv("MYSQL_PORT", "3306")),
+            user=os.getenv("MYSQL_USER", "root"), password=os.getenv("MYSQL_PASSWORD", ""),
+            database=os.getenv("MYSQL_DATABASE", "jiradb")
+        )
+    except mysql.connector.Error as e:
+        pytest.skip(f"MySQL not reachable: {e}")
+    cursor = connection.cursor()
+    yield cursor
+    cursor.close()
+    connection.close()
+
+
+def test_mysql_round_trip(mysql_cursor):
+    """Values written as literals come back from MySQL unchanged, for each column type"""
+    mysql_cursor.execute("""
+        CREATE TEMPORARY TABLE sql_literals_round_trip (
+            i BIGINT, f DOUBLE, d DECIMAL(65, 10), dt DATETIME(6), da DATE, t TIME(6),
+            b VARBINARY(64), s SET('a', 'b'), j JSON, txt TEXT
+        )
+    """)
+    rows = [
+        (-12345678901234, 3.25, Decimal("12345678901234567890123456789012345678901234567890.1234567890"),
+         datetime(2024, 5, 1, 10, 0, 0, 123), date(2024, 5, 1), timedelta(hours=30, seconds=-1, microseconds=5),
+         b"\x00\x01'\\\xff", {"a", "b"}, {"k": "ñ'\\\"\n"}, "O'Brien \\ \"x\" \n\r\t\x00\x1a ÁÉ ✓"),
+        (None, None, None, None, None, timedelta(seconds=-90), b"", set(), [1, "x"], ""),
+    ]
+    mysql_cursor.execute("INSERT INTO sql_literals_round_trip VALUES\n" + sql_literals.format_rows(rows))
+    mysql_cursor.execute("SELECT i, f, d, dt, da, t, b, s, j, txt FROM sql_literals_round_trip")
+    stored = mysql_cursor.fetchall()
+
+    for row, back in zip(rows, stored):
+        back = list(back)
+        back[6] = bytes(back[6]) if back[6] is not None else None
+        back[7] = set(back[7] or ())
+        back[8] = json.loads(back[8])
+        assert tuple(back) == tuple(value if not isinstance(value, set) else set(value) for value in row)
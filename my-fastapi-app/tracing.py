@@ -0,0 +1,331 @@
+"""
+Lightweight span tracing for background tasks, exported as OTLP/JSON.
+
+Spans are kept in a context variable so nested `span()` blocks become children of the
+enclosing one; work handed to thread pools keeps its parent through `bind()`. Finished
+spans are queued and written in batches by a daemon thread, either as one
+ExportTraceServiceRequest per line to a local file or POSTed to an OTLP/HTTP collector
+(e.g. http://otel-collector:4318/v1/traces).
+
+Configuration (environment):
+    TRACING_EXPORTER       none (default) | file | otlp
+    TRACING_FILE           output file for the file exporter (traces/spans.jsonl)
+    TRACING_OTLP_ENDPOINT  collector URL for the otlp exporter
+    TRACING_SERVICE_NAME   service.name resource attribute
+
+With the exporter disabled `span()` returns a shared no-op span, so instrumented code
+only pays for a function call.
+"""
+import contextvars
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "traces/spans.jsonl")
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "jira-sync-api")
+TRACING_BATCH_SIZE = int(os.getenv("TRACING_BATCH_SIZE", "512"))
+TRACING_FLUSH_SECONDS = float(os.getenv("TRACING_FLUSH_SECONDS", "2"))
+TRACING_QUEUE_SIZE = int(os.getenv("TRACING_QUEUE_SIZE", "10000"))
+
+SPAN_KIND_INTERNAL = 1
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+def encode_attribute_value(value: Any) -> Dict[str, Any]:
+    """Encode a Python value as an OTLP AnyValue (int64 travels as a string in OTLP/JSON)"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def encode_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": encode_attribute_value(value)}
+            for key, value in attributes.items() if value is not None]
+
+
+class Span:
+    """A timed unit of work; use as a context manager so it ends and becomes current"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id", "attributes",
+                 "events", "start_ns", "end_ns", "status_code", "status_message", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str],
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_span_id = parent_span_id
+        self.attributes = dict(attributes) if attributes else {}
+        self.events: List[Dict[str, Any]] = []
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status_code = STATUS_CODE_OK
+        self.status_message = ""
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: float = 1) -> None:
+        """Increment a numeric attribute (bytes, rows, retries...)"""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status_code = STATUS_CODE_ERROR
+        self.status_message = str(exc)[:1000]
+        self.events.append({
+            "timeUnixNano": str(time.time_ns()),
+            "name": "exception",
+            "attributes": encode_attributes({
+                "exception.type": type(exc).__name__,
+                "exception.message": str(exc)[:1000]
+            })
+        })
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            _exporter.submit(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None:
+            self.record_exception(exc)
+        _current_span.reset(self._token)
+        self.end()
+        return False
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": encode_attributes(self.attributes),
+            "status": {"code": self.status_code}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.events:
+            span["events"] = self.events
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class NoopSpan:
+    """Stand-in returned while tracing is disabled; every method does nothing"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def add(self, key: str, amount: float = 1) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class SpanExporter:
+    """Batch finished spans on a bounded queue and write them from a daemon thread"""
+
+    def __init__(self, mode: str, file_path: str, endpoint: str, service_name: str):
+        self.mode = mode
+        self.file_path = Path(file_path)
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.dropped = 0
+        self.exported = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=TRACING_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("file", "otlp")
+
+    def submit(self, span: Span) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            # Never block the traced task on the exporter
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Span] = []
+            deadline = time.monotonic() + TRACING_FLUSH_SECONDS
+            stop = False
+            while len(batch) < TRACING_BATCH_SIZE:
+                try:
+                    span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stop = True
+                    break
+                batch.append(span)
+            if batch:
+                self.export(batch)
+            if stop:
+                return
+
+    def build_request(self, spans: List[Span]) -> Dict[str, Any]:
+        """Wrap spans in an OTLP ExportTraceServiceRequest"""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": encode_attributes({
+                    "service.name": self.service_name,
+                    "host.name": os.getenv("HOSTNAME", ""),
+                    "process.pid": os.getpid()
+                })},
+                "scopeSpans": [{
+                    "scope": {"name": "jira-sync"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+
+    def export(self, spans: List[Span]) -> None:
+        payload = self.build_request(spans)
+        try:
+            if self.mode == "otlp":
+                response = requests.post(self.endpoint, json=payload, timeout=10)
+                response.raise_for_status()
+            else:
+                self.file_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.file_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+            self.exported += len(spans)
+        except Exception as e:
+            self.dropped += len(spans)
+            logger.warning(f"No se pudieron exportar {len(spans)} spans: {e}")
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Flush queued spans and stop the exporter thread"""
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+        self._thread = None
+
+
+_exporter = SpanExporter(TRACING_EXPORTER, TRACING_FILE, TRACING_OTLP_ENDPOINT, TRACING_SERVICE_NAME)
+
+
+def configure(mode: str, file_path: str = TRACING_FILE, endpoint: str = TRACING_OTLP_ENDPOINT,
+              service_name: str = TRACING_SERVICE_NAME) -> None:
+    """Replace the exporter, flushing the previous one (used by scripts and benchmarks)"""
+    global _exporter
+    _exporter.shutdown()
+    _exporter = SpanExporter(mode.lower(), file_path, endpoint, service_name)
+
+
+def is_enabled() -> bool:
+    return _exporter.enabled
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, trace_id: Optional[str] = None):
+    """
+    Start a span as a child of the current one.
+
+    Without a current span a new trace begins; trace_id accepts a task id (UUID) so the
+    trace of a task can be found by its id.
+    """
+    if not _exporter.enabled:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, attributes)
+    if trace_id:
+        try:
+            trace_id = uuid.UUID(trace_id).hex
+        except ValueError:
+            trace_id = None
+    return Span(name, trace_id or uuid.uuid4().hex, None, attributes)
+
+
+def current_span():
+    """The innermost active span, or the no-op span"""
+    return _current_span.get() or NOOP_SPAN
+
+
+def bind(fn: Callable) -> Callable:
+    """Wrap fn so spans it opens in another thread are children of the current span"""
+    parent = _current_span.get()
+    if parent is None:
+        return fn
+
+    def bound(*args, **kwargs):
+        token = _current_span.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_span.reset(token)
+
+    return bound
+
+
+def stats() -> Dict[str, Any]:
+    return {"exporter": _exporter.mode, "exported_spans": _exporter.exported,
+            "dropped_spans": _exporter.dropped}
+
+
+def shutdown() -> None:
+    _exporter.shutdown()